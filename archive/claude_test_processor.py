@@ -11,9 +11,13 @@ This script:
 import os
 import sys
 import sqlite3
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterable, Iterator
 import json
 from dataclasses import asdict
 from dotenv import load_dotenv
@@ -32,133 +36,285 @@ from image_processor.google_drive.auth import GoogleDriveAuth
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Most analysed files written per transaction; the writer commits as soon as
+# the queue runs dry, so this only caps a burst
+BATCH_SIZE = 500
 
-def get_completed_files(db_path: str, limit: int = None) -> List[Dict[str, Any]]:
-    """Get completed files from the original database."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
+# Maximum concurrent Claude calls
+CONCURRENCY = 5
+
+# Drive downloads prefetched ahead of the Claude calls
+PREFETCH = 4
+
+
+_COMPLETED_FILES_SQL = """
+    SELECT f.id, f.drive_file_id, f.filename, f.file_path, f.file_size, f.mime_type
+    FROM source.files f
+    WHERE f.processing_status = 'completed'
+    ORDER BY f.id
+"""
+
+
+def count_completed_files(conn: sqlite3.Connection) -> int:
+    """Count completed files in the original database."""
+    return conn.execute(
+        "SELECT COUNT(*) FROM source.files WHERE processing_status = 'completed'"
+    ).fetchone()[0]
+
+
+def iter_completed_files(conn: sqlite3.Connection, limit: int = None) -> Iterator[Dict[str, Any]]:
+    """Stream completed files from the original database (attached as ``source``)."""
     cursor = conn.cursor()
     if limit:
-        cursor.execute("""
-            SELECT f.id, f.drive_file_id, f.filename, f.file_path, f.file_size, f.mime_type
-            FROM files f
-            WHERE f.processing_status = 'completed'
-            ORDER BY f.id
-            LIMIT ?
-        """, (limit,))
+        cursor.execute(_COMPLETED_FILES_SQL + " LIMIT ?", (limit,))
     else:
-        cursor.execute("""
-            SELECT f.id, f.drive_file_id, f.filename, f.file_path, f.file_size, f.mime_type
-            FROM files f
-            WHERE f.processing_status = 'completed'
-            ORDER BY f.id
-        """)
-    
-    files = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+        cursor.execute(_COMPLETED_FILES_SQL)
     
-    return files
+    for row in cursor:
+        yield dict(row)
 
 
-def clear_test_metadata(db_path: str, file_ids: List[int]):
-    """Clear existing metadata for test files in the Claude test database."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def clear_test_metadata(conn: sqlite3.Connection):
+    """Clear existing metadata for test files in the Claude test database.
+
+    Set-based: the files to reset are selected by a subquery against the
+    original database, so no id list is built or bound.
+    """
+    completed = "SELECT id FROM source.files WHERE processing_status = 'completed'"
     
-    # Clear metadata and activity tags for these files
-    placeholders = ','.join('?' * len(file_ids))
-    cursor.execute(f"DELETE FROM metadata WHERE file_id IN ({placeholders})", file_ids)
-    cursor.execute(f"DELETE FROM activity_tags WHERE file_id IN ({placeholders})", file_ids)
+    conn.execute("BEGIN")
+    try:
+        # Clear metadata and activity tags for these files
+        conn.execute(f"DELETE FROM main.metadata WHERE file_id IN ({completed})")
+        conn.execute(f"DELETE FROM main.activity_tags WHERE file_id IN ({completed})")
+        
+        # Reset processing status to pending so we can reprocess
+        cursor = conn.execute(f"""
+            UPDATE main.files 
+            SET processing_status = 'pending', processed_at = NULL, error_message = NULL
+            WHERE id IN ({completed})
+        """)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
     
-    # Reset processing status to pending so we can reprocess
-    cursor.execute(f"""
-        UPDATE files 
-        SET processing_status = 'pending', processed_at = NULL, error_message = NULL
-        WHERE id IN ({placeholders})
-    """, file_ids)
+    logger.info(f"Cleared metadata for {cursor.rowcount} files in test database")
+
+
+def make_drive_service_factory(config: Config, drive_auth: GoogleDriveAuth):
+    """Return a callable giving each worker thread its own Drive service.
+
+    The googleapiclient transport (httplib2) is not thread-safe, so
+    downloads running in executor threads must not share one instance.
+    """
+    local = threading.local()
     
-    conn.commit()
-    conn.close()
+    def get_drive_service() -> GoogleDriveService:
+        service = getattr(local, 'service', None)
+        if service is None:
+            service = GoogleDriveService(config.google_drive, drive_auth)
+            local.service = service
+        return service
     
-    logger.info(f"Cleared metadata for {len(file_ids)} files in test database")
+    return get_drive_service
+
+
+def _download(get_drive_service, drive_file_id: str) -> bytes:
+    """Blocking Drive download (runs on the prefetch pool)."""
+    return get_drive_service().download_file(drive_file_id)
 
 
-def process_file_with_claude(client: ClaudeVisionClient, drive_service: GoogleDriveService, 
-                           file_info: Dict[str, Any]) -> Dict[str, Any]:
-    """Process a single file with Claude."""
+async def process_file_with_claude(client: ClaudeVisionClient, get_drive_service,
+                                   file_info: Dict[str, Any], download_pool: ThreadPoolExecutor,
+                                   claude_sem: asyncio.Semaphore) -> Dict[str, Any]:
+    """Process a single file with Claude without blocking the event loop.
+
+    The Drive download runs on a dedicated prefetch pool and does not hold a
+    Claude slot, so upcoming files download while earlier ones are analysed.
+    """
+    loop = asyncio.get_running_loop()
     try:
-        # Download file data from Google Drive
-        file_data = drive_service.download_file(file_info['drive_file_id'])
-        
-        # Analyze with Claude
-        metadata = client.analyze_image(
-            image_data=file_data,
-            filename=file_info['filename'],
-            file_path=file_info['file_path']
+        file_data = await loop.run_in_executor(
+            download_pool, _download, get_drive_service, file_info['drive_file_id']
         )
-        
-        return metadata
-        
+        async with claude_sem:
+            return await asyncio.to_thread(
+                client.analyze_image,
+                image_data=file_data,
+                filename=file_info['filename'],
+                file_path=file_info['file_path']
+            )
     except Exception as e:
         logger.error(f"Failed to process {file_info['filename']}: {e}")
         raise
 
 
-def save_metadata_to_db(db_path: str, file_id: int, metadata: Dict[str, Any]):
-    """Save extracted metadata to the test database."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+async def db_writer(conn: sqlite3.Connection, queue: asyncio.Queue) -> int:
+    """Single consumer that group-commits results from the queue.
+
+    Whatever is already queued when the writer wakes goes into one
+    transaction, which commits once the queue is empty (or BATCH_SIZE is
+    reached), so results never wait in memory for a full batch.
+    """
+    saved = 0
+    batch = []
     
     try:
-        # Insert metadata
-        cursor.execute("""
-            INSERT OR REPLACE INTO metadata (
-                file_id, primary_subject, visual_quality, has_people, people_count,
-                is_indoor, social_media_score, social_media_reason, marketing_score,
-                marketing_use, season, time_of_day, mood_energy, color_palette, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            file_id,
-            metadata.get('primary_subject', ''),
-            metadata.get('visual_quality', 3),
-            metadata.get('has_people', False),
-            metadata.get('people_count', 'none'),
-            metadata.get('is_indoor', False),
-            metadata.get('social_media_score', 3),
-            metadata.get('social_media_reason', ''),
-            metadata.get('marketing_score', 3),
-            metadata.get('marketing_use', ''),
-            metadata.get('season'),
-            metadata.get('time_of_day'),
-            metadata.get('mood_energy'),
-            metadata.get('color_palette'),
-            metadata.get('notes', '')
-        ))
-        
-        # Insert activity tags
-        for tag in metadata.get('activity_tags', []):
-            cursor.execute("""
-                INSERT OR IGNORE INTO activity_tags (file_id, tag_name)
-                VALUES (?, ?)
-            """, (file_id, tag))
-        
-        # Update file status
-        cursor.execute("""
-            UPDATE files 
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE or queue.empty():
+                pending, batch = batch, []
+                saved += flush_batch(conn, pending)
+    finally:
+        # Results taken off the queue are written even if the writer stops early
+        saved += flush_batch(conn, batch)
+    return saved
+
+
+async def process_all(client: ClaudeVisionClient, get_drive_service,
+                      files: Iterable[Dict[str, Any]], total: int,
+                      conn: sqlite3.Connection) -> int:
+    """Analyse files concurrently and hand results to the DB writer.
+
+    Files are pulled from the iterable only as slots free up, so at most
+    CONCURRENCY + PREFETCH rows are held in memory at once.
+    """
+    claude_sem = asyncio.Semaphore(CONCURRENCY)
+    # Caps files downloaded but not yet analysed, bounding memory
+    in_flight = asyncio.Semaphore(CONCURRENCY + PREFETCH)
+    queue: asyncio.Queue = asyncio.Queue()
+    writer = asyncio.create_task(db_writer(conn, queue))
+    tasks = set()
+    
+    async def bounded(i: int, file_info: Dict[str, Any]):
+        try:
+            print(f"Processing {i}/{total}: {file_info['filename']}")
+            try:
+                metadata = await process_file_with_claude(
+                    client, get_drive_service, file_info, download_pool, claude_sem
+                )
+            except Exception as e:
+                print(f"  ✗ Failed: {file_info['filename']}: {e}")
+                return
+            await queue.put((file_info['id'], metadata))
+            print(f"  ✓ Completed: {file_info['filename']}")
+        finally:
+            in_flight.release()
+    
+    with ThreadPoolExecutor(max_workers=PREFETCH) as download_pool:
+        try:
+            for i, file_info in enumerate(files, 1):
+                await in_flight.acquire()
+                task = asyncio.create_task(bounded(i, file_info))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            # Write every queued result, even when analysis stopped early
+            await queue.put(None)
+            saved = await writer
+    
+    return saved
+
+
+def open_test_db(db_path: str, source_db_path: str) -> sqlite3.Connection:
+    """Open the test database once for the whole run, tuned for bulk writes.
+
+    The original database is attached read-only as ``source`` so every
+    helper shares this one connection and its warm page cache.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-131072")
+    # Inserting a result marks its file completed inside the engine, so the
+    # status can never lag behind the metadata (REPLACE re-fires the insert)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS main.trg_metadata_complete
+        AFTER INSERT ON metadata
+        BEGIN
+            UPDATE files
             SET processing_status = 'completed', processed_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (file_id,))
-        
-        conn.commit()
-        logger.info(f"Saved metadata for file ID {file_id}")
-        
+            WHERE id = NEW.file_id;
+        END
+    """)
+    conn.execute(
+        "ATTACH DATABASE ? AS source",
+        (f"file:{Path(source_db_path).resolve().as_posix()}?mode=ro",)
+    )
+    return conn
+
+
+def _metadata_row(file_id: int, metadata: Dict[str, Any]) -> Tuple:
+    """Parameters for one metadata INSERT."""
+    return (
+        file_id,
+        metadata.get('primary_subject', ''),
+        metadata.get('visual_quality', 3),
+        metadata.get('has_people', False),
+        metadata.get('people_count', 'none'),
+        metadata.get('is_indoor', False),
+        metadata.get('social_media_score', 3),
+        metadata.get('social_media_reason', ''),
+        metadata.get('marketing_score', 3),
+        metadata.get('marketing_use', ''),
+        metadata.get('season'),
+        metadata.get('time_of_day'),
+        metadata.get('mood_energy'),
+        metadata.get('color_palette'),
+        metadata.get('notes', '')
+    )
+
+
+def save_metadata_to_db(conn: sqlite3.Connection, batch: List[Tuple[int, Dict[str, Any]]]):
+    """Write extracted metadata for a batch of files; the caller owns the transaction.
+
+    Each statement is prepared once and run with executemany over the whole
+    batch (one bound row per execution, so SQLite's variable limit never applies).
+    File status is set by the trg_metadata_complete trigger.
+    """
+    cursor = conn.cursor()
+    
+    cursor.executemany("""
+        INSERT OR REPLACE INTO metadata (
+            file_id, primary_subject, visual_quality, has_people, people_count,
+            is_indoor, social_media_score, social_media_reason, marketing_score,
+            marketing_use, season, time_of_day, mood_energy, color_palette, notes
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [_metadata_row(file_id, metadata) for file_id, metadata in batch])
+    
+    cursor.executemany("""
+        INSERT OR IGNORE INTO activity_tags (file_id, tag_name)
+        VALUES (?, ?)
+    """, [
+        (file_id, tag)
+        for file_id, metadata in batch
+        for tag in metadata.get('activity_tags', [])
+    ])
+
+
+def flush_batch(conn: sqlite3.Connection, batch: List[Tuple[int, Dict[str, Any]]]) -> int:
+    """Persist a batch of (file_id, metadata) results in a single transaction."""
+    if not batch:
+        return 0
+    
+    conn.execute("BEGIN")
+    try:
+        save_metadata_to_db(conn, batch)
+        conn.execute("COMMIT")
     except Exception as e:
-        conn.rollback()
-        logger.error(f"Failed to save metadata for file ID {file_id}: {e}")
+        conn.execute("ROLLBACK")
+        logger.error(f"Failed to save batch of {len(batch)} files: {e}")
         raise
-    finally:
-        conn.close()
+    
+    logger.info(f"Saved metadata for {len(batch)} files")
+    return len(batch)
 
 
 def main():
@@ -204,7 +360,8 @@ def main():
         # Initialize Google Drive service
         logger.info("Initializing Google Drive service...")
         drive_auth = GoogleDriveAuth(config.google_drive.credentials_path)
-        drive_service = GoogleDriveService(config.google_drive, drive_auth)
+        get_drive_service = make_drive_service_factory(config, drive_auth)
+        get_drive_service()  # build eagerly so auth problems surface before processing
         print("✓ Google Drive service initialized")
         
         # Get completed files from original database
@@ -212,41 +369,25 @@ def main():
         original_db = "image_metadata.db"
         test_db = "claude_2pass.db"
         
-        completed_files = get_completed_files(original_db)  # Process ALL completed files
-        print(f"✓ Found {len(completed_files)} completed files to reprocess")
-        
-        if not completed_files:
-            print("No completed files found to reprocess")
-            return 0
-        
-        # Clear existing metadata in test database
-        file_ids = [f['id'] for f in completed_files]
-        clear_test_metadata(test_db, file_ids)
-        
-        # Process each file with Claude
-        logger.info("Processing files with Claude 3.5 Haiku...")
-        success_count = 0
-        
-        for i, file_info in enumerate(completed_files, 1):
-            print(f"Processing {i}/{len(completed_files)}: {file_info['filename']}")
+        with closing(open_test_db(test_db, original_db)) as conn:
+            total = count_completed_files(conn)  # Process ALL completed files
+            print(f"✓ Found {total} completed files to reprocess")
             
-            try:
-                # Process with Claude
-                metadata = process_file_with_claude(claude_client, drive_service, file_info)
-                
-                # Save to test database
-                save_metadata_to_db(test_db, file_info['id'], metadata)
-                
-                success_count += 1
-                print(f"  ✓ Completed successfully")
-                
-            except Exception as e:
-                logger.error(f"Failed to process {file_info['filename']}: {e}")
-                print(f"  ✗ Failed: {e}")
-                continue
+            if not total:
+                print("No completed files found to reprocess")
+                return 0
+            
+            # Clear existing metadata in test database
+            clear_test_metadata(conn)
+            
+            # Process files concurrently with Claude; a single writer batches the inserts
+            logger.info("Processing files with Claude 3.5 Haiku...")
+            success_count = asyncio.run(
+                process_all(claude_client, get_drive_service, iter_completed_files(conn), total, conn)
+            )
         
         print(f"\n✓ Processing complete!")
-        print(f"Successfully processed: {success_count}/{len(completed_files)} files")
+        print(f"Successfully processed: {success_count}/{total} files")
         print(f"Results saved to: {test_db}")
         print("\nTo compare results:")
         print(f"  Original (Gemma):    sqlite3 {original_db}")
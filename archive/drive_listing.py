@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Batched Drive listing helpers shared by the exploration scripts."""
+
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List
+
+# Google caps a batch request at 100 calls
+MAX_BATCH_CALLS = 100
+
+# On-disk cache of listing results, keyed by query
+CACHE_PATH = 'drive_listing_cache.db'
+DEFAULT_TTL = 3600
+
+
+def batched_list(service, queries: Dict[str, Dict[str, Any]], page_size: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Run several files().list queries, multiplexing their pages into batch requests.
+
+    ``queries`` maps a caller-chosen key to the keyword arguments for
+    ``files().list``. Every page of every query is dispatched through
+    ``BatchHttpRequest`` (up to 100 calls per round-trip); queries with a
+    ``nextPageToken`` are re-queued for the next round. Returns the collected
+    ``files`` per key. Only metadata calls can be batched - never media.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {key: [] for key in queries}
+    pending = [(key, None) for key in queries]
+
+    while pending:
+        current, pending = pending[:MAX_BATCH_CALLS], pending[MAX_BATCH_CALLS:]
+        next_round = []
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                raise exception
+            results[request_id].extend(response.get('files', []))
+            token = response.get('nextPageToken')
+            if token:
+                next_round.append((request_id, token))
+
+        batch = service.new_batch_http_request(callback=collect)
+        for key, page_token in current:
+            batch.add(
+                service.files().list(pageSize=page_size, pageToken=page_token, **queries[key]),
+                request_id=key
+            )
+        batch.execute()
+
+        pending = next_round + pending
+
+    return results
+
+
+def cached_list(service, queries: Dict[str, Dict[str, Any]], page_size: int,
+                ttl: int = DEFAULT_TTL, refresh: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    """``batched_list`` with a TTL'd SQLite cache in front of it.
+
+    Each query is cached under its own key (the query parameters), so warm
+    runs skip Drive entirely. ``refresh=True`` ignores cached rows and
+    overwrites them with fresh results.
+    """
+    conn = sqlite3.connect(CACHE_PATH)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS listing_cache (
+                cache_key TEXT PRIMARY KEY,
+                cached_at REAL NOT NULL,
+                files TEXT NOT NULL
+            )
+        """)
+        cache_keys = {
+            key: json.dumps({'pageSize': page_size, **params}, sort_keys=True)
+            for key, params in queries.items()
+        }
+
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        if not refresh:
+            cutoff = time.time() - ttl
+            for key, cache_key in cache_keys.items():
+                row = conn.execute(
+                    "SELECT files FROM listing_cache WHERE cache_key = ? AND cached_at >= ?",
+                    (cache_key, cutoff)
+                ).fetchone()
+                if row:
+                    results[key] = json.loads(row[0])
+
+        missing = {key: params for key, params in queries.items() if key not in results}
+        if missing:
+            fetched = batched_list(service, missing, page_size)
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO listing_cache (cache_key, cached_at, files) VALUES (?, ?, ?)",
+                    [(cache_keys[key], now, json.dumps(files)) for key, files in fetched.items()]
+                )
+            results.update(fetched)
+
+        return results
+    finally:
+        conn.close()
@@ -1,58 +1,78 @@
 #!/usr/bin/env python3
 """Explore shared drive contents."""
 
+import argparse
+
 from image_processor.core.config import Config
 from image_processor.google_drive import GoogleDriveAuth
 
-# Load config
-config = Config.from_file('config/config.yaml')
-
-# Connect to Google Drive
-auth = GoogleDriveAuth(config.google_drive.credentials_path)
-service = auth.get_service()
+from drive_listing import cached_list
 
 shared_drive_id = "0AJ70ibhTUUybUk9PVA"  # LV VIDEOS and Photos
 
-print(f"Contents of 'LV VIDEOS and Photos' shared drive:")
-print("-" * 60)
 
-# List items in the shared drive
-page_token = None
-file_count = 0
-folder_count = 0
-image_count = 0
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached listings and re-query Drive')
+    args = parser.parse_args()
+
+    # Load config
+    config = Config.from_file('config/config.yaml')
 
-while True:
-    results = service.files().list(
-        q=f"trashed=false",
+    # Connect to Google Drive
+    auth = GoogleDriveAuth(config.google_drive.credentials_path)
+    service = auth.get_service()
+
+    print(f"Contents of 'LV VIDEOS and Photos' shared drive:")
+    print("-" * 60)
+
+    common = dict(
         corpora='drive',
         driveId=shared_drive_id,
         includeItemsFromAllDrives=True,
         supportsAllDrives=True,
-        fields='nextPageToken, files(id, name, mimeType)',
-        pageToken=page_token,
-        pageSize=50
+    )
+    folder_mime = 'application/vnd.google-apps.folder'
+
+    # Drive-wide filtered queries instead of walking every folder: folder
+    # names/ids for display, plus id-only sweeps for the counts, all in one batch
+    listings = cached_list(
+        service,
+        {
+            'folders': dict(q=f"mimeType = '{folder_mime}' and trashed=false",
+                            fields='nextPageToken, files(id, name)', **common),
+            'files': dict(q=f"mimeType != '{folder_mime}' and trashed=false",
+                          fields='nextPageToken, files(id)', **common),
+            'images': dict(q="mimeType contains 'image/' and trashed=false",
+                           fields='nextPageToken, files(id)', **common),
+        },
+        page_size=1000,
+        refresh=args.refresh
+    )
+
+    for item in listings['folders']:
+        print(f"📁 {item['name']}")
+        print(f"   ID: {item['id']}")
+
+    # One bounded call for the image preview
+    preview = service.files().list(
+        q="mimeType contains 'image/' and trashed=false",
+        fields='files(name)',
+        pageSize=5,
+        **common
     ).execute()
-    
-    items = results.get('files', [])
-    
-    for item in items:
-        if item['mimeType'] == 'application/vnd.google-apps.folder':
-            print(f"📁 {item['name']}")
-            print(f"   ID: {item['id']}")
-            folder_count += 1
-        else:
-            file_count += 1
-            if item['mimeType'].startswith('image/'):
-                image_count += 1
-                if image_count <= 5:  # Show first 5 images
-                    print(f"🖼️  {item['name']}")
-    
-    page_token = results.get('nextPageToken', None)
-    if page_token is None:
-        break
-
-print(f"\nSummary:")
-print(f"Total folders: {folder_count}")
-print(f"Total files: {file_count}")
-print(f"Total images: {image_count}")
\ No newline at end of file
+    for item in preview.get('files', []):
+        print(f"🖼️  {item['name']}")
+
+    folder_count = len(listings['folders'])
+    file_count = len(listings['files'])
+    image_count = len(listings['images'])
+
+    print(f"\nSummary:")
+    print(f"Total folders: {folder_count}")
+    print(f"Total files: {file_count}")
+    print(f"Total images: {image_count}")
+
+
+if __name__ == '__main__':
+    main()
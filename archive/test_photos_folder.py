@@ -1,63 +1,82 @@
 #!/usr/bin/env python3
 """Test accessing the Photos folder in shared drive."""
 
+import argparse
+
 from image_processor.core.config import Config
 from image_processor.google_drive import GoogleDriveAuth
 
-# Load config
-config = Config.from_file('config/config.yaml')
-
-# Connect to Google Drive
-auth = GoogleDriveAuth(config.google_drive.credentials_path)
-service = auth.get_service()
+from drive_listing import cached_list
 
 photos_folder_id = "1I9bH_ii-ImeCB6ojW9LIbY7p2wwqio-G"
 shared_drive_id = "0AJ70ibhTUUybUk9PVA"
 
-print("Checking Photos folder in shared drive...")
-print("-" * 60)
 
-# Get folder info
-try:
-    folder_info = service.files().get(
-        fileId=photos_folder_id,
-        supportsAllDrives=True,
-        fields="id, name, mimeType"
-    ).execute()
-    print(f"✓ Found folder: {folder_info['name']}")
-except Exception as e:
-    print(f"✗ Error getting folder info: {e}")
-
-# Count files in the Photos folder
-print("\nCounting files in Photos folder...")
-page_token = None
-image_count = 0
-total_count = 0
-
-while True:
-    results = service.files().list(
-        q=f"'{photos_folder_id}' in parents and trashed=false",
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached listings and re-query Drive')
+    args = parser.parse_args()
+
+    # Load config
+    config = Config.from_file('config/config.yaml')
+
+    # Connect to Google Drive
+    auth = GoogleDriveAuth(config.google_drive.credentials_path)
+    service = auth.get_service()
+
+    print("Checking Photos folder in shared drive...")
+    print("-" * 60)
+
+    # Get folder info
+    try:
+        folder_info = service.files().get(
+            fileId=photos_folder_id,
+            supportsAllDrives=True,
+            fields="id, name, mimeType"
+        ).execute()
+        print(f"✓ Found folder: {folder_info['name']}")
+    except Exception as e:
+        print(f"✗ Error getting folder info: {e}")
+
+    # Count files in the Photos folder
+    print("\nCounting files in Photos folder...")
+    common = dict(
         corpora='drive',
         driveId=shared_drive_id,
         includeItemsFromAllDrives=True,
         supportsAllDrives=True,
-        fields='nextPageToken, files(id, name, mimeType)',
-        pageToken=page_token,
-        pageSize=100
-    ).execute()
-    
-    items = results.get('files', [])
-    
-    for item in items:
-        total_count += 1
-        if item['mimeType'].startswith('image/'):
-            image_count += 1
-            if image_count <= 5:
-                print(f"  🖼️ {item['name']}")
-    
-    page_token = results.get('nextPageToken', None)
-    if page_token is None:
-        break
-
-print(f"\nTotal files: {total_count}")
-print(f"Total images: {image_count}")
\ No newline at end of file
+    )
+
+    # Let Drive do the filtering: one query for all non-folder items and one
+    # for images only, both sent in the same batch.
+    listings = cached_list(
+        service,
+        {
+            'total': dict(
+                q=(f"'{photos_folder_id}' in parents and trashed=false "
+                   "and mimeType != 'application/vnd.google-apps.folder'"),
+                fields='nextPageToken, files(id)',
+                **common
+            ),
+            'images': dict(
+                q=f"'{photos_folder_id}' in parents and trashed=false and mimeType contains 'image/'",
+                fields='nextPageToken, files(name)',
+                **common
+            ),
+        },
+        page_size=1000,
+        refresh=args.refresh
+    )
+
+    total_count = len(listings['total'])
+    image_count = len(listings['images'])
+
+    for item in listings['images'][:5]:
+        print(f"  🖼️ {item['name']}")
+
+    print(f"\nTotal files: {total_count}")
+    print(f"Total images: {image_count}")
+
+
+if __name__ == '__main__':
+    main()
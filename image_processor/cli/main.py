@@ -1,20 +1,49 @@
 """Main CLI interface for Google Drive Image Processor."""
 
 import click
+import functools
+from contextlib import closing
 import logging
 from pathlib import Path
 import sys
 import os
 
 from ..core.config import Config
-from ..database import DatabaseConnection, FileRepository
-from ..google_drive import GoogleDriveAuth, GoogleDriveService
-from ..vision import VisionAnalysisService
-from ..vision.together_client import TogetherVisionClient
 from ..utils.logging import setup_logging
 
 logger = logging.getLogger(__name__)
 
+# Files checked against the database and inserted per transaction during discovery
+DISCOVER_BATCH_SIZE = 500
+
+# Most recently completed files, read backwards along idx_files_status_processed
+_RECENT_COMPLETED_SQL = """
+    SELECT id, filename, processed_at
+    FROM files
+    WHERE processing_status='completed'
+    ORDER BY processed_at DESC
+    LIMIT ?
+"""
+_EXPORT_COMPLETED_SQL = """
+    SELECT id, filename, drive_file_id, file_path, mime_type, created_date, modified_date,
+           width, height, creator, description, processed_at
+    FROM files
+    WHERE processing_status='completed'
+    ORDER BY processed_at DESC
+    LIMIT ?
+"""
+# Columns of the tables repair_schema migrates, as (table, column) rows
+_TABLE_COLUMNS_SQL = """
+    SELECT m.name, p.name
+    FROM sqlite_master AS m, pragma_table_info(m.name) AS p
+    WHERE m.type='table' AND m.name IN ('files', 'metadata')
+"""
+# Only touches rows that are not already reset
+_RESET_STATUS_SQL = """
+    UPDATE files SET processing_status='pending', processed_at=NULL, error_message=NULL
+    WHERE (processing_status != 'pending' OR processed_at IS NOT NULL OR error_message IS NOT NULL)
+"""
+
 
 @click.group()
 @click.option('--config', '-c', 'config_path', 
@@ -27,7 +56,21 @@ def cli(ctx, config_path, verbose):
     # Setup logging
     log_level = logging.DEBUG if verbose else logging.INFO
     setup_logging(log_level)
-    # Load environment variables from .env if present (without requiring python-dotenv)
+    
+    # Store config in context
+    ctx.ensure_object(dict)
+    ctx.obj['config_path'] = config_path
+    ctx.obj['verbose'] = verbose
+
+
+@functools.lru_cache(maxsize=None)
+def _load_env():
+    """Load environment variables from .env if present, once per process.
+    
+    Only the commands that talk to Google or a vision API need these (API keys),
+    so they call this instead of every invocation paying for it.
+    """
+    # Works without python-dotenv installed
     try:
         from dotenv import load_dotenv  # type: ignore
         load_dotenv()
@@ -45,23 +88,18 @@ def cli(ctx, config_path, verbose):
                     os.environ.setdefault(key, val)
             except Exception:
                 pass
-    
-    # Store config in context
-    ctx.ensure_object(dict)
-    ctx.obj['config_path'] = config_path
-    ctx.obj['verbose'] = verbose
 
 
 def load_config(ctx, check_credentials=True):
     """Load configuration helper."""
     if 'config' not in ctx.obj:
         try:
+            # Cached by Config.from_file while the file is unchanged
             config = Config.from_file(ctx.obj['config_path'])
             config.validate(check_credentials=check_credentials)
             ctx.obj['config'] = config
         except Exception as e:
-            click.echo(f"Error loading configuration: {e}", err=True)
-            sys.exit(1)
+            raise click.ClickException(f"Failed to load configuration: {e}") from e
     return ctx.obj['config']
 
 
@@ -69,9 +107,12 @@ def load_config(ctx, check_credentials=True):
 @click.pass_context
 def test_auth(ctx):
     """Test Google Drive authentication."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
     
     try:
+        from ..google_drive import GoogleDriveAuth
+        
         click.echo("Testing Google Drive authentication...")
         auth = GoogleDriveAuth(config.google_drive.credentials_path)
         service = auth.get_service()
@@ -84,8 +125,7 @@ def test_auth(ctx):
         click.echo(f"  Email: {user.get('emailAddress', 'Unknown')}")
         
     except Exception as e:
-        click.echo(f"✗ Authentication failed: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(f"Authentication failed: {e}") from e
 
 
 @cli.command()
@@ -93,15 +133,18 @@ def test_auth(ctx):
 @click.pass_context
 def count_files(ctx, folder_id):
     """Count media files in Google Drive."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
     
     try:
+        from ..google_drive import GoogleDriveAuth, GoogleDriveService
+        
         click.echo("Connecting to Google Drive...")
         auth = GoogleDriveAuth(config.google_drive.credentials_path)
         drive_service = GoogleDriveService(config.google_drive, auth)
         
         click.echo("Counting files...")
-        counts = drive_service.get_file_count(folder_id)
+        counts = drive_service.count_by_mime(folder_id)
         
         click.echo("\nFile counts:")
         click.echo(f"  Total files: {counts['total']}")
@@ -110,49 +153,110 @@ def count_files(ctx, folder_id):
         click.echo(f"  Other: {counts['other']}")
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
+
+
+def _store_new_files(file_repo, media_files, known_ids, max_new=None):
+    """Insert the files whose IDs are not in known_ids; returns (created, skipped).
+    
+    known_ids is updated with the IDs that get inserted.
+    """
+    new_files = []
+    skipped = 0
+    
+    for media_file in media_files:
+        if media_file.drive_file_id in known_ids:
+            skipped += 1
+            continue
+        if max_new is not None and len(new_files) >= max_new:
+            break
+        known_ids.add(media_file.drive_file_id)
+        new_files.append(media_file)
+    
+    # Rows inserted concurrently by another process are dropped by ON CONFLICT
+    created = file_repo.create_many(new_files)
+    return created, skipped + len(new_files) - created
 
 
 @cli.command()
 @click.option('--folder-id', '-f', help='Google Drive folder ID to discover files in')
 @click.option('--limit', '-l', type=int, help='Limit number of files to discover')
+@click.option('--batch-size', type=click.IntRange(min=1), default=DISCOVER_BATCH_SIZE,
+              show_default=True, help='Files inserted per database transaction')
+@click.option('--bulk', is_flag=True,
+              help='Drop secondary indexes on files during the load and rebuild them afterwards')
 @click.pass_context
-def discover(ctx, folder_id, limit):
+def discover(ctx, folder_id, limit, batch_size, bulk):
     """Discover media files in Google Drive and add to database."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
     
     try:
+        from ..google_drive import GoogleDriveAuth, GoogleDriveService
+        
         # Initialize services
         click.echo("Initializing services...")
         auth = GoogleDriveAuth(config.google_drive.credentials_path)
         drive_service = GoogleDriveService(config.google_drive, auth)
         
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection, FileRepository
+        db_connection = DatabaseConnection.get(config.database)
         file_repo = FileRepository(db_connection)
         
-        # Start discovery
+        # Start discovery, checking and inserting files in batches
         click.echo("Starting file discovery...")
         discovered = 0
         skipped = 0
-        
-        for media_file in drive_service.discover_media_files(folder_id):
-            if limit and discovered >= limit:
-                break
-            
-            # Check if file already exists
-            if file_repo.exists(media_file.drive_file_id):
-                skipped += 1
-                if skipped % 10 == 0:
-                    click.echo(f"  Skipped {skipped} existing files...")
-                continue
-            
-            # Add to database
-            file_id = file_repo.create(media_file)
-            discovered += 1
-            
-            if discovered % 10 == 0:
-                click.echo(f"  Discovered {discovered} new files...")
+        buffer = []
+        known_ids = file_repo.all_drive_ids()
+        
+        def flush():
+            nonlocal discovered, skipped
+            remaining = limit - discovered if limit else None
+            created, existing = _store_new_files(file_repo, buffer, known_ids, remaining)
+            discovered += created
+            skipped += existing
+            buffer.clear()
+        
+        completed = False
+        if bulk:
+            file_repo.suspend_indexes()
+        try:
+            # The total is unknown until the walk finishes, so the bar shows a running
+            # position; it redraws in place at a bounded rate instead of echoing per batch.
+            # closing() stops any folder listings still running after an early break
+            # or an error
+            with closing(drive_service.discover_media_files(folder_id)) as media_files, \
+                    click.progressbar(
+                        media_files,
+                        label='Discovering',
+                        show_pos=True,
+                        item_show_func=lambda _: f"{discovered} new, {skipped} existing"
+                    ) as bar:
+                for media_file in bar:
+                    buffer.append(media_file)
+                    
+                    batch_target = batch_size
+                    if limit:
+                        batch_target = min(batch_target, limit - discovered)
+                    if len(buffer) >= batch_target:
+                        flush()
+                        if limit and discovered >= limit:
+                            break
+                
+                if buffer and not (limit and discovered >= limit):
+                    flush()
+            completed = True
+        finally:
+            if bulk:
+                click.echo("Rebuilding indexes...")
+                try:
+                    file_repo.rebuild_indexes()
+                except Exception:
+                    if completed:
+                        raise
+                    # Keep the original error; the next start recreates the indexes
+                    logger.exception("Rebuilding indexes failed")
         
         click.echo(f"\n✓ Discovery complete!")
         click.echo(f"  New files: {discovered}")
@@ -165,9 +269,8 @@ def discover(ctx, folder_id, limit):
             click.echo(f"  {status}: {count}")
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Discovery failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -177,33 +280,34 @@ def stats(ctx):
     config = load_config(ctx, check_credentials=False)
     
     try:
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection, FileRepository
+        db_connection = DatabaseConnection.get(config.database, read_only=True, initialize=False)
         file_repo = FileRepository(db_connection)
         
-        stats = file_repo.get_processing_stats()
-        
-        # Get detailed stats by file type
-        detailed_stats = file_repo.get_detailed_stats()
-        
-        click.echo("=== File Type Summary ===")
-        click.echo(f"Total files: {detailed_stats['total']}")
-        click.echo(f"Images: {detailed_stats['images']}")
-        click.echo(f"Videos: {detailed_stats['videos']}")
+        # Status and file type counts from one grouped query
+        detailed_stats = file_repo.summary()
         
-        click.echo("\n=== Image Processing Status ===")
-        click.echo(f"Completed: {detailed_stats['images_completed']}")
-        click.echo(f"Pending: {detailed_stats['images_pending']}")
-        click.echo(f"Failed: {detailed_stats['images_failed']}")
+        lines = [
+            "=== File Type Summary ===",
+            f"Total files: {detailed_stats['total']}",
+            f"Images: {detailed_stats['images']}",
+            f"Videos: {detailed_stats['videos']}",
+            "\n=== Image Processing Status ===",
+            f"Completed: {detailed_stats['images_completed']}",
+            f"Pending: {detailed_stats['images_pending']}",
+            f"Failed: {detailed_stats['images_failed']}",
+        ]
         
         if detailed_stats['images_failed'] > 0:
-            click.echo("\n⚠️  Failed images need attention - these are actual processing errors")
+            lines.append("\n⚠️  Failed images need attention - these are actual processing errors")
         
         if detailed_stats['images_pending'] > 0:
-            click.echo(f"\n▶️  Ready to process {detailed_stats['images_pending']} pending images")
+            lines.append(f"\n▶️  Ready to process {detailed_stats['images_pending']} pending images")
+        
+        click.echo("\n".join(lines))
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -214,57 +318,57 @@ def show_file(ctx, file_id):
     config = load_config(ctx, check_credentials=False)
     
     try:
-        from ..database import MetadataRepository, ActivityTagRepository
-        
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection, FileRepository
+        db_connection = DatabaseConnection.get(config.database, read_only=True, initialize=False)
         file_repo = FileRepository(db_connection)
-        metadata_repo = MetadataRepository(db_connection)
-        tag_repo = ActivityTagRepository(db_connection)
         
-        # Get file with URLs
-        file_info = file_repo.get_file_with_drive_url(file_id)
+        # File info, metadata and tags in a single query
+        file_info = file_repo.get_file_details(file_id)
         if not file_info:
             click.echo(f"File with ID {file_id} not found", err=True)
             sys.exit(1)
         
-        # Get metadata if available
-        metadata = metadata_repo.get_by_file_id(file_id)
-        
-        # Display file info
-        click.echo(f"=== File Information ===")
-        click.echo(f"ID: {file_info['id']}")
-        click.echo(f"Filename: {file_info['filename']}")
-        click.echo(f"Path: {file_info['file_path']}")
-        click.echo(f"Type: {file_info['mime_type']}")
-        click.echo(f"Status: {file_info['processing_status']}")
-        click.echo(f"Google Drive URL: {file_info['drive_url']}")
-        click.echo(f"Direct Download: {file_info['drive_download_url']}")
+        metadata = file_info['metadata']
+        
+        # Build the report and write it in one go
+        lines = [
+            "=== File Information ===",
+            f"ID: {file_info['id']}",
+            f"Filename: {file_info['filename']}",
+            f"Path: {file_info['file_path']}",
+            f"Type: {file_info['mime_type']}",
+            f"Status: {file_info['processing_status']}",
+            f"Google Drive URL: {file_info['drive_url']}",
+            f"Direct Download: {file_info['drive_download_url']}",
+            "\n=== Analysis Results ===",
+        ]
         
         if metadata:
-            click.echo(f"\n=== Analysis Results ===")
-            click.echo(f"Subject: {metadata.primary_subject}")
-            click.echo(f"Visual Quality: {metadata.visual_quality}/5")
-            click.echo(f"Has People: {metadata.has_people} ({metadata.people_count})")
-            click.echo(f"Indoor/Outdoor: {'Indoor' if metadata.is_indoor else 'Outdoor'}")
-            click.echo(f"Social Media Score: {metadata.social_media_score}/5 - {metadata.social_media_reason}")
-            click.echo(f"Marketing Score: {metadata.marketing_score}/5 - {metadata.marketing_use}")
+            lines.extend([
+                f"Subject: {metadata.primary_subject}",
+                f"Visual Quality: {metadata.visual_quality}/5",
+                f"Has People: {metadata.has_people} ({metadata.people_count})",
+                f"Indoor/Outdoor: {'Indoor' if metadata.is_indoor else 'Outdoor'}",
+                f"Social Media Score: {metadata.social_media_score}/5 - {metadata.social_media_reason}",
+                f"Marketing Score: {metadata.marketing_score}/5 - {metadata.marketing_use}",
+            ])
             
             if metadata.activity_tags:
-                click.echo(f"Activity Tags: {', '.join(metadata.activity_tags)}")
+                lines.append(f"Activity Tags: {', '.join(metadata.activity_tags)}")
             
             if metadata.season:
-                click.echo(f"Season: {metadata.season}")
+                lines.append(f"Season: {metadata.season}")
             
             if metadata.notes:
-                click.echo(f"\nContext Notes:")
-                click.echo(f"{metadata.notes}")
+                lines.append("\nContext Notes:")
+                lines.append(f"{metadata.notes}")
         else:
-            click.echo(f"\n=== Analysis Results ===")
-            click.echo("Not yet processed")
+            lines.append("Not yet processed")
+        
+        click.echo("\n".join(lines))
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -274,29 +378,102 @@ def list_recent(ctx, limit):
     """List recently processed files with their database IDs."""
     config = load_config(ctx, check_credentials=False)
     try:
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection
+        db_connection = DatabaseConnection.get(config.database, read_only=True, initialize=False)
         with db_connection.get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT id, filename, processed_at
-                FROM files
-                WHERE processing_status='completed'
-                ORDER BY processed_at DESC
-                LIMIT ?
-                """,
-                (limit,)
-            )
+            cur.execute(_RECENT_COMPLETED_SQL, (limit,))
             rows = cur.fetchall()
             if not rows:
                 click.echo("No completed files yet.")
                 return
-            click.echo("ID\tProcessed At\tFilename")
-            for row in rows:
-                click.echo(f"{row[0]}\t{row[2]}\t{row[1]}")
+            # One echo for the whole listing instead of a write per row
+            lines = ["ID\tProcessed At\tFilename"]
+            lines.extend(f"{row[0]}\t{row[2]}\t{row[1]}" for row in rows)
+            click.echo("\n".join(lines))
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
+
+
+def _export_records(cursor, metadata_repo, chunk_size=500):
+    """Yield export_results entries for the files rows in cursor.
+    
+    Metadata and tags are looked up for a chunk of rows at a time rather
+    than with queries per file.
+    """
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        metadata = metadata_repo.get_by_file_ids([row[0] for row in rows])
+        for row in rows:
+            yield _export_record(row, metadata.get(row[0]))
+
+
+def _export_record(row, meta):
+    """Build one export_results entry from a files row and its metadata."""
+    file_id = row[0]
+    return {
+        'file': {
+            'id': file_id,
+            'filename': row[1],
+            'drive_file_id': row[2],
+            'path': row[3],
+            'mime_type': row[4],
+            'created_date': str(row[5]),
+            'modified_date': str(row[6]),
+            'width': row[7],
+            'height': row[8],
+            'creator': row[9],
+            'description': row[10],
+            'processed_at': str(row[11]),
+        },
+        'metadata': None if not meta else {
+            'primary_subject': meta.primary_subject,
+            'visual_quality': meta.visual_quality,
+            'has_people': meta.has_people,
+            'people_count': meta.people_count,
+            'is_indoor': meta.is_indoor,
+            'social_media_score': meta.social_media_score,
+            'social_media_reason': meta.social_media_reason,
+            'marketing_score': meta.marketing_score,
+            'marketing_use': meta.marketing_use,
+            'activity_tags': meta.activity_tags,
+            'season': meta.season,
+            'time_of_day': meta.time_of_day,
+            'mood_energy': meta.mood_energy,
+            'color_palette': meta.color_palette,
+            'file_path_notes': meta.notes,
+            'extracted_at': str(meta.extracted_at),
+        }
+    }
+
+
+def _write_json_array(path, items):
+    """Write items to path as a JSON array, one element at a time; returns the count.
+    
+    The output matches json.dumps(list(items), indent=2, ensure_ascii=False)
+    without holding the whole list or the full document in memory. It is
+    written to a temporary file next to path and moved into place only once
+    complete, so a failure partway leaves any existing file untouched.
+    """
+    from ..utils import fastjson
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for item in items:
+                f.write(b',\n  ' if count else b'[\n  ')
+                # Strings never contain raw newlines in JSON, so this only re-indents
+                f.write(fastjson.dumps_indented(item).replace(b'\n', b'\n  '))
+                count += 1
+            f.write(b'\n]' if count else b'[]')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return count
 
 
 @cli.command()
@@ -305,76 +482,35 @@ def list_recent(ctx, limit):
 @click.pass_context
 def export_results(ctx, limit, output):
     """Export recent LLM results to a JSON file (file info + extracted metadata)."""
-    import json as _json
-    from pathlib import Path as _P
     config = load_config(ctx, check_credentials=False)
     try:
-        db = DatabaseConnection(config.database)
-        file_repo = FileRepository(db)
-        from ..database import MetadataRepository, ActivityTagRepository
+        from ..database import DatabaseConnection, MetadataRepository
+        db = DatabaseConnection.get(config.database, read_only=True, initialize=False)
         metadata_repo = MetadataRepository(db)
-        tag_repo = ActivityTagRepository(db)
 
         with db.get_connection() as conn:
             cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT id, filename, drive_file_id, file_path, mime_type, created_date, modified_date,
-                       width, height, creator, description, processed_at
-                FROM files
-                WHERE processing_status='completed'
-                ORDER BY processed_at DESC
-                LIMIT ?
-                """,
-                (limit,)
-            )
-            rows = cur.fetchall()
-
-        results = []
-        for row in rows:
-            file_id = row[0]
-            meta = metadata_repo.get_by_file_id(file_id)
-            tags = tag_repo.get_tags(file_id)
-            results.append({
-                'file': {
-                    'id': file_id,
-                    'filename': row[1],
-                    'drive_file_id': row[2],
-                    'path': row[3],
-                    'mime_type': row[4],
-                    'created_date': str(row[5]),
-                    'modified_date': str(row[6]),
-                    'width': row[7],
-                    'height': row[8],
-                    'creator': row[9],
-                    'description': row[10],
-                    'processed_at': str(row[11]),
-                },
-                'metadata': None if not meta else {
-                    'primary_subject': meta.primary_subject,
-                    'visual_quality': meta.visual_quality,
-                    'has_people': meta.has_people,
-                    'people_count': meta.people_count,
-                    'is_indoor': meta.is_indoor,
-                    'social_media_score': meta.social_media_score,
-                    'social_media_reason': meta.social_media_reason,
-                    'marketing_score': meta.marketing_score,
-                    'marketing_use': meta.marketing_use,
-                    'activity_tags': tags,
-                    'season': meta.season,
-                    'time_of_day': meta.time_of_day,
-                    'mood_energy': meta.mood_energy,
-                    'color_palette': meta.color_palette,
-                    'file_path_notes': meta.notes,
-                    'extracted_at': str(meta.extracted_at),
-                }
-            })
+            cur.execute(_EXPORT_COMPLETED_SQL, (limit,))
+            # Records are built from the cursor as they are written out
+            count = _write_json_array(output, _export_records(cur, metadata_repo))
 
-        _P(output).write_text(_json.dumps(results, indent=2))
-        click.echo(f"✓ Exported {len(results)} records to {output}")
+        click.echo(f"✓ Exported {count} records to {output}")
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
+
+
+@cli.command()
+@click.pass_context
+def check_config(ctx):
+    """Validate the configuration file without needing credentials, the database or the network.
+
+    Exits with status 1 and the first problem found if the file is invalid,
+    so CI can lint configs that reference secrets it does not have.
+    """
+    load_config(ctx, check_credentials=False)
+    click.echo(f"✓ Configuration is valid: {ctx.obj['config_path']}")
+
+
 @cli.command()
 @click.pass_context
 def init_db(ctx):
@@ -383,23 +519,27 @@ def init_db(ctx):
     
     try:
         click.echo("Initializing database...")
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection
+        db_connection = DatabaseConnection.get(config.database)
         click.echo(f"✓ Database initialized at: {config.database.path}")
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
 @click.pass_context
 def test_vision(ctx):
     """Test vision model connection."""
+    _load_env()
     config = load_config(ctx, check_credentials=False)
     
     try:
+        from ..vision import VisionAnalysisService
+        
         click.echo("Testing vision model connection...")
-        vision_service = VisionAnalysisService(config)
+        # Closed with the click context once the command finishes
+        vision_service = ctx.with_resource(VisionAnalysisService(config))
         
         if vision_service.test_vision_connection():
             click.echo("✓ Vision model connection successful")
@@ -408,44 +548,54 @@ def test_vision(ctx):
             sys.exit(1)
             
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
 @click.option('--limit', '-l', type=int, help='Limit number of files to process')
 @click.option('--file-id', type=int, help='Process specific file by database ID')
+@click.option('--workers', '-w', type=click.IntRange(min=1),
+              help='Files processed concurrently (defaults to processing.concurrent_workers)')
 @click.option('--ab-compare', is_flag=True, help='Run A/B across two Together models and export JSON for comparison')
 @click.option('--model-a', type=str, default='meta-llama/Llama-3.2-90B-Vision-Instruct-Turbo', help='Together model A')
 @click.option('--model-b', type=str, default='Qwen/Qwen2.5-VL-72B-Instruct', help='Together model B')
 @click.option('--export', type=click.Path(), default='together_ab_results.json', help='Output JSON file for A/B')
 @click.pass_context
-def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
+def process(ctx, limit, file_id, workers, ab_compare, model_a, model_b, export):
     """Process pending files with vision analysis."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
     
     try:
+        from ..vision import VisionAnalysisService
+        
         click.echo("Initializing vision analysis service...")
-        vision_service = VisionAnalysisService(config)
+        # Closed with the click context once the command finishes
+        vision_service = ctx.with_resource(VisionAnalysisService(config))
         
         if ab_compare:
             # A/B evaluate N images using Together AI on two models; export merged JSON
-            from ..database import FileRepository
+            from ..database import DatabaseConnection, FileRepository
+            from ..google_drive import GoogleDriveAuth, GoogleDriveService
+            from ..vision.together_client import TogetherVisionClient
+            from ..utils.rate_limit import RateLimiter
+            from concurrent.futures import ThreadPoolExecutor, as_completed
             config = load_config(ctx, check_credentials=True)
-            db = DatabaseConnection(config.database)
+            db = DatabaseConnection.get(config.database)
             file_repo = FileRepository(db)
             # Fetch a larger window then take the first N images to avoid selecting videos
             window = max(200, (limit or 10) * 5)
             candidates = file_repo.get_pending_files(window)
             files = [f for f in candidates if str(f.mime_type).startswith('image/')][: (limit or 10)]
-            tvc = TogetherVisionClient(max_tokens=config.vision_model.max_tokens, max_retries=config.vision_model.max_retries)
-
-            results = []
-            import time as _t
-            for f in files:
-                if not f.mime_type.startswith('image/'):
-                    continue
-                image_bytes = GoogleDriveService(config.google_drive, GoogleDriveAuth(config.google_drive.credentials_path)).download_file(f.drive_file_id)
+            # Files run concurrently; every request to either model shares one rate limit
+            limiter = RateLimiter(config.vision_model.requests_per_second)
+            tvc = ctx.with_resource(closing(TogetherVisionClient(max_tokens=config.vision_model.max_tokens, max_retries=config.vision_model.max_retries, rate_limiter=limiter)))
+            # One Drive service for every file: credentials load once and each
+            # worker thread keeps its own keep-alive client
+            drive_service = GoogleDriveService(config.google_drive, GoogleDriveAuth(config.google_drive.credentials_path))
+
+            def run_one(f):
+                image_bytes = drive_service.download_file(f.drive_file_id)
                 a = None
                 b = None
                 a_err = None
@@ -454,13 +604,11 @@ def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
                     a = tvc.analyze_image(image_bytes, f.filename, f.file_path, model_a)
                 except Exception as e:
                     a_err = str(e)
-                # small delay to avoid hammering endpoint
-                _t.sleep(0.5)
                 try:
                     b = tvc.analyze_image(image_bytes, f.filename, f.file_path, model_b)
                 except Exception as e:
                     b_err = str(e)
-                results.append({
+                return {
                     'file': {
                         'id': f.id,
                         'drive_file_id': f.drive_file_id,
@@ -473,7 +621,14 @@ def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
                     'model_b': model_b,
                     'result_b': b,
                     'error_b': b_err
-                })
+                }
+
+            # Keep the export in selection order regardless of completion order
+            results = [None] * len(files)
+            with ThreadPoolExecutor(max_workers=config.vision_model.max_concurrency) as executor:
+                futures = {executor.submit(run_one, f): i for i, f in enumerate(files)}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
             import json
             from pathlib import Path as _P
             _P(export).write_text(json.dumps(results, indent=2))
@@ -493,7 +648,7 @@ def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
         else:
             # Process pending files
             click.echo("Processing pending files...")
-            results = vision_service.process_pending_files(limit)
+            results = vision_service.process_pending_files(limit, max_workers=workers)
             
             click.echo(f"\nProcessing complete!")
             click.echo(f"  Processed: {results['processed']}")
@@ -506,9 +661,8 @@ def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
                 click.echo(f"  {status}: {count}")
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Processing failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -516,11 +670,15 @@ def process(ctx, limit, file_id, ab_compare, model_a, model_b, export):
 @click.pass_context
 def reprocess_failed(ctx, limit):
     """Reprocess files that previously failed."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
     
     try:
+        from ..vision import VisionAnalysisService
+        
         click.echo("Initializing vision analysis service...")
-        vision_service = VisionAnalysisService(config)
+        # Closed with the click context once the command finishes
+        vision_service = ctx.with_resource(VisionAnalysisService(config))
         
         click.echo("Reprocessing failed files...")
         results = vision_service.reprocess_failed_files(limit)
@@ -536,9 +694,8 @@ def reprocess_failed(ctx, limit):
             click.echo(f"  {status}: {count}")
         
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Reprocessing failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -548,30 +705,31 @@ def repair_schema(ctx):
     config = load_config(ctx, check_credentials=False)
 
     try:
-        db_connection = DatabaseConnection(config.database)
-        with db_connection.get_connection() as conn:
+        from ..database import DatabaseConnection
+        db_connection = DatabaseConnection.get(config.database)
+        # One write transaction, so a repair that is interrupted or races
+        # another migration leaves the schema as it was
+        with db_connection.transaction(immediate=True) as conn:
             cur = conn.cursor()
 
-            # Ensure files table has required columns
-            cur.execute("PRAGMA table_info(files)")
-            cols = {row[1] for row in cur.fetchall()}
+            # Columns of both tables in one query
+            cur.execute(_TABLE_COLUMNS_SQL)
+            cols = set()
+            mcols = set()
+            for table, column in cur.fetchall():
+                (cols if table == 'files' else mcols).add(column)
             added = []
 
-            if 'width' not in cols:
-                cur.execute("ALTER TABLE files ADD COLUMN width INTEGER")
-                added.append('width')
-            if 'height' not in cols:
-                cur.execute("ALTER TABLE files ADD COLUMN height INTEGER")
-                added.append('height')
-            if 'creator' not in cols:
-                cur.execute("ALTER TABLE files ADD COLUMN creator TEXT")
-                added.append('creator')
-            if 'description' not in cols:
-                cur.execute("ALTER TABLE files ADD COLUMN description TEXT")
-                added.append('description')
-
-            # Ensure metadata_versions table exists
-            cur.executescript(
+            # Ensure files table has required columns
+            for column, column_type in (('width', 'INTEGER'), ('height', 'INTEGER'),
+                                        ('creator', 'TEXT'), ('description', 'TEXT')):
+                if column not in cols:
+                    cur.execute(f"ALTER TABLE files ADD COLUMN {column} {column_type}")
+                    added.append(column)
+
+            # Ensure metadata_versions table exists (executescript would commit
+            # the transaction, so the statements run one at a time)
+            cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS metadata_versions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -581,14 +739,12 @@ def repair_schema(ctx):
                     edited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     edited_by TEXT,
                     UNIQUE(file_id, version)
-                );
-                CREATE INDEX IF NOT EXISTS idx_versions_file_id ON metadata_versions(file_id);
+                )
                 """
             )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_versions_file_id ON metadata_versions(file_id)")
 
             # Ensure metadata table has file_path_notes column (migration from notes)
-            cur.execute("PRAGMA table_info(metadata)")
-            mcols = {row[1] for row in cur.fetchall()}
             if 'file_path_notes' not in mcols:
                 cur.execute("ALTER TABLE metadata ADD COLUMN file_path_notes TEXT")
                 # Backfill from legacy 'notes' if present
@@ -598,6 +754,13 @@ def repair_schema(ctx):
                     except Exception:
                         pass
 
+            # Ensure the status index used by reset-status exists
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_files_status ON files(processing_status)")
+
+            # Ensure the partial index used by backfill-drive-metadata exists
+            from ..database.schema import create_backfill_index
+            create_backfill_index(cur)
+
             # Ensure schema_version table exists and record v4
             cur.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
             cur.execute("INSERT OR IGNORE INTO schema_version (version) VALUES (?)", (4,))
@@ -606,9 +769,8 @@ def repair_schema(ctx):
             click.echo(msg)
 
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Schema repair failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 
 @cli.command()
@@ -619,20 +781,50 @@ def reset_status(ctx, include_videos):
     config = load_config(ctx, check_credentials=False)
 
     try:
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection
+        db_connection = DatabaseConnection.get(config.database, initialize=False)
         with db_connection.get_connection() as conn:
             cur = conn.cursor()
+            # Rows that are already reset are left alone, so rowcount is the
+            # number of files that actually changed
             if include_videos:
-                cur.execute("UPDATE files SET processing_status='pending', processed_at=NULL, error_message=NULL")
-                updated = cur.rowcount
+                cur.execute(_RESET_STATUS_SQL)
             else:
-                cur.execute("UPDATE files SET processing_status='pending', processed_at=NULL, error_message=NULL WHERE mime_type LIKE 'image%'")
-                updated = cur.rowcount
+                cur.execute(_RESET_STATUS_SQL + " AND mime_type LIKE 'image%'")
+            updated = cur.rowcount
         click.echo(f"Reset processing status to 'pending' for {updated} files.")
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Reset status failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
+
+
+def _drive_metadata_fields(info):
+    """Derive (creator, description, width, height) from a Drive file resource, as discover does."""
+    # Creator
+    creator = None
+    owners = (info.get('owners') or []) if isinstance(info.get('owners'), list) else []
+    if owners:
+        owner0 = owners[0]
+        creator = owner0.get('displayName') or owner0.get('emailAddress')
+    if not creator:
+        last_user = info.get('lastModifyingUser') or {}
+        creator = last_user.get('displayName') or last_user.get('emailAddress')
+
+    description = info.get('description')
+
+    # Dimensions
+    img_meta = info.get('imageMediaMetadata') or {}
+    vid_meta = info.get('videoMediaMetadata') or {}
+    width = img_meta.get('width') or vid_meta.get('width')
+    height = img_meta.get('height') or vid_meta.get('height')
+    try:
+        width = int(width) if width is not None else None
+        height = int(height) if height is not None else None
+    except Exception:
+        width = None if width is None else width
+        height = None if height is None else height
+    return creator, description, width, height
+
 
 @cli.command()
 @click.option('--batch-size', type=int, default=100, help='Number of files per backfill batch')
@@ -641,82 +833,72 @@ def reset_status(ctx, include_videos):
 @click.pass_context
 def backfill_drive_metadata(ctx, batch_size, resume_from_id, limit):
     """Backfill missing creator/description/dimensions from Google Drive for existing files."""
+    _load_env()
     config = load_config(ctx, check_credentials=True)
 
     try:
+        from concurrent.futures import ThreadPoolExecutor
+        from ..google_drive import GoogleDriveAuth, GoogleDriveService
+        from ..google_drive.service import DRIVE_METADATA_FIELDS
+        
         click.echo("Initializing Drive backfill...")
         auth = GoogleDriveAuth(config.google_drive.credentials_path)
         drive_service = GoogleDriveService(config.google_drive, auth)
 
-        db_connection = DatabaseConnection(config.database)
+        from ..database import DatabaseConnection, FileRepository
+        db_connection = DatabaseConnection.get(config.database)
         file_repo = FileRepository(db_connection)
 
         updated = 0
         last_id = resume_from_id
 
-        while True:
-            batch = file_repo.get_missing_drive_fields_batch(last_id=last_id, batch_size=batch_size)
-            if not batch:
-                break
-
-            click.echo(f"Processing batch starting after id {last_id} (size={len(batch)})...")
-
-            for media_file in batch:
-                try:
-                    # Fetch fresh file info from Drive
-                    info = drive_service._get_file_info(media_file.drive_file_id)
+        def fetch_info(media_file):
+            # Errors stay per file so one bad lookup doesn't sink the batch
+            try:
+                return drive_service._get_file_info(
+                    media_file.drive_file_id, fields=DRIVE_METADATA_FIELDS
+                )
+            except Exception as e:
+                logger.warning(f"Backfill error for file id {media_file.id}: {e}")
+                return None
+
+        # Drive lookups are independent reads, so each batch is fetched concurrently
+        with ThreadPoolExecutor(max_workers=config.google_drive.traversal_workers) as executor:
+            while True:
+                batch = file_repo.get_missing_drive_fields_batch(last_id=last_id, batch_size=batch_size)
+                if not batch:
+                    break
+                if limit:
+                    batch = batch[:limit - updated]
+
+                click.echo(f"Processing batch starting after id {last_id} (size={len(batch)})...")
+
+                updates = []
+                for media_file, info in zip(batch, executor.map(fetch_info, batch)):
                     if not info:
                         continue
-
-                    # Build derived fields similar to discover path
-                    # Creator
-                    creator = None
-                    owners = (info.get('owners') or []) if isinstance(info.get('owners'), list) else []
-                    if owners:
-                        owner0 = owners[0]
-                        creator = owner0.get('displayName') or owner0.get('emailAddress')
-                    if not creator:
-                        last_user = info.get('lastModifyingUser') or {}
-                        creator = last_user.get('displayName') or last_user.get('emailAddress')
-
-                    description = info.get('description')
-
-                    # Dimensions
-                    width = None
-                    height = None
-                    img_meta = info.get('imageMediaMetadata') or {}
-                    vid_meta = info.get('videoMediaMetadata') or {}
-                    width = img_meta.get('width') or vid_meta.get('width')
-                    height = img_meta.get('height') or vid_meta.get('height')
                     try:
-                        width = int(width) if width is not None else None
-                        height = int(height) if height is not None else None
-                    except Exception:
-                        width = None if width is None else width
-                        height = None if height is None else height
+                        updates.append((media_file.id, *_drive_metadata_fields(info)))
+                    except Exception as e:
+                        logger.warning(f"Backfill error for file id {media_file.id}: {e}")
 
-                    # Update DB (only fill missing using COALESCE inside repo)
-                    file_repo.update_drive_metadata(media_file.id, creator, description, width, height)
+                # One transaction per batch; COALESCE in the repo keeps stored values
+                # where Drive has none
+                updated += file_repo.update_drive_metadata_many(updates)
 
-                    updated += 1
-                    last_id = media_file.id
+                # Files whose lookup failed are skipped rather than fetched again
+                last_id = batch[-1].id
 
-                    if limit and updated >= limit:
-                        click.echo(f"Reached limit {limit}, stopping.")
-                        click.echo(f"Updated {updated} files. Last processed id: {last_id}")
-                        return
-
-                except Exception as e:
-                    logger.warning(f"Backfill error for file id {media_file.id}: {e}")
-                    last_id = media_file.id
-                    continue
+                if limit and updated >= limit:
+                    click.echo(f"Reached limit {limit}, stopping.")
+                    click.echo(f"Updated {updated} files. Last processed id: {last_id}")
+                    return
 
         click.echo(f"Backfill complete. Updated {updated} files. Last processed id: {last_id}")
 
     except Exception as e:
-        click.echo(f"Error: {e}", err=True)
         logger.exception("Backfill failed")
-        sys.exit(1)
+        raise click.ClickException(str(e)) from e
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
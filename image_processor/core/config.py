@@ -1,24 +1,78 @@
 """Configuration management for the Google Drive Image Processor."""
 
 import os
-import yaml
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Mapping, Optional
 
 from .exceptions import ConfigurationError
 
+# Config objects are shared (see Config.from_file), so they are immutable;
+# dataclasses.replace() derives modified copies. slots= needs Python 3.10+
+_FROZEN = {'frozen': True, 'slots': True} if sys.version_info >= (3, 10) else {'frozen': True}
 
-@dataclass
+# Accepted values of DatabaseConfig.synchronous
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def sqlite_synchronous(value) -> str:
+    """Normalise a DatabaseConfig.synchronous value to upper-case text.
+
+    YAML reads an unquoted ``off``/``on`` as a boolean; like SQLite itself,
+    false means OFF and true means NORMAL.
+    """
+    if isinstance(value, bool):
+        return 'NORMAL' if value else 'OFF'
+    return str(value).upper()
+
+
+def _positive(value) -> bool:
+    """Validation check for counts and sizes."""
+    return value > 0
+
+
+# Config.validate rules as (section, field, check, error message), in order
+_VALIDATION_RULES = (
+    ('google_drive', 'traversal_workers', _positive,
+     "Google Drive traversal_workers must be positive"),
+    ('vision_model', 'temperature', lambda value: 0 <= value <= 1,
+     "Vision model temperature must be between 0 and 1"),
+    ('vision_model', 'max_tokens', _positive,
+     "Vision model max_tokens must be positive"),
+    ('vision_model', 'max_concurrency', _positive,
+     "Vision model max_concurrency must be positive"),
+    ('database', 'synchronous', lambda value: sqlite_synchronous(value) in SQLITE_SYNCHRONOUS_MODES,
+     f"Database synchronous must be one of {', '.join(SQLITE_SYNCHRONOUS_MODES)}"),
+    ('database', 'cache_size_mb', _positive,
+     "Database cache_size_mb must be positive"),
+    ('database', 'mmap_size_mb', lambda value: value >= 0,
+     "Database mmap_size_mb must not be negative"),
+    ('processing', 'max_file_size_mb', _positive,
+     "Processing max_file_size_mb must be positive"),
+    ('processing', 'concurrent_workers', _positive,
+     "Processing concurrent_workers must be positive"),
+    ('processing', 'thumbnail_size', lambda value: len(value) == 2,
+     "Processing thumbnail_size must be [width, height]"),
+    ('processing', 'thumbnail_size', lambda value: all(size > 0 for size in value),
+     "Processing thumbnail_size values must be positive"),
+)
+
+# Config.from_file results by absolute path, as ((mtime_ns, size), Config)
+_PARSED_CACHE = {}
+
+
+@dataclass(**_FROZEN)
 class GoogleDriveConfig:
     """Google Drive API configuration."""
     credentials_path: str
     root_folder_id: Optional[str] = None
     batch_size: int = 100
     rate_limit_delay: float = 1.0
+    traversal_workers: int = 8
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class VisionModelConfig:
     """Vision model configuration."""
     model_type: str = "gemma-3-4b-it-qat"
@@ -28,34 +82,35 @@ class VisionModelConfig:
     max_tokens: int = 500
     max_retries: int = 3
     timeout_seconds: int = 30
+    max_concurrency: int = 4
+    requests_per_second: float = 2.0
     prompt_template: str = ""
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class DatabaseConfig:
     """Database configuration."""
     type: str = "sqlite"
     path: str = "image_metadata.db"
     backup_enabled: bool = True
     backup_interval_hours: int = 24
+    synchronous: str = "NORMAL"  # PRAGMA synchronous; FULL also syncs every commit
+    cache_size_mb: int = 128  # Page cache per connection
+    mmap_size_mb: int = 256  # Memory-mapped reads; 0 disables
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class ProcessingConfig:
     """Processing configuration."""
-    thumbnail_size: List[int] = None
-    supported_formats: List[str] = None
+    thumbnail_size: List[int] = field(default_factory=lambda: [200, 200])
+    supported_formats: List[str] = field(
+        default_factory=lambda: ["jpg", "jpeg", "png", "gif", "bmp", "tiff"]
+    )
     max_file_size_mb: int = 50
     concurrent_workers: int = 4
 
-    def __post_init__(self):
-        if self.thumbnail_size is None:
-            self.thumbnail_size = [200, 200]
-        if self.supported_formats is None:
-            self.supported_formats = ["jpg", "jpeg", "png", "gif", "bmp", "tiff"]
 
-
-@dataclass
+@dataclass(**_FROZEN)
 class LoggingConfig:
     """Logging configuration."""
     level: str = "INFO"
@@ -64,7 +119,70 @@ class LoggingConfig:
     backup_count: int = 5
 
 
-@dataclass
+def _env_bool(value: str) -> bool:
+    """Parse a boolean environment variable; only "true" (any case) is true."""
+    return value.lower() == 'true'
+
+
+def _load_env_spec(env: Mapping[str, str], spec) -> dict:
+    """Build dataclass keyword arguments from env for a spec table.
+    
+    Variables that are set are converted with the field's caster; the rest
+    take the (already typed) default.
+    """
+    kwargs = {}
+    for name, key, default, cast in spec:
+        # EAFP: one lookup for a set variable instead of a membership test plus a lookup
+        try:
+            value = env[key]
+        except KeyError:
+            kwargs[name] = default
+        else:
+            kwargs[name] = cast(value)
+    return kwargs
+
+
+# Config.from_env fields as (field, variable, default, caster)
+_GOOGLE_DRIVE_ENV = (
+    ('credentials_path', 'GOOGLE_CREDENTIALS_PATH', 'credentials.json', str),
+    ('root_folder_id', 'GOOGLE_ROOT_FOLDER_ID', None, str),
+    ('batch_size', 'GOOGLE_BATCH_SIZE', 100, int),
+    ('rate_limit_delay', 'GOOGLE_RATE_LIMIT_DELAY', 1.0, float),
+    ('traversal_workers', 'GOOGLE_TRAVERSAL_WORKERS', 8, int),
+)
+_VISION_MODEL_ENV = (
+    ('model_type', 'VISION_MODEL_TYPE', 'gemma-3-4b-it-qat', str),
+    ('api_endpoint', 'VISION_API_ENDPOINT', 'http://127.0.0.1:1234', str),
+    ('provider', 'VISION_PROVIDER', 'local', str),
+    ('temperature', 'VISION_TEMPERATURE', 0.4, float),
+    ('max_tokens', 'VISION_MAX_TOKENS', 500, int),
+    ('max_retries', 'VISION_MAX_RETRIES', 3, int),
+    ('timeout_seconds', 'VISION_TIMEOUT_SECONDS', 30, int),
+    ('max_concurrency', 'VISION_MAX_CONCURRENCY', 4, int),
+    ('requests_per_second', 'VISION_REQUESTS_PER_SECOND', 2.0, float),
+)
+_DATABASE_ENV = (
+    ('type', 'DATABASE_TYPE', 'sqlite', str),
+    ('path', 'DATABASE_PATH', 'image_metadata.db', str),
+    ('backup_enabled', 'DATABASE_BACKUP_ENABLED', True, _env_bool),
+    ('backup_interval_hours', 'DATABASE_BACKUP_INTERVAL_HOURS', 24, int),
+    ('synchronous', 'DATABASE_SYNCHRONOUS', 'NORMAL', str),
+    ('cache_size_mb', 'DATABASE_CACHE_SIZE_MB', 128, int),
+    ('mmap_size_mb', 'DATABASE_MMAP_SIZE_MB', 256, int),
+)
+_PROCESSING_ENV = (
+    ('max_file_size_mb', 'PROCESSING_MAX_FILE_SIZE_MB', 50, int),
+    ('concurrent_workers', 'PROCESSING_CONCURRENT_WORKERS', 4, int),
+)
+_LOGGING_ENV = (
+    ('level', 'LOGGING_LEVEL', 'INFO', str),
+    ('file_path', 'LOGGING_FILE_PATH', 'processing.log', str),
+    ('max_file_size_mb', 'LOGGING_MAX_FILE_SIZE_MB', 10, int),
+    ('backup_count', 'LOGGING_BACKUP_COUNT', 5, int),
+)
+
+
+@dataclass(**_FROZEN)
 class Config:
     """Main configuration class."""
     google_drive: GoogleDriveConfig
@@ -75,20 +193,38 @@ class Config:
 
     @classmethod
     def from_file(cls, config_path: str) -> "Config":
-        """Load configuration from YAML file."""
-        config_file = Path(config_path)
+        """Load configuration from YAML file.
+        
+        Parsed files are cached by (mtime, size), so loading an unchanged file
+        again returns the same Config instance without re-parsing it; callers
+        should treat it as read-only.
+        """
+        config_file = Path(config_path).absolute()
         
-        if not config_file.exists():
+        try:
+            st = config_file.stat()
+        except OSError:
             raise ConfigurationError(f"Configuration file not found: {config_path}")
         
+        # The size catches edits landing within the filesystem's timestamp resolution
+        identity = (st.st_mtime_ns, st.st_size)
+        cached = _PARSED_CACHE.get(config_file)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+        
+        # Imported here so from_env and cached loads never pay for PyYAML
+        import yaml
+        # libyaml's C loader when PyYAML was built with it; same safe subset of YAML
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
         try:
             with open(config_file, 'r') as f:
-                config_data = yaml.safe_load(f)
+                config_data = yaml.load(f, Loader=loader)
         except yaml.YAMLError as e:
             raise ConfigurationError(f"Invalid YAML in configuration file: {e}")
         
         try:
-            return cls(
+            config = cls(
                 google_drive=GoogleDriveConfig(**config_data.get('google_drive', {})),
                 vision_model=VisionModelConfig(**config_data.get('vision_model', {})),
                 database=DatabaseConfig(**config_data.get('database', {})),
@@ -97,42 +233,26 @@ class Config:
             )
         except TypeError as e:
             raise ConfigurationError(f"Invalid configuration structure: {e}")
+        
+        _PARSED_CACHE[config_file] = (identity, config)
+        return config
 
     @classmethod
-    def from_env(cls) -> "Config":
-        """Load configuration from environment variables with defaults."""
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "Config":
+        """Load configuration from environment variables with defaults.
+        
+        Args:
+            env: Variables to read instead of os.environ
+        """
+        # One snapshot instead of a lookup on the os.environ proxy per field
+        if env is None:
+            env = dict(os.environ)
         return cls(
-            google_drive=GoogleDriveConfig(
-                credentials_path=os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json'),
-                root_folder_id=os.getenv('GOOGLE_ROOT_FOLDER_ID'),
-                batch_size=int(os.getenv('GOOGLE_BATCH_SIZE', '100')),
-                rate_limit_delay=float(os.getenv('GOOGLE_RATE_LIMIT_DELAY', '1.0'))
-            ),
-            vision_model=VisionModelConfig(
-                model_type=os.getenv('VISION_MODEL_TYPE', 'gemma-3-4b-it-qat'),
-                api_endpoint=os.getenv('VISION_API_ENDPOINT', 'http://127.0.0.1:1234'),
-                provider=os.getenv('VISION_PROVIDER', 'local'),
-                temperature=float(os.getenv('VISION_TEMPERATURE', '0.4')),
-                max_tokens=int(os.getenv('VISION_MAX_TOKENS', '500')),
-                max_retries=int(os.getenv('VISION_MAX_RETRIES', '3')),
-                timeout_seconds=int(os.getenv('VISION_TIMEOUT_SECONDS', '30'))
-            ),
-            database=DatabaseConfig(
-                type=os.getenv('DATABASE_TYPE', 'sqlite'),
-                path=os.getenv('DATABASE_PATH', 'image_metadata.db'),
-                backup_enabled=os.getenv('DATABASE_BACKUP_ENABLED', 'true').lower() == 'true',
-                backup_interval_hours=int(os.getenv('DATABASE_BACKUP_INTERVAL_HOURS', '24'))
-            ),
-            processing=ProcessingConfig(
-                max_file_size_mb=int(os.getenv('PROCESSING_MAX_FILE_SIZE_MB', '50')),
-                concurrent_workers=int(os.getenv('PROCESSING_CONCURRENT_WORKERS', '4'))
-            ),
-            logging=LoggingConfig(
-                level=os.getenv('LOGGING_LEVEL', 'INFO'),
-                file_path=os.getenv('LOGGING_FILE_PATH', 'processing.log'),
-                max_file_size_mb=int(os.getenv('LOGGING_MAX_FILE_SIZE_MB', '10')),
-                backup_count=int(os.getenv('LOGGING_BACKUP_COUNT', '5'))
-            )
+            google_drive=GoogleDriveConfig(**_load_env_spec(env, _GOOGLE_DRIVE_ENV)),
+            vision_model=VisionModelConfig(**_load_env_spec(env, _VISION_MODEL_ENV)),
+            database=DatabaseConfig(**_load_env_spec(env, _DATABASE_ENV)),
+            processing=ProcessingConfig(**_load_env_spec(env, _PROCESSING_ENV)),
+            logging=LoggingConfig(**_load_env_spec(env, _LOGGING_ENV))
         )
 
     def validate(self, check_credentials: bool = True) -> None:
@@ -143,23 +263,7 @@ class Config:
                 f"Google Drive credentials file not found: {self.google_drive.credentials_path}"
             )
         
-        # Validate vision model configuration
-        if self.vision_model.temperature < 0 or self.vision_model.temperature > 1:
-            raise ConfigurationError("Vision model temperature must be between 0 and 1")
-        
-        if self.vision_model.max_tokens <= 0:
-            raise ConfigurationError("Vision model max_tokens must be positive")
-        
-        # Validate processing configuration
-        if self.processing.max_file_size_mb <= 0:
-            raise ConfigurationError("Processing max_file_size_mb must be positive")
-        
-        if self.processing.concurrent_workers <= 0:
-            raise ConfigurationError("Processing concurrent_workers must be positive")
-        
-        # Validate thumbnail size
-        if len(self.processing.thumbnail_size) != 2:
-            raise ConfigurationError("Processing thumbnail_size must be [width, height]")
-        
-        if any(size <= 0 for size in self.processing.thumbnail_size):
-            raise ConfigurationError("Processing thumbnail_size values must be positive")
\ No newline at end of file
+        # Validate field values
+        for section, name, is_valid, message in _VALIDATION_RULES:
+            if not is_valid(getattr(getattr(self, section), name)):
+                raise ConfigurationError(message)
@@ -1,20 +1,30 @@
 """Data models for the Google Drive Image Processor."""
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+# Slotted records are smaller and faster to build and read when thousands are
+# hydrated from the database; dataclass(slots=...) needs Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-class ProcessingStatus(Enum):
-    """Processing status for media files."""
+
+class ProcessingStatus(str, Enum):
+    """Processing status for media files.
+    
+    Members are the strings stored in files.processing_status (which the web
+    app also reads), so they compare equal to column values and bind as SQL
+    parameters directly.
+    """
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MediaFile:
     """Represents a media file from Google Drive."""
     drive_file_id: str
@@ -34,7 +44,7 @@ class MediaFile:
     id: Optional[int] = None  # Database ID
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ExtractedMetadata:
     """AI-extracted metadata for permaculture community images."""
     primary_subject: str
@@ -70,4 +80,22 @@ PEOPLE_COUNT_OPTIONS = ['none', '1-2', '3-5', '6-10', '10+']
 SEASON_OPTIONS = ['spring', 'summer', 'fall', 'winter', 'unclear']
 
 # Valid time of day options
-TIME_OF_DAY_OPTIONS = ['morning', 'midday', 'evening', 'unclear']
\ No newline at end of file
+TIME_OF_DAY_OPTIONS = ['morning', 'midday', 'evening', 'unclear']
+
+# Sets of the above for O(1) validation; the lists keep the display order
+ACTIVITY_TAGS_SET = frozenset(ACTIVITY_TAGS)
+PEOPLE_COUNT_SET = frozenset(PEOPLE_COUNT_OPTIONS)
+SEASON_SET = frozenset(SEASON_OPTIONS)
+TIME_OF_DAY_SET = frozenset(TIME_OF_DAY_OPTIONS)
+
+# Position of each option in its list; records loaded in bulk reference the
+# list's string instead of holding their own copy (see choice_value())
+PEOPLE_COUNT_IDX = {value: i for i, value in enumerate(PEOPLE_COUNT_OPTIONS)}
+SEASON_IDX = {value: i for i, value in enumerate(SEASON_OPTIONS)}
+TIME_OF_DAY_IDX = {value: i for i, value in enumerate(TIME_OF_DAY_OPTIONS)}
+
+
+def choice_value(options: List[str], index: Dict[str, int], value: Optional[str]) -> Optional[str]:
+    """Return the options entry equal to value, or value itself if it is not an option."""
+    i = index.get(value)
+    return value if i is None else options[i]
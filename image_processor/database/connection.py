@@ -1,16 +1,19 @@
 """Database connection management."""
 
+import atexit
+import functools
 import sqlite3
 import threading
+from collections import namedtuple
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import logging
 from datetime import datetime
 
-from ..core.config import DatabaseConfig
+from ..core.config import DatabaseConfig, SQLITE_SYNCHRONOUS_MODES, sqlite_synchronous
 from ..core.exceptions import DatabaseError
-from .schema import create_schema, get_schema_version, migrate_schema, SCHEMA_VERSION
+from .schema import create_indexes, create_schema, get_schema_version, migrate_schema, SCHEMA_VERSION
 
 logger = logging.getLogger(__name__)
 
@@ -20,34 +23,122 @@ def adapt_datetime(ts):
     return ts.isoformat()
 
 
-def convert_datetime(ts):
+def convert_datetime(ts, _parse=datetime.fromisoformat):
     """Converter from ISO format string to datetime."""
-    return datetime.fromisoformat(ts.decode())
+    return _parse(ts.decode())
 
 
-# Register the adapter and converter
+# Register the adapter and converter. Timestamps stay ISO-8601 text rather
+# than epoch integers: the web app queries these columns with SQLite's
+# date functions (DATE(processed_at), datetime('now', ...)) and the schema's
+# CURRENT_TIMESTAMP defaults write text as well
 sqlite3.register_adapter(datetime, adapt_datetime)
 sqlite3.register_converter("TIMESTAMP", convert_datetime)
 
 
+@functools.lru_cache(maxsize=64)
+def _row_class(columns: tuple):
+    """Named tuple class for rows with these column names, built once per column list."""
+    return namedtuple('Row', columns, rename=True)
+
+
+def _named_rows(cursor: sqlite3.Cursor, rows: list) -> list:
+    """Convert plain tuple rows from cursor into named tuples (attribute access by slot)."""
+    make = _row_class(tuple(column[0] for column in cursor.description))._make
+    return list(map(make, rows))
+
+
 class DatabaseConnection:
-    """Manages SQLite database connections with thread safety."""
+    """Manages a SQLite database connection shared by all threads.
+    
+    Every thread uses the same connection, so the PRAGMA setup runs once and
+    there is a single page cache. A re-entrant lock is held for the whole of a
+    get_connection() or transaction() block: statements and transactions from
+    different threads never interleave, and one thread can nest blocks.
+    
+    Compiled statements are cached on the connection by SQL text
+    (cached_statements), so callers should pass constant SQL with ? parameters
+    rather than formatting values into the string.
+    """
+    
+    # Shared managers by resolved database path, see get()
+    _instances = {}
+    _instances_lock = threading.Lock()
+    
+    # Commits between transaction()'s checkpoint(TRUNCATE) calls; 0 disables them
+    checkpoint_interval = 1000
+    
+    @classmethod
+    def get(cls, config: DatabaseConfig, read_only: bool = False,
+            initialize: bool = True) -> "DatabaseConnection":
+        """Return the process-wide connection manager for a database path.
+        
+        The schema check and connection setup (PRAGMAs) then run
+        once per process instead of once per command or service.
+        
+        Args:
+            config: Database configuration
+            read_only: Open the connection with mode=ro and query_only, for commands
+                that only read. Falls back to a writable manager while the
+                database file does not exist yet.
+            initialize: Check the schema version and migrate if needed. Commands
+                that only open an existing database can pass False to skip it;
+                a missing database file is always initialized.
+        """
+        path = Path(config.path).resolve()
+        exists = path.exists()
+        read_only = read_only and exists
+        initialize = initialize or not exists
+        key = (str(path), read_only)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls(
+                    config, read_only=read_only, initialize=initialize
+                )
+            elif initialize and not instance.initialized:
+                instance._initialize_database()
+            return instance
+    
+    @classmethod
+    def _close_instances(cls):
+        """Close the shared managers' connections (registered with atexit)."""
+        with cls._instances_lock:
+            for instance in cls._instances.values():
+                instance.close()
     
-    def __init__(self, config: DatabaseConfig):
+    def __init__(self, config: DatabaseConfig, read_only: bool = False,
+                 initialize: bool = True):
         """Initialize database connection manager."""
         self.config = config
         self.db_path = Path(config.path)
-        self._local = threading.local()
-        self._lock = threading.Lock()
+        self.read_only = read_only
+        self.initialized = False
+        self._conn = None
+        self._lock = threading.RLock()
+        self._commits = 0
+        self._generation = 0  # Connections opened so far, see data_version()
         
         # Ensure database directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Initialize database schema
-        self._initialize_database()
+        if initialize:
+            self._initialize_database()
     
     def _initialize_database(self):
         """Initialize database with schema."""
+        self.initialized = True
+        if self.read_only:
+            with self.get_connection() as conn:
+                if get_schema_version(conn) >= SCHEMA_VERSION:
+                    return
+            # An outdated schema is still migrated once, through a short-lived
+            # writable manager
+            writer = DatabaseConnection(self.config)
+            writer.close()
+            return
+        
         with self.get_connection() as conn:
             current_version = get_schema_version(conn)
             
@@ -60,28 +151,62 @@ class DatabaseConnection:
                 logger.info("Database schema initialized successfully")
             else:
                 logger.info(f"Database schema is up to date (version {current_version})")
+                # Indexes can still be missing after an interrupted bulk discover
+                restored = create_indexes(conn)
+                if restored:
+                    logger.warning(f"Recreated {restored} missing indexes")
     
-    def _get_thread_connection(self) -> sqlite3.Connection:
-        """Get or create a connection for the current thread."""
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = self._create_connection()
-        return self._local.connection
+    def _get_shared_connection(self) -> sqlite3.Connection:
+        """Get the shared connection, opening it if needed; call with the lock held."""
+        if self._conn is None:
+            self._conn = self._create_connection()
+        return self._conn
     
     def _create_connection(self) -> sqlite3.Connection:
         """Create a new SQLite connection."""
         try:
+            # Read-only connections take no write locks and cannot modify the file
+            if self.read_only:
+                database, uri = f"{self.db_path.resolve().as_uri()}?mode=ro", True
+            else:
+                database, uri = str(self.db_path), False
             conn = sqlite3.connect(
-                str(self.db_path),
+                database,
+                uri=uri,
                 timeout=30.0,
+                check_same_thread=False,  # Shared by all threads, serialized by _lock
                 isolation_level=None,  # Autocommit mode
-                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+                cached_statements=256,  # Reuse compiled statements across repository calls
+                detect_types=sqlite3.PARSE_DECLTYPES  # Declared TIMESTAMP columns only
             )
             
             # Enable foreign keys
             conn.execute("PRAGMA foreign_keys = ON")
             
-            # Optimize for concurrent reads
-            conn.execute("PRAGMA journal_mode = WAL")
+            # Optimize for concurrent reads; the journal mode is persistent, so
+            # read-only connections find WAL already set by a writer
+            if self.read_only:
+                conn.execute("PRAGMA query_only = ON")
+            else:
+                conn.execute("PRAGMA journal_mode = WAL")
+            
+            # In WAL mode NORMAL only syncs at checkpoints: commits survive an
+            # application crash but the last few may be lost on power failure.
+            # Configurable so deployments can opt back into FULL
+            synchronous = sqlite_synchronous(self.config.synchronous)
+            if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+                raise DatabaseError(f"Invalid synchronous mode: {self.config.synchronous}")
+            conn.execute(f"PRAGMA synchronous = {synchronous}")
+            
+            # Checkpoint the WAL back into the database every 1000 pages
+            conn.execute("PRAGMA wal_autocheckpoint = 1000")
+            
+            # Keep temp tables/sorts in memory and size the page cache and the
+            # memory-mapped read window from the config (128 MB / 256 MB by
+            # default); negative cache_size is in KiB
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute(f"PRAGMA cache_size = {-1024 * int(self.config.cache_size_mb)}")
+            conn.execute(f"PRAGMA mmap_size = {1024 * 1024 * int(self.config.mmap_size_mb)}")
             
             # Set row factory for dict-like access
             conn.row_factory = sqlite3.Row
@@ -93,75 +218,180 @@ class DatabaseConnection:
     
     @contextmanager
     def get_connection(self):
-        """Get a database connection for the current thread."""
-        conn = self._get_thread_connection()
-        try:
-            yield conn
-        except sqlite3.Error as e:
-            logger.error(f"Database error: {e}")
-            raise DatabaseError(f"Database operation failed: {e}")
+        """Get the database connection, holding it for this thread until the block exits."""
+        with self._lock:
+            conn = self._get_shared_connection()
+            try:
+                yield conn
+            except sqlite3.Error as e:
+                logger.error(f"Database error: {e}")
+                raise DatabaseError(f"Database operation failed: {e}")
     
     @contextmanager
-    def transaction(self):
-        """Execute operations within a transaction."""
-        conn = self._get_thread_connection()
+    def transaction(self, immediate: bool = False):
+        """Execute operations within a transaction.
         
-        # Start transaction
-        conn.execute("BEGIN")
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE). Writers
+                should use this so a concurrent writer makes them wait on the
+                busy timeout instead of failing with "database is locked" when a
+                deferred transaction tries to upgrade.
+        """
+        with self._lock:
+            conn = self._get_shared_connection()
+            
+            # Start transaction
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            
+            # wal_autocheckpoint copies pages back but never shrinks the WAL
+            # file; long-running workers truncate it every checkpoint_interval commits
+            self._commits += 1
+            if self.checkpoint_interval and self._commits >= self.checkpoint_interval:
+                self.checkpoint()
+    
+    def checkpoint(self):
+        """Checkpoint the WAL into the database and truncate the WAL file.
         
-        try:
-            yield conn
-            conn.execute("COMMIT")
-        except Exception:
-            conn.execute("ROLLBACK")
-            raise
+        Returns:
+            (busy, log pages, checkpointed pages); busy is 1 when readers kept
+            the checkpoint from completing, which is retried at the next one
+        """
+        with self.get_connection() as conn:
+            self._commits = 0
+            if self.read_only:
+                return None
+            result = tuple(conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+            if result[0]:
+                logger.debug(f"WAL checkpoint of {self.db_path} incomplete: {result}")
+            return result
     
     def close(self):
-        """Close the connection for the current thread."""
-        if hasattr(self._local, 'connection') and self._local.connection:
-            self._local.connection.close()
-            self._local.connection = None
-    
-    def close_all(self):
-        """Close all connections (call from main thread only)."""
+        """Close the shared connection; the next use opens a new one.
+        
+        Writable connections run PRAGMA optimize first, which refreshes the
+        query planner statistics of tables whose contents changed.
+        """
         with self._lock:
-            # Note: This only closes the current thread's connection
-            # In a multi-threaded app, each thread should close its own connection
-            self.close()
+            if self._conn is not None:
+                if not self.read_only:
+                    try:
+                        self._conn.execute("PRAGMA optimize")
+                    except sqlite3.Error as e:
+                        logger.warning(f"PRAGMA optimize failed on close: {e}")
+                self._conn.close()
+                self._conn = None
+                self._generation += 1
+    
+    def data_version(self) -> tuple:
+        """Return a value that changes whenever the database contents may have.
+        
+        Combines PRAGMA data_version (bumped by other connections' commits,
+        including other processes such as the web app) with this connection's
+        total_changes, and the connection generation since both restart when
+        the connection is reopened.
+        """
+        with self.get_connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            return (self._generation, version, conn.total_changes)
     
     def execute(self, sql: str, params: Optional[tuple] = None):
-        """Execute a single SQL statement."""
+        """Execute a single SQL statement.
+        
+        The lock is released on return, so read rows through fetchone/fetchall
+        (or inside a get_connection() block) rather than from the returned
+        cursor, which another thread's statements may interleave with.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            if params:
-                return cursor.execute(sql, params)
-            return cursor.execute(sql)
+            # Connection.execute creates the cursor in C; the compiled statement
+            # comes from the connection's statement cache (cached_statements)
+            return conn.execute(sql, params or ())
     
     def executemany(self, sql: str, params_list: list):
-        """Execute a SQL statement multiple times with different parameters."""
+        """Execute a SQL statement multiple times with different parameters.
+        
+        The rows are written in one transaction (one commit) rather than one
+        autocommit per row; inside a caller's transaction they join it instead.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            return cursor.executemany(sql, params_list)
+            if conn.in_transaction:
+                return conn.executemany(sql, params_list)
+            with self.transaction(immediate=True):
+                return conn.executemany(sql, params_list)
     
     def fetchone(self, sql: str, params: Optional[tuple] = None):
         """Execute a query and fetch one result."""
-        cursor = self.execute(sql, params)
-        return cursor.fetchone()
+        with self._lock:
+            return self.execute(sql, params).fetchone()
     
     def fetchall(self, sql: str, params: Optional[tuple] = None):
         """Execute a query and fetch all results."""
-        cursor = self.execute(sql, params)
-        return cursor.fetchall()
+        with self._lock:
+            return self.execute(sql, params).fetchall()
+    
+    def fetchone_named(self, sql: str, params: Optional[tuple] = None):
+        """Execute a query and fetch one result as a named tuple (None if no row)."""
+        rows = self.fetchall_named(sql, params)
+        return rows[0] if rows else None
     
-    def backup(self, backup_path: Optional[Path] = None):
-        """Create a backup of the database."""
+    def fetchall_named(self, sql: str, params: Optional[tuple] = None) -> list:
+        """Execute a query and fetch all results as named tuples.
+        
+        For hot read paths: fields are read as attributes (row.filename) by
+        slot instead of sqlite3.Row's per-access column-name search.
+        """
+        with self._lock:
+            cursor = self.execute(sql, params)
+            cursor.row_factory = None
+            rows = cursor.fetchall()
+        return _named_rows(cursor, rows)
+    
+    def backup(self, backup_path: Optional[Path] = None, pages: int = 64,
+               progress: Optional[Callable[[int, int, int], None]] = None):
+        """Create a backup of the database.
+        
+        The copy runs pages at a time, so other processes can write between
+        steps instead of waiting for the whole copy.
+        
+        Args:
+            backup_path: Destination file; defaults to <db>.backup.db
+            pages: Pages copied per step
+            progress: Called as progress(status, remaining, total) after each
+                step; defaults to logging every 10%
+        """
         if backup_path is None:
             backup_path = self.db_path.with_suffix('.backup.db')
+        if progress is None:
+            progress = _BackupProgressLogger(backup_path)
         
         with self.get_connection() as conn:
             backup_conn = sqlite3.connect(str(backup_path))
             try:
-                conn.backup(backup_conn)
+                conn.backup(backup_conn, pages=pages, progress=progress)
                 logger.info(f"Database backed up to {backup_path}")
             finally:
-                backup_conn.close()
\ No newline at end of file
+                backup_conn.close()
+
+
+# Shared connections otherwise stay open until exit without running close()
+atexit.register(DatabaseConnection._close_instances)
+
+
+class _BackupProgressLogger:
+    """Default backup() progress callback: logs each 10% of pages copied."""
+    
+    def __init__(self, backup_path: Path):
+        self.backup_path = backup_path
+        self.next_percent = 10
+    
+    def __call__(self, status: int, remaining: int, total: int) -> None:
+        percent = 100 * (total - remaining) // total if total else 100
+        if percent >= self.next_percent:
+            logger.info(f"Backup to {self.backup_path}: {percent}% ({total - remaining}/{total} pages)")
+            self.next_percent = percent // 10 * 10 + 10
@@ -1,37 +1,190 @@
 """Repository classes for database operations."""
 
+import json
+import sqlite3
+import sys
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Iterator, Tuple
 import logging
 
 from ..core.models import (
     MediaFile, ExtractedMetadata, ProcessingStatus,
-    ACTIVITY_TAGS, PEOPLE_COUNT_OPTIONS, SEASON_OPTIONS, TIME_OF_DAY_OPTIONS
+    ACTIVITY_TAGS_SET, PEOPLE_COUNT_OPTIONS, SEASON_OPTIONS, TIME_OF_DAY_OPTIONS,
+    PEOPLE_COUNT_SET, SEASON_SET, TIME_OF_DAY_SET,
+    PEOPLE_COUNT_IDX, SEASON_IDX, TIME_OF_DAY_IDX, choice_value
 )
 from ..core.exceptions import DatabaseError
 from .connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# Stay below SQLite's default limit of 999 bound variables per statement
+_IN_CHUNK_SIZE = 900
+
+# processing_status column value to member, skipping ProcessingStatus()'s lookup machinery per row
+_STATUS_BY_VALUE = {status.value: status for status in ProcessingStatus}
+
+# MetadataRepository.search order_by values and their ORDER BY clauses; the
+# clauses themselves are accepted too
+_SEARCH_ORDER_BY = {
+    'visual_quality': 'm.visual_quality DESC',
+    'social_media_score': 'm.social_media_score DESC',
+    'marketing_score': 'm.marketing_score DESC',
+    'created_date': 'f.created_date DESC',
+    'filename': 'f.filename',
+}
+_SEARCH_ORDER_BY.update({clause: clause for clause in list(_SEARCH_ORDER_BY.values())})
+
+# Columns of MetadataRepository.search results; 'id' is the file's id
+_SEARCH_COLUMNS = """
+    f.id, f.drive_file_id, f.filename, f.file_path, f.mime_type, f.width, f.height,
+    f.thumbnail_path, f.created_date, f.processed_at,
+    m.primary_subject, m.visual_quality, m.has_people, m.people_count, m.is_indoor,
+    m.social_media_score, m.social_media_reason, m.marketing_score, m.marketing_use,
+    m.season, m.time_of_day, m.mood_energy, m.color_palette, m.file_path_notes
+"""
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """sys.intern for nullable columns drawn from a small set of values."""
+    return None if value is None else sys.intern(value)
+
+
+# INSERT ... RETURNING needs SQLite 3.35+; Python may be linked against older
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _insert_id(db: DatabaseConnection, sql: str, params: tuple) -> Optional[int]:
+    """Run an INSERT and return the new row's id, or None if no row was inserted.
+    
+    The id comes back from the statement itself (RETURNING id) where
+    supported, falling back to cursor.lastrowid.
+    """
+    if _HAS_RETURNING:
+        # fetchall steps the statement to completion, so the insert commits
+        rows = db.fetchall(sql + " RETURNING id", params)
+        return rows[0][0] if rows else None
+    with db.get_connection() as conn:
+        cursor = conn.execute(sql, params)
+        return cursor.lastrowid if cursor.rowcount else None
+
+
+def _select_in(db: DatabaseConnection, sql: str, values: List[Any],
+               named: bool = False) -> Iterator[Any]:
+    """Run sql once per chunk of values and yield the rows.
+    
+    sql must contain an ``{placeholders}`` field for the IN (...) list. With
+    named=True rows are named tuples (see DatabaseConnection.fetchall_named).
+    """
+    fetchall = db.fetchall_named if named else db.fetchall
+    for start in range(0, len(values), _IN_CHUNK_SIZE):
+        chunk = values[start:start + _IN_CHUNK_SIZE]
+        yield from fetchall(sql.format(placeholders=','.join('?' * len(chunk))), tuple(chunk))
+
 
 class FileRepository:
     """Repository for file operations."""
     
+    _INSERT_SQL = """
+        INSERT INTO files (
+            drive_file_id, filename, file_path, file_size, width, height,
+            mime_type, created_date, modified_date, processing_status, thumbnail_path,
+            creator, description
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(drive_file_id) DO NOTHING
+    """
+    _GET_BY_ID_SQL = "SELECT * FROM files WHERE id = ?"
+    _GET_BY_DRIVE_ID_SQL = "SELECT * FROM files WHERE drive_file_id = ?"
+    _EXISTS_SQL = "SELECT 1 FROM files WHERE drive_file_id = ?"
+    _STATUS_PAGE_SQL = """
+        SELECT * FROM files
+        WHERE processing_status = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """
+    # None leaves the stored value in place
+    _UPDATE_DRIVE_METADATA_SQL = """
+        UPDATE files SET
+            creator = COALESCE(?, creator),
+            description = COALESCE(?, description),
+            width = COALESCE(?, width),
+            height = COALESCE(?, height)
+        WHERE id = ?
+    """
+    _UPDATE_STATUS_SQL = """
+        UPDATE files 
+        SET processing_status = ?, error_message = ?, processed_at = ?
+        WHERE id = ?
+    """
+    # LIMIT is a parameter (-1 for no limit) so every call shares one cached statement
+    _BY_STATUS_SQL = """
+        SELECT * FROM files WHERE processing_status = ? ORDER BY created_at LIMIT ?
+    """
+    _MISSING_DRIVE_FIELDS_SQL = """
+        SELECT * FROM files
+        WHERE (creator IS NULL OR description IS NULL OR width IS NULL OR height IS NULL)
+        ORDER BY created_at
+        LIMIT ?
+    """
+    _UPDATE_THUMBNAIL_SQL = "UPDATE files SET thumbnail_path = ? WHERE id = ?"
+    _UPDATE_DIMENSIONS_SQL = "UPDATE files SET width = ?, height = ? WHERE id = ?"
+    
     def __init__(self, db_connection: DatabaseConnection):
         """Initialize file repository."""
         self.db = db_connection
+        self._suspended_indexes: List[str] = []
     
-    def create(self, media_file: MediaFile) -> int:
-        """Create a new file record."""
-        sql = """
-            INSERT INTO files (
-                drive_file_id, filename, file_path, file_size, width, height,
-                mime_type, created_date, modified_date, processing_status, thumbnail_path,
-                creator, description
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    def suspend_indexes(self) -> None:
+        """Drop the secondary indexes on files ahead of a bulk insert.
+        
+        UNIQUE indexes (drive_file_id) stay in place for ON CONFLICT
+        deduplication. Call rebuild_indexes() when the load finishes.
         """
+        rows = self.db.fetchall("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = 'files'
+              AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+        """)
+        with self.db.transaction(immediate=True) as conn:
+            for row in rows:
+                conn.execute(f'DROP INDEX IF EXISTS "{row["name"]}"')
+        self._suspended_indexes.extend(row['sql'] for row in rows)
+        logger.info(f"Suspended {len(rows)} indexes on files for bulk load")
+    
+    def rebuild_indexes(self) -> None:
+        """Recreate the indexes dropped by suspend_indexes(), each in one pass."""
+        if not self._suspended_indexes:
+            return
+        with self.db.transaction(immediate=True) as conn:
+            for sql in self._suspended_indexes:
+                conn.execute(sql)
+        logger.info(f"Rebuilt {len(self._suspended_indexes)} indexes on files")
+        self._suspended_indexes = []
+    
+    def create(self, media_file: MediaFile) -> Optional[int]:
+        """Create a new file record; returns None if the Drive ID is already stored."""
+        return _insert_id(self.db, self._INSERT_SQL, self._media_file_params(media_file))
+    
+    def create_many(self, media_files: List[MediaFile]) -> int:
+        """Create many file records with one executemany inside a single transaction.
         
-        cursor = self.db.execute(sql, (
+        Files whose Drive ID is already stored are skipped; returns the number inserted.
+        """
+        if not media_files:
+            return 0
+        
+        # executemany consumes the parameter tuples lazily, one per row
+        with self.db.transaction(immediate=True) as conn:
+            cursor = conn.executemany(
+                self._INSERT_SQL, map(self._media_file_params, media_files)
+            )
+        return cursor.rowcount
+    
+    @staticmethod
+    def _media_file_params(media_file: MediaFile) -> tuple:
+        """Bind parameters for inserting a MediaFile."""
+        return (
             media_file.drive_file_id,
             media_file.filename,
             media_file.file_path,
@@ -45,14 +198,11 @@ class FileRepository:
             media_file.thumbnail_path,
             media_file.creator,
             media_file.description
-        ))
-        
-        return cursor.lastrowid
+        )
     
     def get_by_id(self, file_id: int) -> Optional[MediaFile]:
         """Get a file by ID."""
-        sql = "SELECT * FROM files WHERE id = ?"
-        row = self.db.fetchone(sql, (file_id,))
+        row = self.db.fetchone_named(self._GET_BY_ID_SQL, (file_id,))
         
         if row:
             return self._row_to_media_file(row)
@@ -60,8 +210,7 @@ class FileRepository:
     
     def get_by_drive_id(self, drive_file_id: str) -> Optional[MediaFile]:
         """Get a file by Google Drive ID."""
-        sql = "SELECT * FROM files WHERE drive_file_id = ?"
-        row = self.db.fetchone(sql, (drive_file_id,))
+        row = self.db.fetchone_named(self._GET_BY_DRIVE_ID_SQL, (drive_file_id,))
         
         if row:
             return self._row_to_media_file(row)
@@ -69,13 +218,27 @@ class FileRepository:
     
     def get_by_status(self, status: ProcessingStatus, limit: Optional[int] = None) -> List[MediaFile]:
         """Get files by processing status."""
-        sql = "SELECT * FROM files WHERE processing_status = ? ORDER BY created_at"
-        if limit:
-            sql += f" LIMIT {limit}"
-        
-        rows = self.db.fetchall(sql, (status.value,))
+        rows = self.db.fetchall_named(self._BY_STATUS_SQL, (status.value, limit or -1))
         return [self._row_to_media_file(row) for row in rows]
     
+    def iter_pending(self, chunk_size: int = 200) -> Iterator[List[MediaFile]]:
+        """Yield pending files in id order, chunk_size rows per query.
+        
+        Uses keyset pagination (id > last seen id) over idx_files_status, so each
+        query is an index range seek and files whose status changes while the
+        iteration runs are neither skipped nor repeated.
+        """
+        last_id = 0
+        while True:
+            rows = self.db.fetchall_named(
+                self._STATUS_PAGE_SQL,
+                (ProcessingStatus.PENDING.value, last_id, chunk_size)
+            )
+            if not rows:
+                return
+            yield [self._row_to_media_file(row) for row in rows]
+            last_id = rows[-1].id
+    
     def get_pending_files(self, limit: Optional[int] = None) -> List[MediaFile]:
         """Get files pending processing."""
         return self.get_by_status(ProcessingStatus.PENDING, limit)
@@ -88,75 +251,145 @@ class FileRepository:
                                error_message: Optional[str] = None,
                                processed_at: Optional[datetime] = None) -> None:
         """Update file processing status."""
-        sql = """
-            UPDATE files 
-            SET processing_status = ?, error_message = ?, processed_at = ?
-            WHERE id = ?
-        """
-        
         if processed_at is None and status in [ProcessingStatus.COMPLETED, ProcessingStatus.FAILED]:
             processed_at = datetime.now()
         
-        self.db.execute(sql, (status.value, error_message, processed_at, file_id))
+        self.db.execute(self._UPDATE_STATUS_SQL, (status.value, error_message, processed_at, file_id))
     
     def update_status(self, file_id: int, status: ProcessingStatus, 
                      error_message: Optional[str] = None) -> None:
         """Update file processing status (backwards compatibility)."""
         self.update_processing_status(file_id, status, error_message)
     
+    def reset_in_progress(self, file_ids: List[int]) -> int:
+        """Return files still marked in_progress to pending, e.g. after an interrupted run.
+        
+        Files whose status has moved on are left alone; returns the number reset.
+        """
+        sql = (
+            "UPDATE files SET processing_status = 'pending' "
+            "WHERE processing_status = 'in_progress' AND id IN ({placeholders})"
+        )
+        reset = 0
+        with self.db.transaction(immediate=True) as conn:
+            for start in range(0, len(file_ids), _IN_CHUNK_SIZE):
+                chunk = file_ids[start:start + _IN_CHUNK_SIZE]
+                cursor = conn.execute(
+                    sql.format(placeholders=','.join('?' * len(chunk))), tuple(chunk)
+                )
+                reset += cursor.rowcount
+        return reset
+    
     def update_thumbnail_path(self, file_id: int, thumbnail_path: str) -> None:
         """Update file thumbnail path."""
-        sql = "UPDATE files SET thumbnail_path = ? WHERE id = ?"
-        self.db.execute(sql, (thumbnail_path, file_id))
+        self.db.execute(self._UPDATE_THUMBNAIL_SQL, (thumbnail_path, file_id))
     
     def update_dimensions(self, file_id: int, width: int, height: int) -> None:
         """Update file dimensions."""
-        sql = "UPDATE files SET width = ?, height = ? WHERE id = ?"
-        self.db.execute(sql, (width, height, file_id))
+        self.db.execute(self._UPDATE_DIMENSIONS_SQL, (width, height, file_id))
 
     def update_drive_metadata(self, file_id: int, creator: Optional[str], description: Optional[str],
                                width: Optional[int], height: Optional[int]) -> None:
         """Update Drive-derived metadata for a file in a single statement."""
-        sql = """
-            UPDATE files SET
-                creator = COALESCE(?, creator),
-                description = COALESCE(?, description),
-                width = COALESCE(?, width),
-                height = COALESCE(?, height)
-            WHERE id = ?
+        self.db.execute(self._UPDATE_DRIVE_METADATA_SQL, (creator, description, width, height, file_id))
+    
+    def update_drive_metadata_many(self, updates: List[tuple]) -> int:
+        """Apply many (file_id, creator, description, width, height) updates in one transaction.
+        
+        Returns the number of rows updated.
         """
-        self.db.execute(sql, (creator, description, width, height, file_id))
+        if not updates:
+            return 0
+        
+        with self.db.transaction(immediate=True) as conn:
+            cursor = conn.executemany(
+                self._UPDATE_DRIVE_METADATA_SQL,
+                ((creator, description, width, height, file_id)
+                 for file_id, creator, description, width, height in updates)
+            )
+        return cursor.rowcount
     
     def exists(self, drive_file_id: str) -> bool:
         """Check if a file exists by Google Drive ID."""
-        sql = "SELECT 1 FROM files WHERE drive_file_id = ?"
-        return self.db.fetchone(sql, (drive_file_id,)) is not None
+        return self.db.fetchone(self._EXISTS_SQL, (drive_file_id,)) is not None
     
-    def get_processing_stats(self) -> Dict[str, int]:
-        """Get processing statistics."""
+    def existing_ids(self, drive_file_ids: List[str]) -> Set[str]:
+        """Return which of the given Google Drive IDs are already stored."""
+        sql = "SELECT drive_file_id FROM files WHERE drive_file_id IN ({placeholders})"
+        return {row[0] for row in _select_in(self.db, sql, drive_file_ids)}
+    
+    def all_drive_ids(self, chunk_size: int = 10000) -> Set[str]:
+        """Return every stored Google Drive ID, read in one pass over the drive_file_id index.
+        
+        Rows are pulled chunk_size at a time so only the set of IDs is held in
+        memory, not a full result list alongside it.
+        """
+        found: Set[str] = set()
+        # The cursor is read under the connection lock like the fetch* helpers
+        with self.db.get_connection() as conn:
+            cursor = conn.execute("SELECT drive_file_id FROM files")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return found
+                found.update(row[0] for row in rows)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get file counts by status and type from one grouped query.
+        
+        The grouping is answered from idx_files_status_mime without touching
+        the table. Returns total/images/videos, images_<status> counts and a
+        by_status mapping of processing_status to count.
+        """
         sql = """
-            SELECT processing_status, COUNT(*) as count
+            SELECT processing_status, mime_type, COUNT(*) as count
             FROM files
-            GROUP BY processing_status
+            GROUP BY processing_status, mime_type
         """
         
-        rows = self.db.fetchall(sql)
-        return {row['processing_status']: row['count'] for row in rows}
+        by_status: Dict[str, int] = {}
+        summary = {
+            'total': 0,
+            'images': 0,
+            'videos': 0,
+            'images_completed': 0,
+            'images_pending': 0,
+            'images_failed': 0,
+        }
+        
+        for row in self.db.fetchall(sql):
+            status, count = row['processing_status'], row['count']
+            mime_type = (row['mime_type'] or '').lower()
+            
+            by_status[status] = by_status.get(status, 0) + count
+            summary['total'] += count
+            
+            if mime_type.startswith('image'):
+                summary['images'] += count
+                key = f'images_{status}'
+                if key in summary:
+                    summary[key] += count
+            elif mime_type.startswith('video'):
+                summary['videos'] += count
+        
+        summary['by_status'] = by_status
+        return summary
+    
+    def get_processing_stats(self) -> Dict[str, int]:
+        """Get processing statistics."""
+        return self.summary()['by_status']
 
     def get_files_missing_drive_fields(self, limit: Optional[int] = None) -> List[MediaFile]:
         """Return files missing any of creator, description, width, or height."""
-        sql = """
-            SELECT * FROM files
-            WHERE (creator IS NULL OR description IS NULL OR width IS NULL OR height IS NULL)
-            ORDER BY created_at
-        """
-        if limit:
-            sql += f" LIMIT {limit}"
-        rows = self.db.fetchall(sql)
+        rows = self.db.fetchall_named(self._MISSING_DRIVE_FIELDS_SQL, (limit or -1,))
         return [self._row_to_media_file(row) for row in rows]
 
     def get_missing_drive_fields_batch(self, last_id: int = 0, batch_size: int = 100) -> List[MediaFile]:
-        """Fetch a batch of files with missing Drive fields, after a given id."""
+        """Fetch a batch of files with missing Drive fields, after a given id.
+        
+        The WHERE clause matches idx_files_backfill, so each batch is a range
+        seek over only the rows still missing fields.
+        """
         sql = """
             SELECT * FROM files
             WHERE id > ?
@@ -164,50 +397,35 @@ class FileRepository:
             ORDER BY id
             LIMIT ?
         """
-        rows = self.db.fetchall(sql, (last_id, batch_size))
+        rows = self.db.fetchall_named(sql, (last_id, batch_size))
         return [self._row_to_media_file(row) for row in rows]
     
     def get_detailed_stats(self) -> Dict[str, int]:
         """Get detailed statistics separating images and videos."""
-        sql = """
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN mime_type LIKE 'image%' THEN 1 ELSE 0 END) as images,
-                SUM(CASE WHEN mime_type LIKE 'video%' THEN 1 ELSE 0 END) as videos,
-                SUM(CASE WHEN mime_type LIKE 'image%' AND processing_status = 'completed' THEN 1 ELSE 0 END) as images_completed,
-                SUM(CASE WHEN mime_type LIKE 'image%' AND processing_status = 'pending' THEN 1 ELSE 0 END) as images_pending,
-                SUM(CASE WHEN mime_type LIKE 'image%' AND processing_status = 'failed' THEN 1 ELSE 0 END) as images_failed
-            FROM files
-        """
-        
-        row = self.db.fetchone(sql)
-        return {
-            'total': row['total'],
-            'images': row['images'],
-            'videos': row['videos'],
-            'images_completed': row['images_completed'],
-            'images_pending': row['images_pending'],
-            'images_failed': row['images_failed']
-        }
+        summary = self.summary()
+        del summary['by_status']
+        return summary
     
     def _row_to_media_file(self, row) -> MediaFile:
-        """Convert database row to MediaFile object."""
+        """Convert a named-tuple files row (see fetchall_named) to a MediaFile."""
         return MediaFile(
-            id=row['id'],
-            drive_file_id=row['drive_file_id'],
-            filename=row['filename'],
-            file_path=row['file_path'],
-            file_size=row['file_size'],
-            width=(row['width'] if 'width' in row.keys() else None),
-            height=(row['height'] if 'height' in row.keys() else None),
-            mime_type=row['mime_type'],
-            created_date=row['created_date'],
-            modified_date=row['modified_date'],
-            creator=(row['creator'] if 'creator' in row.keys() else None),
-            description=(row['description'] if 'description' in row.keys() else None),
-            processing_status=ProcessingStatus(row['processing_status']),
-            processed_at=row['processed_at'],
-            thumbnail_path=row['thumbnail_path']
+            id=row.id,
+            drive_file_id=row.drive_file_id,
+            filename=row.filename,
+            file_path=row.file_path,
+            file_size=row.file_size,
+            # Columns added in schema v4 may be missing from older databases
+            width=getattr(row, 'width', None),
+            height=getattr(row, 'height', None),
+            # One shared string per MIME type instead of one per row
+            mime_type=_intern(row.mime_type),
+            created_date=row.created_date,
+            modified_date=row.modified_date,
+            creator=getattr(row, 'creator', None),
+            description=getattr(row, 'description', None),
+            processing_status=_STATUS_BY_VALUE[row.processing_status],
+            processed_at=row.processed_at,
+            thumbnail_path=row.thumbnail_path
         )
     
     def get_file_with_drive_url(self, file_id: int) -> Optional[dict]:
@@ -227,14 +445,62 @@ class FileRepository:
             'created_date': media_file.created_date,
             'processed_at': media_file.processed_at
         }
+    
+    def get_file_details(self, file_id: int) -> Optional[dict]:
+        """Get file info, Drive URLs, metadata and activity tags in one query.
+        
+        Returns the get_file_with_drive_url() dictionary plus a 'metadata' key
+        holding an ExtractedMetadata (with activity_tags) or None.
+        """
+        sql = """
+            SELECT
+                f.id AS f_id, f.drive_file_id AS f_drive_file_id, f.filename AS f_filename,
+                f.file_path AS f_file_path, f.mime_type AS f_mime_type,
+                f.processing_status AS f_processing_status,
+                f.created_date AS f_created_date, f.processed_at AS f_processed_at,
+                m.*,
+                (SELECT GROUP_CONCAT(t.tag_name) FROM activity_tags t WHERE t.file_id = f.id) AS tags
+            FROM files f
+            LEFT JOIN metadata m ON m.file_id = f.id
+            WHERE f.id = ?
+        """
+        row = self.db.fetchone_named(sql, (file_id,))
+        if not row:
+            return None
+        
+        metadata = None
+        if row.file_id is not None:
+            tags = row.tags.split(',') if row.tags else []
+            metadata = MetadataRepository._row_to_metadata(row, tags)
+        
+        drive_file_id = row.f_drive_file_id
+        return {
+            'id': row.f_id,
+            'filename': row.f_filename,
+            'file_path': row.f_file_path,
+            'mime_type': row.f_mime_type,
+            'processing_status': row.f_processing_status,
+            'drive_url': f"https://drive.google.com/file/d/{drive_file_id}/view",
+            'drive_download_url': f"https://drive.google.com/uc?id={drive_file_id}",
+            'created_date': row.f_created_date,
+            'processed_at': row.f_processed_at,
+            'metadata': metadata
+        }
 
 
 class MetadataRepository:
     """Repository for metadata operations."""
     
+    _GET_BY_FILE_ID_SQL = "SELECT * FROM metadata WHERE file_id = ?"
+    
+    # search() results kept per repository, least recently used evicted first
+    search_cache_size = 128
+    
     def __init__(self, db_connection: DatabaseConnection):
         """Initialize metadata repository."""
         self.db = db_connection
+        self._search_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._search_version = None
     
     def create(self, metadata: ExtractedMetadata) -> int:
         """Create metadata record."""
@@ -250,7 +516,7 @@ class MetadataRepository:
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
-        cursor = self.db.execute(sql, (
+        return _insert_id(self.db, sql, (
             metadata.file_id,
             metadata.primary_subject,
             metadata.visual_quality,
@@ -267,8 +533,6 @@ class MetadataRepository:
             metadata.color_palette,
             metadata.notes
         ))
-        
-        return cursor.lastrowid
 
     def upsert(self, metadata: ExtractedMetadata) -> None:
         """Insert or update metadata by file_id (idempotent upsert)."""
@@ -319,18 +583,26 @@ class MetadataRepository:
     
     def get_by_file_id(self, file_id: int) -> Optional[ExtractedMetadata]:
         """Get metadata by file ID."""
-        sql = "SELECT * FROM metadata WHERE file_id = ?"
-        row = self.db.fetchone(sql, (file_id,))
+        row = self.db.fetchone_named(self._GET_BY_FILE_ID_SQL, (file_id,))
         
         if row:
-            # Get activity tags
-            tags_sql = "SELECT tag_name FROM activity_tags WHERE file_id = ?"
-            tags_rows = self.db.fetchall(tags_sql, (file_id,))
-            activity_tags = [row['tag_name'] for row in tags_rows]
-            
+            activity_tags = ActivityTagRepository(self.db).get_tags(file_id)
             return self._row_to_metadata(row, activity_tags)
         return None
     
+    def get_by_file_ids(self, file_ids: List[int]) -> Dict[int, ExtractedMetadata]:
+        """Get metadata for many files, keyed by file ID; files without metadata are absent.
+        
+        Uses one metadata query and one tag query per 900 IDs instead of two
+        queries per file.
+        """
+        tags = ActivityTagRepository(self.db).get_tags_for_files(file_ids)
+        sql = "SELECT * FROM metadata WHERE file_id IN ({placeholders})"
+        return {
+            row.file_id: self._row_to_metadata(row, tags.get(row.file_id, []))
+            for row in _select_in(self.db, sql, file_ids, named=True)
+        }
+    
     def update(self, metadata: ExtractedMetadata) -> None:
         """Update existing metadata."""
         # Validate metadata
@@ -364,9 +636,34 @@ class MetadataRepository:
         ))
     
     def search(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search metadata with filters."""
-        sql = """
-            SELECT f.*, m.*
+        """Search metadata with filters.
+        
+        Results are dicts of the _SEARCH_COLUMNS file and metadata fields plus
+        'activity_tags'. Repeated searches are answered from an LRU cache
+        until the database changes (see DatabaseConnection.data_version).
+        """
+        version = self.db.data_version()
+        if version != self._search_version:
+            self._search_cache.clear()
+            self._search_version = version
+        
+        key = json.dumps(filters, sort_keys=True, default=str)
+        cached = self._search_cache.get(key)
+        if cached is None:
+            cached = self._search(filters)
+            self._search_cache[key] = cached
+            if len(self._search_cache) > self.search_cache_size:
+                self._search_cache.popitem(last=False)
+        else:
+            self._search_cache.move_to_end(key)
+        
+        # Copies, so callers can modify the results without touching the cache
+        return [dict(result, activity_tags=list(result['activity_tags'])) for result in cached]
+    
+    def _search(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run search() against the database."""
+        sql = f"""
+            SELECT {_SEARCH_COLUMNS}
             FROM files f
             JOIN metadata m ON f.id = m.file_id
             WHERE f.processing_status = 'completed'
@@ -421,26 +718,26 @@ class MetadataRepository:
             """
             params.extend(tags)
         
-        # Add ordering
-        order_by = filters.get('order_by', 'm.visual_quality DESC')
-        sql += f" ORDER BY {order_by}"
+        # Add ordering, from a fixed set of clauses
+        order_by = filters.get('order_by', 'visual_quality')
+        try:
+            sql += f" ORDER BY {_SEARCH_ORDER_BY[order_by]}"
+        except KeyError:
+            raise DatabaseError(f"Invalid order_by: {order_by}")
         
-        # Add limit
-        if 'limit' in filters:
-            sql += " LIMIT ?"
-            params.append(filters['limit'])
+        # Add limit (-1 for none, so the SQL text does not depend on it)
+        sql += " LIMIT ?"
+        params.append(filters.get('limit', -1))
         
         rows = self.db.fetchall(sql, tuple(params))
         
-        # Convert to dict format with activity tags
+        # Convert to dict format with activity tags, fetched for all rows at
+        # once instead of one query per row
+        tags = ActivityTagRepository(self.db).get_tags_for_files([row['id'] for row in rows])
         results = []
         for row in rows:
-            # Get activity tags
-            tags_sql = "SELECT tag_name FROM activity_tags WHERE file_id = ?"
-            tags_rows = self.db.fetchall(tags_sql, (row['id'],))
-            
             result = dict(row)
-            result['activity_tags'] = [r['tag_name'] for r in tags_rows]
+            result['activity_tags'] = tags.get(row['id'], [])
             results.append(result)
         
         return results
@@ -450,7 +747,7 @@ class MetadataRepository:
         if not (1 <= metadata.visual_quality <= 5):
             raise DatabaseError("Visual quality must be between 1 and 5")
         
-        if metadata.people_count not in PEOPLE_COUNT_OPTIONS:
+        if metadata.people_count not in PEOPLE_COUNT_SET:
             raise DatabaseError(f"Invalid people_count: {metadata.people_count}")
         
         if not (1 <= metadata.social_media_score <= 5):
@@ -459,53 +756,70 @@ class MetadataRepository:
         if not (1 <= metadata.marketing_score <= 5):
             raise DatabaseError("Marketing score must be between 1 and 5")
         
-        if metadata.season and metadata.season not in SEASON_OPTIONS:
+        if metadata.season and metadata.season not in SEASON_SET:
             raise DatabaseError(f"Invalid season: {metadata.season}")
         
-        if metadata.time_of_day and metadata.time_of_day not in TIME_OF_DAY_OPTIONS:
+        if metadata.time_of_day and metadata.time_of_day not in TIME_OF_DAY_SET:
             raise DatabaseError(f"Invalid time_of_day: {metadata.time_of_day}")
     
-    def _row_to_metadata(self, row, activity_tags: List[str]) -> ExtractedMetadata:
-        """Convert database row to ExtractedMetadata object."""
+    @staticmethod
+    def _row_to_metadata(row, activity_tags: List[str]) -> ExtractedMetadata:
+        """Convert a named-tuple metadata row (see fetchall_named) to ExtractedMetadata."""
+        # file_path_notes replaced notes; older databases may only have the latter
+        fields = row._fields
+        if 'file_path_notes' in fields:
+            notes = row.file_path_notes
+        else:
+            notes = getattr(row, 'notes', None)
         return ExtractedMetadata(
-            file_id=row['file_id'],
-            primary_subject=row['primary_subject'],
-            visual_quality=row['visual_quality'],
-            has_people=row['has_people'],
-            people_count=row['people_count'],
-            is_indoor=row['is_indoor'],
-            social_media_score=row['social_media_score'],
-            social_media_reason=row['social_media_reason'],
-            marketing_score=row['marketing_score'],
-            marketing_use=row['marketing_use'],
+            file_id=row.file_id,
+            primary_subject=row.primary_subject,
+            visual_quality=row.visual_quality,
+            has_people=row.has_people,
+            people_count=choice_value(PEOPLE_COUNT_OPTIONS, PEOPLE_COUNT_IDX, row.people_count),
+            is_indoor=row.is_indoor,
+            social_media_score=row.social_media_score,
+            social_media_reason=row.social_media_reason,
+            marketing_score=row.marketing_score,
+            marketing_use=row.marketing_use,
             activity_tags=activity_tags,
-            season=row['season'],
-            time_of_day=row['time_of_day'],
-            mood_energy=row['mood_energy'],
-            color_palette=row['color_palette'],
-            notes=(row['file_path_notes'] if ('file_path_notes' in row.keys()) else (row['notes'] if ('notes' in row.keys()) else None)),
-            extracted_at=row['extracted_at']
+            season=choice_value(SEASON_OPTIONS, SEASON_IDX, row.season),
+            time_of_day=choice_value(TIME_OF_DAY_OPTIONS, TIME_OF_DAY_IDX, row.time_of_day),
+            mood_energy=row.mood_energy,
+            color_palette=row.color_palette,
+            notes=notes,
+            extracted_at=row.extracted_at
         )
 
 
 class ActivityTagRepository:
     """Repository for activity tag operations."""
     
+    _INSERT_SQL = "INSERT OR IGNORE INTO activity_tags (file_id, tag_name) VALUES (?, ?)"
+    _GET_TAGS_SQL = "SELECT tag_name FROM activity_tags WHERE file_id = ?"
+    
     def __init__(self, db_connection: DatabaseConnection):
         """Initialize activity tag repository."""
         self.db = db_connection
     
     def add_tags(self, file_id: int, tags: List[str]) -> None:
         """Add activity tags for a file."""
+        self.add_tags_many([(file_id, tags)])
+    
+    def add_tags_many(self, items: List[Tuple[int, List[str]]]) -> None:
+        """Add activity tags for many files, as (file_id, tags) pairs, in one commit.
+        
+        All tags are validated before anything is written.
+        """
+        params = [(file_id, tag) for file_id, tags in items for tag in tags]
+        
         # Validate tags
-        for tag in tags:
-            if tag not in ACTIVITY_TAGS:
+        for _, tag in params:
+            if tag not in ACTIVITY_TAGS_SET:
                 raise DatabaseError(f"Invalid activity tag: {tag}")
         
         # Insert tags
-        sql = "INSERT OR IGNORE INTO activity_tags (file_id, tag_name) VALUES (?, ?)"
-        params = [(file_id, tag) for tag in tags]
-        self.db.executemany(sql, params)
+        self.db.executemany(self._INSERT_SQL, params)
     
     def remove_tags(self, file_id: int, tags: Optional[List[str]] = None) -> None:
         """Remove activity tags for a file."""
@@ -522,9 +836,16 @@ class ActivityTagRepository:
     
     def get_tags(self, file_id: int) -> List[str]:
         """Get activity tags for a file."""
-        sql = "SELECT tag_name FROM activity_tags WHERE file_id = ?"
-        rows = self.db.fetchall(sql, (file_id,))
-        return [row['tag_name'] for row in rows]
+        rows = self.db.fetchall(self._GET_TAGS_SQL, (file_id,))
+        return [sys.intern(row['tag_name']) for row in rows]
+    
+    def get_tags_for_files(self, file_ids: List[int]) -> Dict[int, List[str]]:
+        """Get activity tags for many files, keyed by file ID; untagged files are absent."""
+        sql = "SELECT file_id, tag_name FROM activity_tags WHERE file_id IN ({placeholders})"
+        tags: Dict[int, List[str]] = {}
+        for row in _select_in(self.db, sql, file_ids):
+            tags.setdefault(row['file_id'], []).append(sys.intern(row['tag_name']))
+        return tags
     
     def get_tag_counts(self) -> Dict[str, int]:
         """Get count of files for each tag."""
@@ -542,6 +863,11 @@ class ActivityTagRepository:
 class ProcessingHistoryRepository:
     """Repository for processing history operations."""
     
+    _INSERT_SQL = """
+        INSERT INTO processing_history (file_id, status, error_message, processing_time_ms)
+        VALUES (?, ?, ?, ?)
+    """
+    
     def __init__(self, db_connection: DatabaseConnection):
         """Initialize processing history repository."""
         self.db = db_connection
@@ -549,12 +875,15 @@ class ProcessingHistoryRepository:
     def add_entry(self, file_id: int, status: str, error_message: Optional[str] = None,
                   processing_time_ms: Optional[int] = None) -> None:
         """Add a processing history entry."""
-        sql = """
-            INSERT INTO processing_history (file_id, status, error_message, processing_time_ms)
-            VALUES (?, ?, ?, ?)
-        """
+        self.db.execute(self._INSERT_SQL, (file_id, status, error_message, processing_time_ms))
+    
+    def add_entries(self, entries: List[tuple]) -> None:
+        """Add many processing history entries in one commit.
         
-        self.db.execute(sql, (file_id, status, error_message, processing_time_ms))
+        Args:
+            entries: (file_id, status, error_message, processing_time_ms) tuples
+        """
+        self.db.executemany(self._INSERT_SQL, entries)
     
     def get_file_history(self, file_id: int) -> List[Dict[str, Any]]:
         """Get processing history for a file."""
@@ -579,8 +908,7 @@ class MetadataVersionRepository:
             INSERT INTO metadata_versions (file_id, version, data_json, edited_by)
             VALUES (?, ?, ?, ?)
         """
-        cursor = self.db.execute(sql, (file_id, version, data_json, edited_by))
-        return cursor.lastrowid
+        return _insert_id(self.db, sql, (file_id, version, data_json, edited_by))
 
     def list_versions(self, file_id: int):
         sql = """
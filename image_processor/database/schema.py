@@ -1,6 +1,6 @@
 """Database schema definitions for Google Drive Image Processor."""
 
-SCHEMA_VERSION = 4
+SCHEMA_VERSION = 8
 
 SCHEMA_SQL = """
 -- Schema version tracking
@@ -87,41 +87,92 @@ CREATE TABLE IF NOT EXISTS metadata_versions (
     UNIQUE(file_id, version)
 );
 
+-- Triggers to update the updated_at timestamp
+CREATE TRIGGER IF NOT EXISTS update_files_timestamp 
+AFTER UPDATE ON files
+BEGIN
+    UPDATE files SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+"""
+
+
+# Indexes are kept apart from SCHEMA_SQL so create_indexes() can re-run them on
+# every start-up: all are IF NOT EXISTS, and anything an interrupted bulk
+# discover dropped (FileRepository.suspend_indexes) comes back
+INDEX_SQL = """
 -- Create indexes for better query performance
+-- idx_files_status also stores the rowid (id), so it serves
+-- "WHERE processing_status = ? ORDER BY id" without a separate (status, id) index
 CREATE INDEX IF NOT EXISTS idx_files_status ON files(processing_status);
+-- Covers the status/mime_type grouping behind FileRepository.summary()
+CREATE INDEX IF NOT EXISTS idx_files_status_mime ON files(processing_status, mime_type);
+-- Most recently processed files first (list-recent, export-results) without a sort
+CREATE INDEX IF NOT EXISTS idx_files_status_processed ON files(processing_status, processed_at);
 CREATE INDEX IF NOT EXISTS idx_files_drive_id ON files(drive_file_id);
 CREATE INDEX IF NOT EXISTS idx_files_path ON files(file_path);
 CREATE INDEX IF NOT EXISTS idx_metadata_file_id ON metadata(file_id);
-CREATE INDEX IF NOT EXISTS idx_metadata_quality ON metadata(visual_quality);
+-- search() filters on quality and social score together; (tag_name, file_id)
+-- answers its activity tag IN (...) subquery from the index alone
+CREATE INDEX IF NOT EXISTS idx_metadata_quality ON metadata(visual_quality, social_media_score);
+CREATE INDEX IF NOT EXISTS idx_metadata_season ON metadata(season);
 CREATE INDEX IF NOT EXISTS idx_metadata_social ON metadata(social_media_score);
 CREATE INDEX IF NOT EXISTS idx_metadata_marketing ON metadata(marketing_score);
 CREATE INDEX IF NOT EXISTS idx_metadata_people ON metadata(has_people, people_count);
 CREATE INDEX IF NOT EXISTS idx_tags_file_id ON activity_tags(file_id);
-CREATE INDEX IF NOT EXISTS idx_tags_name ON activity_tags(tag_name);
+CREATE INDEX IF NOT EXISTS idx_tags_name ON activity_tags(tag_name, file_id);
 CREATE INDEX IF NOT EXISTS idx_history_file_id ON processing_history(file_id);
 CREATE INDEX IF NOT EXISTS idx_versions_file_id ON metadata_versions(file_id);
+"""
 
--- Triggers to update the updated_at timestamp
-CREATE TRIGGER IF NOT EXISTS update_files_timestamp 
-AFTER UPDATE ON files
-BEGIN
-    UPDATE files SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
+
+# Partial index over the rows backfill-drive-metadata still has to visit. It
+# references columns added in version 4, so it is created outside INDEX_SQL
+# once those columns exist (older files tables are migrated first).
+BACKFILL_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_files_backfill ON files(id)
+WHERE creator IS NULL OR description IS NULL OR width IS NULL OR height IS NULL
 """
 
 
+def create_backfill_index(cursor) -> bool:
+    """Create idx_files_backfill if the files table has its columns; returns whether it exists."""
+    cursor.execute("PRAGMA table_info(files)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if not {'creator', 'description', 'width', 'height'} <= columns:
+        return False
+    cursor.execute(BACKFILL_INDEX_SQL)
+    return True
+
+
+def create_indexes(connection) -> int:
+    """Create any missing indexes; returns how many were created."""
+    cursor = connection.cursor()
+    count_sql = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'"
+    before = cursor.execute(count_sql).fetchone()[0]
+    cursor.executescript(INDEX_SQL)
+    create_backfill_index(cursor)
+    connection.commit()
+    return cursor.execute(count_sql).fetchone()[0] - before
+
+
 def create_schema(connection):
     """Create the database schema."""
+    # Only a new database is stamped with SCHEMA_VERSION; existing ones keep
+    # their version so migrate_schema() still applies the later migrations
+    # (CREATE ... IF NOT EXISTS below leaves changed definitions untouched)
+    fresh = get_schema_version(connection) == 0
     cursor = connection.cursor()
     
     # Execute the schema SQL
     cursor.executescript(SCHEMA_SQL)
+    create_indexes(connection)
     
     # Insert schema version
-    cursor.execute(
-        "INSERT OR IGNORE INTO schema_version (version) VALUES (?)",
-        (SCHEMA_VERSION,)
-    )
+    if fresh:
+        cursor.execute(
+            "INSERT OR IGNORE INTO schema_version (version) VALUES (?)",
+            (SCHEMA_VERSION,)
+        )
     
     connection.commit()
 
@@ -222,6 +273,67 @@ def migrate_schema(connection):
 
             connection.commit()
             print("Added creator/description to files and created metadata_versions table")
+
+        # Migration from version 4 to 5: Covering index for status/type summaries
+        if current_version < 5:
+            cursor = connection.cursor()
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_files_status_mime ON files(processing_status, mime_type)"
+            )
+            cursor.execute(
+                "INSERT INTO schema_version (version) VALUES (?)",
+                (5,)
+            )
+
+            connection.commit()
+            print("Added idx_files_status_mime index")
+
+        # Migration from version 5 to 6: Partial index for the Drive metadata backfill
+        if current_version < 6:
+            cursor = connection.cursor()
+            create_backfill_index(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version) VALUES (?)",
+                (6,)
+            )
+
+            connection.commit()
+            print("Added idx_files_backfill index")
+
+        # Migration from version 6 to 7: Index for most-recently-processed listings
+        if current_version < 7:
+            cursor = connection.cursor()
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_files_status_processed "
+                "ON files(processing_status, processed_at)"
+            )
+            cursor.execute(
+                "INSERT INTO schema_version (version) VALUES (?)",
+                (7,)
+            )
+
+            connection.commit()
+            print("Added idx_files_status_processed index")
+
+        # Migration from version 7 to 8: Composite indexes for metadata search
+        if current_version < 8:
+            cursor = connection.cursor()
+            cursor.execute("DROP INDEX IF EXISTS idx_metadata_quality")
+            cursor.execute(
+                "CREATE INDEX idx_metadata_quality ON metadata(visual_quality, social_media_score)"
+            )
+            cursor.execute("DROP INDEX IF EXISTS idx_tags_name")
+            cursor.execute("CREATE INDEX idx_tags_name ON activity_tags(tag_name, file_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_metadata_season ON metadata(season)")
+            # Collect statistics so the planner weighs the new indexes
+            cursor.execute("ANALYZE")
+            cursor.execute(
+                "INSERT INTO schema_version (version) VALUES (?)",
+                (8,)
+            )
+
+            connection.commit()
+            print("Added composite search indexes and ran ANALYZE")
         
         print(f"Schema migration complete to version {SCHEMA_VERSION}")
     else:
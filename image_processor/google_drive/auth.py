@@ -2,6 +2,7 @@
 
 import os
 import json
+import functools
 import logging
 from pathlib import Path
 from typing import Optional
@@ -9,10 +10,13 @@ from typing import Optional
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 
 from ..core.exceptions import GoogleDriveError
+from ..utils import fastjson
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,25 @@ SCOPES = [
 ]
 
 
+@functools.lru_cache(maxsize=None)
+def _drive_discovery_document() -> Optional[str]:
+    """Drive v3 discovery document bundled with google-api-python-client, read once."""
+    return get_static_doc('drive', 'v3')
+
+
+class _FastJsonModel(JsonModel):
+    """JsonModel that decodes response bodies with orjson when available."""
+    
+    def deserialize(self, content):
+        try:
+            body = fastjson.loads(content)
+        except fastjson.JSONDecodeError:
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+
 class GoogleDriveAuth:
     """Handles Google Drive API authentication."""
     
@@ -97,7 +120,18 @@ class GoogleDriveAuth:
             self.authenticate()
         
         try:
-            service = build('drive', 'v3', credentials=self._creds)
+            # Services are built per thread; reuse the bundled discovery document
+            # rather than re-reading it (or fetching it) for every build
+            discovery_doc = _drive_discovery_document()
+            if discovery_doc:
+                service = build_from_document(
+                    discovery_doc, credentials=self._creds, model=_FastJsonModel()
+                )
+            else:
+                service = build(
+                    'drive', 'v3', credentials=self._creds, cache_discovery=False,
+                    model=_FastJsonModel()
+                )
             logger.info("Successfully created Google Drive service")
             return service
         except HttpError as error:
@@ -2,6 +2,8 @@
 
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import List, Optional, Dict, Any, Generator
 from datetime import datetime
 
@@ -12,6 +14,7 @@ import io
 from ..core.models import MediaFile, ProcessingStatus
 from ..core.config import GoogleDriveConfig
 from ..core.exceptions import GoogleDriveError
+from ..utils.retry import retry_call
 from .auth import GoogleDriveAuth
 
 logger = logging.getLogger(__name__)
@@ -42,6 +45,20 @@ VIDEO_MIME_TYPES = [
 
 MEDIA_MIME_TYPES = IMAGE_MIME_TYPES + VIDEO_MIME_TYPES
 
+# Only the file fields _create_media_file reads; smaller responses list and parse faster
+MEDIA_FILE_FIELDS = (
+    "id, name, mimeType, size, createdTime, modifiedTime, description, "
+    "owners(displayName,emailAddress), lastModifyingUser(displayName,emailAddress), "
+    "imageMediaMetadata(width,height), videoMediaMetadata(width,height)"
+)
+
+# The subset read when backfilling creator/description/dimensions of stored files
+DRIVE_METADATA_FIELDS = (
+    "description, owners(displayName,emailAddress), "
+    "lastModifyingUser(displayName,emailAddress), "
+    "imageMediaMetadata(width,height), videoMediaMetadata(width,height)"
+)
+
 
 class GoogleDriveService:
     """Service for interacting with Google Drive API."""
@@ -55,9 +72,22 @@ class GoogleDriveService:
         """
         self.config = config
         self.auth = auth
-        self.service = auth.get_service()
+        self._local = threading.local()
+        self._local.service = auth.get_service()
         self._rate_limit_delay = config.rate_limit_delay
     
+    @property
+    def service(self):
+        """Drive API client for the calling thread.
+        
+        The underlying httplib2 transport is not thread-safe, so each thread
+        builds and keeps its own client.
+        """
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self.auth.get_service()
+        return service
+    
     def discover_media_files(self, folder_id: Optional[str] = None) -> Generator[MediaFile, None, None]:
         """Discover all media files in Google Drive.
         
@@ -91,7 +121,11 @@ class GoogleDriveService:
         logger.info(f"Discovery complete. Total media files found: {discovered_count}")
     
     def _traverse_folder(self, folder_id: str, path: str = "", shared_drive_id: Optional[str] = None) -> Generator[Dict[str, Any], None, None]:
-        """Recursively traverse folders and yield all files.
+        """Traverse a folder tree and yield all files.
+        
+        Subfolders are listed concurrently on a pool of traversal_workers
+        threads; files are yielded as each folder listing completes, so the
+        order across folders is not deterministic.
         
         Args:
             folder_id: Google Drive folder ID
@@ -101,6 +135,10 @@ class GoogleDriveService:
         Yields:
             File metadata dictionaries
         """
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.traversal_workers,
+            thread_name_prefix='drive-traversal'
+        )
         try:
             # Get folder name if not root
             if folder_id != 'root' and not path:
@@ -108,73 +146,100 @@ class GoogleDriveService:
                 if folder_info:
                     path = folder_info.get('name', '')
             
-            # List all items in the folder
-            page_token = None
+            pending = {executor.submit(self._list_folder, folder_id, path, shared_drive_id)}
             
-            while True:
-                query = f"'{folder_id}' in parents and trashed = false"
-                
-                try:
-                    # Build list parameters
-                    list_params = {
-                        'q': query,
-                        'pageSize': self.config.batch_size,
-                        'fields': "nextPageToken, files(id, name, mimeType, size, createdTime, modifiedTime, parents, description, owners(displayName,emailAddress), lastModifyingUser(displayName,emailAddress), imageMediaMetadata(width,height,cameraMake,cameraModel), videoMediaMetadata(width,height,durationMillis))",
-                        'pageToken': page_token
-                    }
-                    
-                    # Add shared drive parameters if needed
-                    if shared_drive_id:
-                        list_params.update({
-                            'corpora': 'drive',
-                            'driveId': shared_drive_id,
-                            'includeItemsFromAllDrives': True,
-                            'supportsAllDrives': True
-                        })
-                    
-                    results = self.service.files().list(**list_params).execute()
-                    
-                    items = results.get('files', [])
-                    
-                    for item in items:
-                        item['path'] = f"{path}/{item['name']}" if path else item['name']
-                        
-                        if item['mimeType'] == 'application/vnd.google-apps.folder':
-                            # Recursively process subfolder
-                            logger.debug(f"Entering folder: {item['path']}")
-                            yield from self._traverse_folder(item['id'], item['path'], shared_drive_id)
-                        else:
-                            # Yield file
-                            yield item
-                    
-                    page_token = results.get('nextPageToken')
-                    if not page_token:
-                        break
-                    
-                    # Rate limiting
-                    time.sleep(self._rate_limit_delay)
-                    
-                except HttpError as error:
-                    if error.resp.status == 403:
-                        logger.warning(f"Permission denied for folder {folder_id}: {error}")
-                        break
-                    elif error.resp.status == 429:
-                        logger.warning("Rate limit hit, backing off...")
-                        time.sleep(30)  # Back off for 30 seconds
-                        continue
-                    else:
-                        raise GoogleDriveError(f"Error listing files in folder {folder_id}: {error}")
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subfolders = future.result()
+                    for subfolder in subfolders:
+                        logger.debug(f"Entering folder: {subfolder['path']}")
+                        pending.add(executor.submit(
+                            self._list_folder, subfolder['id'], subfolder['path'], shared_drive_id
+                        ))
+                    yield from files
                         
         except Exception as e:
             logger.error(f"Error traversing folder {folder_id}: {e}")
             raise GoogleDriveError(f"Failed to traverse folder: {e}")
+        finally:
+            # Stop listing folders nobody will consume (e.g. a discovery limit was hit)
+            executor.shutdown(wait=True, cancel_futures=True)
     
-    def _get_file_info(self, file_id: str, shared_drive_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    def _list_folder(self, folder_id: str, path: str, shared_drive_id: Optional[str] = None):
+        """List every page of a single folder.
+        
+        Args:
+            folder_id: Google Drive folder ID
+            path: Folder path used to build item paths
+            shared_drive_id: Optional shared drive ID if folder is in a shared drive
+        
+        Returns:
+            Tuple of (files, subfolders) metadata dictionary lists
+        """
+        files = []
+        subfolders = []
+        page_token = None
+        
+        while True:
+            query = f"'{folder_id}' in parents and trashed = false"
+            
+            try:
+                # Build list parameters
+                list_params = {
+                    'q': query,
+                    'pageSize': self.config.batch_size,
+                    'fields': f"nextPageToken, files({MEDIA_FILE_FIELDS})",
+                    'pageToken': page_token
+                }
+                
+                # Add shared drive parameters if needed
+                if shared_drive_id:
+                    list_params.update({
+                        'corpora': 'drive',
+                        'driveId': shared_drive_id,
+                        'includeItemsFromAllDrives': True,
+                        'supportsAllDrives': True
+                    })
+                
+                results = self.service.files().list(**list_params).execute()
+                
+                for item in results.get('files', []):
+                    item['path'] = f"{path}/{item['name']}" if path else item['name']
+                    
+                    if item['mimeType'] == 'application/vnd.google-apps.folder':
+                        subfolders.append(item)
+                    else:
+                        files.append(item)
+                
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+                
+                # Rate limiting
+                time.sleep(self._rate_limit_delay)
+                
+            except HttpError as error:
+                if error.resp.status == 403:
+                    logger.warning(f"Permission denied for folder {folder_id}: {error}")
+                    break
+                elif error.resp.status == 429:
+                    logger.warning("Rate limit hit, backing off...")
+                    time.sleep(30)  # Back off for 30 seconds
+                    continue
+                else:
+                    raise GoogleDriveError(f"Error listing files in folder {folder_id}: {error}")
+        
+        return files, subfolders
+    
+    def _get_file_info(self, file_id: str, shared_drive_id: Optional[str] = None,
+                       fields: str = MEDIA_FILE_FIELDS) -> Optional[Dict[str, Any]]:
         """Get detailed information about a file.
         
         Args:
             file_id: Google Drive file ID
             shared_drive_id: Optional shared drive ID if file is in a shared drive
+            fields: Partial-response field mask; request only what the caller reads
         
         Returns:
             File metadata dictionary or None if error
@@ -182,7 +247,7 @@ class GoogleDriveService:
         try:
             get_params = {
                 'fileId': file_id,
-                'fields': "id, name, mimeType, size, createdTime, modifiedTime, parents, description, owners(displayName,emailAddress), lastModifyingUser(displayName,emailAddress), imageMediaMetadata(width,height,cameraMake,cameraModel), videoMediaMetadata(width,height,durationMillis)",
+                'fields': fields,
                 'supportsAllDrives': True
             }
             
@@ -208,42 +273,48 @@ class GoogleDriveService:
             File content as bytes, or raises GoogleDriveError on failure
         """
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            
-            if output_path:
-                # Download to file
-                with io.FileIO(output_path, 'wb') as fh:
-                    downloader = MediaIoBaseDownload(fh, request)
-                    done = False
-                    
-                    while not done:
-                        status, done = downloader.next_chunk()
-                        if status:
-                            logger.debug(f"Download {int(status.progress() * 100)}% complete")
-                
-                logger.info(f"Downloaded file {file_id} to {output_path}")
-                
-                # Read and return the file content
-                with open(output_path, 'rb') as f:
-                    return f.read()
-            else:
-                # Download to memory
-                buffer = io.BytesIO()
-                downloader = MediaIoBaseDownload(buffer, request)
+            # Rate limits (429) and transient 5xx errors are retried with
+            # backoff that honours Retry-After
+            return retry_call(self._download, file_id, output_path, retry_on=(HttpError,))
+        except HttpError as error:
+            logger.error(f"Error downloading file {file_id}: {error}")
+            raise GoogleDriveError(f"Failed to download file {file_id}: {error}")
+    
+    def _download(self, file_id: str, output_path: Optional[str]) -> bytes:
+        """Single download attempt; see download_file."""
+        request = self.service.files().get_media(fileId=file_id)
+        
+        if output_path:
+            # Download to file
+            with io.FileIO(output_path, 'wb') as fh:
+                downloader = MediaIoBaseDownload(fh, request)
                 done = False
                 
                 while not done:
                     status, done = downloader.next_chunk()
                     if status:
                         logger.debug(f"Download {int(status.progress() * 100)}% complete")
-                
-                logger.debug(f"Downloaded file {file_id} to memory")
-                return buffer.getvalue()
             
-        except HttpError as error:
-            logger.error(f"Error downloading file {file_id}: {error}")
-            raise GoogleDriveError(f"Failed to download file {file_id}: {error}")
-    
+            logger.info(f"Downloaded file {file_id} to {output_path}")
+            
+            # Read and return the file content
+            with open(output_path, 'rb') as f:
+                return f.read()
+        else:
+            # Download to memory
+            buffer = io.BytesIO()
+            downloader = MediaIoBaseDownload(buffer, request)
+            done = False
+            
+            while not done:
+                status, done = downloader.next_chunk()
+                if status:
+                    logger.debug(f"Download {int(status.progress() * 100)}% complete")
+            
+            logger.debug(f"Downloaded file {file_id} to memory")
+            return buffer.getvalue()
+        
+
     def download_file_to_path(self, file_id: str, output_path: str) -> bool:
         """Download a file from Google Drive to a specific path.
         
@@ -397,4 +468,66 @@ class GoogleDriveService:
             else:
                 counts['other'] += 1
         
-        return counts
\ No newline at end of file
+        return counts
+    
+    def count_by_mime(self, folder_id: Optional[str] = None) -> Dict[str, int]:
+        """Get count of files by type, filtering on the Drive side when possible.
+        
+        When the folder is the root of a shared drive, the whole drive is in
+        scope, so three id-only queries (all files, images, videos) are run
+        concurrently and Drive does the classification. Other folders need a
+        recursive walk and fall back to get_file_count().
+        
+        Args:
+            folder_id: Optional folder ID to count from
+        
+        Returns:
+            Dictionary with counts by file type
+        """
+        start_folder = folder_id or self.config.root_folder_id or 'root'
+        shared_drive_id = self._get_shared_drive_id(start_folder)
+        
+        if not shared_drive_id or shared_drive_id != start_folder:
+            return self.get_file_count(start_folder)
+        
+        queries = {
+            'total': "mimeType != 'application/vnd.google-apps.folder'",
+            'images': ' or '.join(f"mimeType = '{m}'" for m in IMAGE_MIME_TYPES),
+            'videos': ' or '.join(f"mimeType = '{m}'" for m in VIDEO_MIME_TYPES),
+        }
+        
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            futures = {
+                key: executor.submit(self._count_query, query, shared_drive_id)
+                for key, query in queries.items()
+            }
+            counts = {key: future.result() for key, future in futures.items()}
+        
+        counts['other'] = counts['total'] - counts['images'] - counts['videos']
+        return counts
+    
+    def _count_query(self, query: str, shared_drive_id: str) -> int:
+        """Count the non-trashed files in a shared drive matching a query."""
+        count = 0
+        page_token = None
+        
+        while True:
+            request = self.service.files().list(
+                q=f"({query}) and trashed = false",
+                fields="nextPageToken, files(id)",
+                pageSize=1000,
+                pageToken=page_token,
+                corpora='drive',
+                driveId=shared_drive_id,
+                includeItemsFromAllDrives=True,
+                supportsAllDrives=True
+            )
+            try:
+                results = retry_call(request.execute, retry_on=(HttpError,))
+            except HttpError as error:
+                raise GoogleDriveError(f"Error counting files in drive {shared_drive_id}: {error}")
+            
+            count += len(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return count
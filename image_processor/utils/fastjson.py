@@ -0,0 +1,35 @@
+"""JSON encoding and decoding that uses orjson when it is installed.
+
+orjson is an optional speedup for large API responses (Drive listings,
+vision API bodies) and exports; without it the standard library is used.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# catch this regardless of which decoder ran
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Decode a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Encode obj as UTF-8 JSON indented by two spaces.
+    
+    Both encoders produce the same layout as json.dumps(obj, indent=2,
+    ensure_ascii=False).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
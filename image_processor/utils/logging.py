@@ -1,7 +1,6 @@
 """Logging configuration and utilities."""
 
 import logging
-import logging.handlers
 import sys
 from pathlib import Path
 from typing import Optional, Union
@@ -52,10 +51,14 @@ def setup_logging(config: Union[LoggingConfig, int], correlation_id: Optional[st
     
     # File handler with rotation
     if config.file_path:
+        # Imported here: logging.handlers pulls in socket and pickle, which the
+        # CLI's console-only setup never needs
+        from logging.handlers import RotatingFileHandler
+        
         log_file = Path(config.file_path)
         log_file.parent.mkdir(parents=True, exist_ok=True)
         
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = RotatingFileHandler(
             filename=log_file,
             maxBytes=config.max_file_size_mb * 1024 * 1024,
             backupCount=config.backup_count
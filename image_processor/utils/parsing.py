@@ -0,0 +1,41 @@
+"""Helpers for pulling structured data out of model output."""
+
+import json
+import re
+from typing import Any, Dict
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """Extract the first JSON object from model output.
+
+    Tolerates markdown code fences, leading prose and trailing text
+    (including stray braces after the object) so a usable answer is never
+    thrown away just because it was wrapped.
+
+    Raises:
+        ValueError: If no JSON object can be decoded from the text.
+    """
+    stripped = text.strip()
+    if stripped.startswith('{'):
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+
+    candidates = [m.group(1) for m in _FENCE_RE.finditer(text)] + [text]
+    for candidate in candidates:
+        start = candidate.find('{')
+        while start != -1:
+            try:
+                obj, _ = _decoder.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                start = candidate.find('{', start + 1)
+                continue
+            if isinstance(obj, dict):
+                return obj
+            start = candidate.find('{', start + 1)
+
+    raise ValueError("No JSON object found in response")
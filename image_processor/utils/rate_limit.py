@@ -0,0 +1,51 @@
+"""Thread-safe request rate limiting for API clients shared across workers."""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque
+
+
+class RateLimiter:
+    """Sliding-window limiter allowing ``rate`` calls per ``period`` seconds.
+
+    ``acquire()`` blocks until a slot is free, so worker threads sharing one
+    limiter never exceed the rate together. A non-positive rate disables
+    limiting.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.period = period
+        # Calls allowed per window; slow rates (< 1 per period) get one call
+        # per 1/rate seconds
+        self._capacity = max(1, int(rate * period)) if rate > 0 else 0
+        self._window = self._capacity / rate if rate > 0 else 0.0
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+
+    def acquire(self) -> None:
+        """Block until another call is allowed, then record it."""
+        if not self._capacity:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                while self._calls and now - self._calls[0] >= self._window:
+                    self._calls.popleft()
+                if len(self._calls) < self._capacity:
+                    self._calls.append(now)
+                    return
+                wait = self._window - (now - self._calls[0])
+            self._sleep(wait)
+
+    def __enter__(self) -> "RateLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
@@ -0,0 +1,90 @@
+"""Retry helpers with exponential backoff that honour Retry-After."""
+
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a googleapiclient HttpError or an Anthropic API error."""
+    resp = getattr(error, 'resp', None)  # googleapiclient.errors.HttpError
+    if resp is not None and getattr(resp, 'status', None) is not None:
+        return int(resp.status)
+    status = getattr(error, 'status_code', None)  # anthropic.APIStatusError
+    return int(status) if status is not None else None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by the server's Retry-After header, if any."""
+    headers = None
+    resp = getattr(error, 'resp', None)
+    if resp is not None and hasattr(resp, 'get'):
+        headers = resp
+    else:
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an API error is transient (rate limit or 5xx)."""
+    return get_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None,
+                  base: float = 1.0, max_delay: float = 60.0) -> float:
+    """Delay before retry ``attempt`` (0-based): Retry-After if given, else exponential."""
+    if error is not None:
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, max_delay)
+    return min(base * (2 ** attempt), max_delay)
+
+
+def retry_call(func: Callable[..., Any], *args: Any,
+               attempts: int = 6,
+               retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+               should_retry: Callable[[BaseException], bool] = is_retryable,
+               sleep: Callable[[float], None] = time.sleep,
+               **kwargs: Any) -> Any:
+    """Call ``func`` and retry transient failures with backoff.
+
+    Only exceptions that are instances of ``retry_on`` and accepted by
+    ``should_retry`` are retried; anything else propagates immediately, as
+    does the last error once ``attempts`` calls have failed.
+    """
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except retry_on as e:
+            if attempt == attempts - 1 or not should_retry(e):
+                raise
+            delay = backoff_delay(attempt, e)
+            logger.warning(
+                f"{getattr(func, '__name__', 'call')} failed ({e}); "
+                f"retrying in {delay:.1f}s (attempt {attempt + 1}/{attempts})"
+            )
+            sleep(delay)
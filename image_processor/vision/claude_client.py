@@ -4,9 +4,11 @@ import json
 import logging
 import base64
 import os
+import time
 from io import BytesIO
 from typing import Dict, Any, Optional
 import anthropic
+import httpx
 from PIL import Image
 try:
     from pillow_heif import register_heif_opener
@@ -16,6 +18,9 @@ except ImportError:
 
 from ..core.config import VisionModelConfig
 from ..core.exceptions import VisionAnalysisError
+from ..utils.parsing import extract_json_object
+from ..utils.rate_limit import RateLimiter
+from ..utils.retry import backoff_delay
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +28,35 @@ logger = logging.getLogger(__name__)
 class ClaudeVisionClient:
     """Client for communicating with Claude 3.5 Haiku via Anthropic API."""
     
-    def __init__(self, config: VisionModelConfig):
-        """Initialize the Claude vision client."""
+    def __init__(self, config: VisionModelConfig, rate_limiter: Optional[RateLimiter] = None):
+        """Initialize the Claude vision client.
+        
+        Args:
+            config: Vision model configuration
+            rate_limiter: Limiter taken before every API request, retries included
+        """
         self.config = config
+        self.rate_limiter = rate_limiter or RateLimiter(0)
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise VisionAnalysisError("ANTHROPIC_API_KEY environment variable not set")
         
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # One pooled keep-alive HTTP client for every request (and retry) so
+        # repeated calls reuse TCP/TLS connections instead of re-handshaking
+        self._http_client = anthropic.DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        )
+        self.client = anthropic.Anthropic(
+            api_key=api_key,
+            timeout=config.timeout_seconds,
+            http_client=self._http_client
+        )
         self.model = "claude-3-5-haiku-20241022"
     
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.client.close()
+    
     def analyze_image(self, image_data: bytes, filename: str, file_path: str = None) -> Dict[str, Any]:
         """
         Analyze an image using 2-pass approach: visual analysis then critical scoring.
@@ -81,19 +105,21 @@ class ClaudeVisionClient:
         try:
             # Open and potentially resize image
             with Image.open(BytesIO(image_data)) as img:
-                # Determine original format for media type
-                original_format = img.format
-                media_type = self._get_media_type(original_format)
+                # Small RGB JPEGs are already in the transmission format; send as-is
+                max_size = 512  # smaller long edge cuts latency/cost
+                if img.format == 'JPEG' and img.mode == 'RGB' and max(img.size) <= max_size:
+                    return base64.b64encode(image_data).decode('utf-8'), "image/jpeg"
+                
+                # Resize before any mode conversion: thumbnail() lets the JPEG
+                # decoder downscale while decoding (draft mode), which is lost
+                # once convert() has forced a full-resolution decode
+                if max(img.size) > max_size:
+                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
                 
                 # Convert to RGB if necessary
                 if img.mode != 'RGB':
                     img = img.convert('RGB')
                 
-                # Resize if too large (use smaller long edge to cut latency/cost)
-                max_size = 512
-                if max(img.size) > max_size:
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-                
                 # Re-encode to compact JPEG for transmission
                 buffer = BytesIO()
                 img.save(buffer, format='JPEG', quality=80, optimize=True, progressive=True)
@@ -202,11 +228,14 @@ Colors: {visual_data.get('color_palette', 'Unknown')}"""
             Anthropic API response
         """
         last_exception = None
+        # Read once per request rather than on every attempt
+        max_retries = self.config.max_retries
         
-        for attempt in range(self.config.max_retries):
+        for attempt in range(max_retries):
             try:
-                logger.debug(f"Making Claude API request (attempt {attempt + 1}/{self.config.max_retries})")
+                logger.debug(f"Making Claude API request (attempt {attempt + 1}/{max_retries})")
                 
+                self.rate_limiter.acquire()
                 response = self.client.messages.create(
                     model=self.model,
                     max_tokens=self.config.max_tokens,
@@ -237,12 +266,11 @@ Colors: {visual_data.get('color_palette', 'Unknown')}"""
                 last_exception = e
                 logger.warning(f"Claude API request attempt {attempt + 1} failed: {e}")
                 
-                if attempt < self.config.max_retries - 1:
-                    # Wait before retry (exponential backoff)
-                    import time
-                    time.sleep(2 ** attempt)
+                if attempt < max_retries - 1:
+                    # Wait before retry: server Retry-After on 429s, else exponential backoff
+                    time.sleep(backoff_delay(attempt, e))
         
-        raise VisionAnalysisError(f"All {self.config.max_retries} API requests failed. Last error: {last_exception}")
+        raise VisionAnalysisError(f"All {max_retries} API requests failed. Last error: {last_exception}")
     
     def _parse_visual_response(self, response: anthropic.types.Message, filename: str) -> Dict[str, Any]:
         """Parse Pass 1 visual analysis response."""
@@ -280,15 +308,8 @@ Colors: {visual_data.get('color_palette', 'Unknown')}"""
             
             # Try to parse JSON from the content
             try:
-                # Look for JSON block in the response
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                
-                if json_start == -1 or json_end <= json_start:
-                    raise ValueError("No JSON block found in response")
-                
-                json_content = content[json_start:json_end]
-                metadata = json.loads(json_content)
+                # Tolerate fences/prose around the JSON object
+                metadata = extract_json_object(content)
                 
                 # Validate based on pass type
                 if pass_type == "visual":
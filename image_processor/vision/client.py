@@ -6,6 +6,7 @@ import base64
 from io import BytesIO
 from typing import Dict, Any, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image
 try:
     from pillow_heif import register_heif_opener
@@ -15,6 +16,9 @@ except ImportError:
 
 from ..core.config import VisionModelConfig
 from ..core.exceptions import VisionAnalysisError
+from ..utils import fastjson
+from ..utils.parsing import extract_json_object
+from ..utils.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +26,25 @@ logger = logging.getLogger(__name__)
 class VisionClient:
     """Client for communicating with local Gemma-3-4b-it-qat vision model."""
     
-    def __init__(self, config: VisionModelConfig):
-        """Initialize the vision client."""
+    def __init__(self, config: VisionModelConfig, rate_limiter: Optional[RateLimiter] = None):
+        """Initialize the vision client.
+        
+        Args:
+            config: Vision model configuration
+            rate_limiter: Limiter taken before every API request, retries included
+        """
         self.config = config
+        self.rate_limiter = rate_limiter or RateLimiter(0)
         self.session = requests.Session()
         self.session.timeout = config.timeout_seconds
+        # Size the keep-alive pool for concurrent processing workers
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.session.close()
     
     def analyze_image(self, image_data: bytes, filename: str, file_path: str = None) -> Dict[str, Any]:
         """
@@ -137,11 +155,14 @@ class VisionClient:
         }
         
         last_exception = None
+        # Read once per request rather than on every attempt
+        max_retries = self.config.max_retries
         
-        for attempt in range(self.config.max_retries):
+        for attempt in range(max_retries):
             try:
-                logger.debug(f"Making vision API request (attempt {attempt + 1}/{self.config.max_retries})")
+                logger.debug(f"Making vision API request (attempt {attempt + 1}/{max_retries})")
                 
+                self.rate_limiter.acquire()
                 response = self.session.post(
                     url,
                     headers=headers,
@@ -158,12 +179,12 @@ class VisionClient:
                 last_exception = e
                 logger.warning(f"Vision API request attempt {attempt + 1} failed: {e}")
                 
-                if attempt < self.config.max_retries - 1:
+                if attempt < max_retries - 1:
                     # Wait before retry (exponential backoff)
                     import time
                     time.sleep(2 ** attempt)
         
-        raise VisionAnalysisError(f"All {self.config.max_retries} API requests failed. Last error: {last_exception}")
+        raise VisionAnalysisError(f"All {max_retries} API requests failed. Last error: {last_exception}")
     
     def _parse_response(self, response: requests.Response, filename: str) -> Dict[str, Any]:
         """
@@ -177,7 +198,7 @@ class VisionClient:
             Parsed metadata dictionary
         """
         try:
-            response_data = response.json()
+            response_data = fastjson.loads(response.content)
             
             # Extract content from OpenAI-compatible response
             if 'choices' not in response_data or not response_data['choices']:
@@ -188,15 +209,8 @@ class VisionClient:
             # Try to parse JSON from the content
             # The model should return JSON, but may include additional text
             try:
-                # Look for JSON block in the response
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                
-                if json_start == -1 or json_end <= json_start:
-                    raise ValueError("No JSON block found in response")
-                
-                json_content = content[json_start:json_end]
-                metadata = json.loads(json_content)
+                # Tolerate fences/prose around the JSON object
+                metadata = extract_json_object(content)
                 
                 # Validate required fields
                 required_fields = [
@@ -1,8 +1,10 @@
 """Vision analysis service for processing media files."""
 
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pathlib import Path
 
 from .claude_client import ClaudeVisionClient as VisionClient
@@ -11,6 +13,7 @@ from ..core.models import MediaFile, ExtractedMetadata, ProcessingStatus
 from ..database import DatabaseConnection, FileRepository, MetadataRepository, ActivityTagRepository
 from ..google_drive import GoogleDriveAuth, GoogleDriveService
 from ..core.exceptions import VisionAnalysisError, ProcessingError
+from ..utils.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +24,13 @@ class VisionAnalysisService:
     def __init__(self, config: Config):
         """Initialize the vision analysis service."""
         self.config = config
-        self.vision_client = VisionClient(config.vision_model)
+        # Shared by all worker threads so concurrent files stay within the API
+        # budget; the client takes it per HTTP request (two passes plus retries)
+        self.rate_limiter = RateLimiter(config.vision_model.requests_per_second)
+        self.vision_client = VisionClient(config.vision_model, rate_limiter=self.rate_limiter)
         
         # Initialize database connections
-        self.db_connection = DatabaseConnection(config.database)
+        self.db_connection = DatabaseConnection.get(config.database)
         self.file_repo = FileRepository(self.db_connection)
         self.metadata_repo = MetadataRepository(self.db_connection)
         self.activity_tag_repo = ActivityTagRepository(self.db_connection)
@@ -33,6 +39,16 @@ class VisionAnalysisService:
         self.drive_auth = GoogleDriveAuth(config.google_drive.credentials_path)
         self.drive_service = GoogleDriveService(config.google_drive, self.drive_auth)
     
+    def __enter__(self) -> "VisionAnalysisService":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Release the vision client's pooled HTTP connections."""
+        self.vision_client.close()
+    
     def process_file(self, file_id: int) -> bool:
         """
         Process a single file with vision analysis.
@@ -63,112 +79,171 @@ class VisionAnalysisService:
                 ProcessingStatus.IN_PROGRESS
             )
             
-            try:
-                # Download file from Google Drive
-                image_data = self.drive_service.download_file(media_file.drive_file_id)
-                
-                # Analyze with vision model
-                metadata_dict = self.vision_client.analyze_image(
-                    image_data, 
-                    media_file.filename,
-                    media_file.file_path
-                )
-                
-                # Create ExtractedMetadata object
-                extracted_metadata = ExtractedMetadata(
-                    primary_subject=metadata_dict['primary_subject'],
-                    visual_quality=metadata_dict['visual_quality'],
-                    has_people=metadata_dict['has_people'],
-                    people_count=metadata_dict['people_count'],
-                    is_indoor=metadata_dict['is_indoor'],
-                    social_media_score=metadata_dict['social_media_score'],
-                    social_media_reason=metadata_dict['social_media_reason'],
-                    marketing_score=metadata_dict['marketing_score'],
-                    marketing_use=metadata_dict['marketing_use'],
-                    activity_tags=metadata_dict['activity_tags'],
-                    season=metadata_dict.get('season'),
-                    time_of_day=metadata_dict.get('time_of_day'),
-                    mood_energy=metadata_dict.get('mood_energy'),
-                    color_palette=metadata_dict.get('color_palette'),
-                    notes=metadata_dict.get('notes'),
-                    extracted_at=datetime.now(),
-                    file_id=file_id
-                )
-                
-                # Save metadata to database (idempotent)
-                self.metadata_repo.upsert(extracted_metadata)
-                
-                # Save activity tags
-                if extracted_metadata.activity_tags:
-                    # Replace tags to avoid stale entries from previous runs
-                    try:
-                        self.activity_tag_repo.remove_tags(file_id)
-                    except Exception:
-                        pass
-                    self.activity_tag_repo.add_tags(file_id, extracted_metadata.activity_tags)
-                
-                # Update file status to completed
-                self.file_repo.update_processing_status(
-                    file_id, 
-                    ProcessingStatus.COMPLETED,
-                    processed_at=datetime.now()
-                )
-                
-                logger.info(f"Successfully processed {media_file.filename}")
-                return True
-                
-            except Exception as e:
-                # Update status to failed
-                self.file_repo.update_processing_status(
-                    file_id, 
-                    ProcessingStatus.FAILED,
-                    error_message=str(e)
-                )
-                logger.error(f"Failed to process {media_file.filename}: {e}")
-                return False
+            return self._record_result(*self._analyze_pending_file(media_file))
                 
         except Exception as e:
             logger.error(f"Error processing file ID {file_id}: {e}")
             return False
     
-    def process_pending_files(self, limit: Optional[int] = None) -> dict:
+    def _analyze_file(self, media_file: MediaFile) -> ExtractedMetadata:
+        """Download a file and analyze it; touches the network only, not the database."""
+        # Download file from Google Drive
+        image_data = self.drive_service.download_file(media_file.drive_file_id)
+        
+        # Analyze with vision model; its requests draw on the shared budget
+        metadata_dict = self.vision_client.analyze_image(
+            image_data, 
+            media_file.filename,
+            media_file.file_path
+        )
+        
+        # Create ExtractedMetadata object
+        return ExtractedMetadata(
+            primary_subject=metadata_dict['primary_subject'],
+            visual_quality=metadata_dict['visual_quality'],
+            has_people=metadata_dict['has_people'],
+            people_count=metadata_dict['people_count'],
+            is_indoor=metadata_dict['is_indoor'],
+            social_media_score=metadata_dict['social_media_score'],
+            social_media_reason=metadata_dict['social_media_reason'],
+            marketing_score=metadata_dict['marketing_score'],
+            marketing_use=metadata_dict['marketing_use'],
+            activity_tags=metadata_dict['activity_tags'],
+            season=metadata_dict.get('season'),
+            time_of_day=metadata_dict.get('time_of_day'),
+            mood_energy=metadata_dict.get('mood_energy'),
+            color_palette=metadata_dict.get('color_palette'),
+            notes=metadata_dict.get('notes'),
+            extracted_at=datetime.now(),
+            file_id=media_file.id
+        )
+    
+    def _analyze_pending_file(self, media_file: MediaFile
+                              ) -> Tuple[MediaFile, Optional[ExtractedMetadata], Optional[str]]:
+        """Analyze one file, never raising; returns (media_file, metadata, error)."""
+        try:
+            return media_file, self._analyze_file(media_file), None
+        except Exception as e:
+            return media_file, None, str(e)
+    
+    def _record_result(self, media_file: MediaFile, extracted_metadata: Optional[ExtractedMetadata],
+                       error: Optional[str]) -> bool:
+        """Store an analysis result (or failure) for a file; returns whether it succeeded."""
+        file_id = media_file.id
+        try:
+            if error is not None:
+                raise VisionAnalysisError(error)
+            
+            # Save metadata to database (idempotent)
+            self.metadata_repo.upsert(extracted_metadata)
+            
+            # Save activity tags
+            if extracted_metadata.activity_tags:
+                # Replace tags to avoid stale entries from previous runs
+                try:
+                    self.activity_tag_repo.remove_tags(file_id)
+                except Exception:
+                    pass
+                self.activity_tag_repo.add_tags(file_id, extracted_metadata.activity_tags)
+            
+            # Update file status to completed
+            self.file_repo.update_processing_status(
+                file_id, 
+                ProcessingStatus.COMPLETED,
+                processed_at=datetime.now()
+            )
+            
+            logger.info(f"Successfully processed {media_file.filename}")
+            return True
+            
+        except Exception as e:
+            # Update status to failed
+            self.file_repo.update_processing_status(
+                file_id, 
+                ProcessingStatus.FAILED,
+                error_message=str(e)
+            )
+            logger.error(f"Failed to process {media_file.filename}: {e}")
+            return False
+    
+    def process_pending_files(self, limit: Optional[int] = None,
+                              max_workers: Optional[int] = None) -> dict:
         """
         Process all pending files.
         
+        Downloads and vision calls run concurrently on a thread pool; each file is
+        dominated by network latency, so workers mostly wait. Database writes stay
+        on the calling thread, which stores each group of finished files in one
+        transaction, so workers never contend for the SQLite write lock. If the
+        run stops early (an error or Ctrl-C), queued analyses are cancelled,
+        finished ones are stored and the remaining submitted files go back to
+        pending rather than staying in_progress.
+        
         Args:
             limit: Maximum number of files to process
+            max_workers: Number of files processed at once (defaults to
+                processing.concurrent_workers)
             
         Returns:
             Dictionary with processing statistics
         """
         try:
-            # Get pending image files only
-            all_pending = self.file_repo.get_by_status(ProcessingStatus.PENDING)
-            pending_files = [f for f in all_pending if self._is_image_file(f.mime_type)]
-            
+            # Stream pending image files in id-ordered chunks instead of loading
+            # the whole queue; later chunks are read while earlier files process
+            pending_files = (
+                media_file
+                for chunk in self.file_repo.iter_pending()
+                for media_file in chunk
+                if self._is_image_file(media_file.mime_type)
+            )
             if limit:
-                pending_files = pending_files[:limit]
-            
-            if not pending_files:
-                logger.info("No pending image files to process")
-                return {'processed': 0, 'failed': 0, 'skipped': 0}
+                pending_files = islice(pending_files, limit)
             
-            logger.info(f"Processing {len(pending_files)} pending image files")
+            workers = max_workers or self.config.processing.concurrent_workers
+            logger.info(f"Processing pending image files with {workers} workers")
             
             processed = 0
             failed = 0
+            # Submitted files by future, until their result is committed
+            in_flight = {}
             
-            for media_file in pending_files:
-                try:
-                    success = self.process_file(media_file.id)
-                    if success:
-                        processed += 1
-                    else:
-                        failed += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing file {media_file.filename}: {e}")
-                    failed += 1
+            def store(futures) -> None:
+                # Results are written and counted on this thread only
+                nonlocal processed, failed
+                results = [future.result() for future in futures]
+                with self.db_connection.transaction(immediate=True):
+                    outcomes = [self._record_result(*result) for result in results]
+                processed += sum(outcomes)
+                failed += len(outcomes) - sum(outcomes)
+                for future in futures:
+                    del in_flight[future]
+            
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                for media_file in pending_files:
+                    # Keep a small backlog queued so workers never idle
+                    if len(in_flight) >= workers * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        store(done)
+                    logger.info(f"Processing file: {media_file.filename}")
+                    in_flight[executor.submit(self._analyze_pending_file, media_file)] = media_file
+                    self.file_repo.update_processing_status(
+                        media_file.id, ProcessingStatus.IN_PROGRESS
+                    )
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    store(done)
+            except BaseException:
+                # Don't wait for (or pay for) queued analyses; keep the finished
+                # ones and hand every other submitted file back to the queue
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._abandon_in_flight(in_flight, store)
+                raise
+            executor.shutdown()
+            
+            if processed + failed == 0:
+                logger.info("No pending image files to process")
+                return {'processed': 0, 'failed': 0, 'skipped': 0}
             
             logger.info(f"Processing complete: {processed} successful, {failed} failed")
             
@@ -182,6 +257,28 @@ class VisionAnalysisService:
             logger.error(f"Error in process_pending_files: {e}")
             raise ProcessingError(f"Failed to process pending files: {e}")
     
+    def _abandon_in_flight(self, in_flight: dict, store) -> None:
+        """Clean up after process_pending_files stops early.
+        
+        Stores the analyses that already finished, if the database allows,
+        and resets every other file still in in_flight from in_progress to
+        pending so a later run picks it up again.
+        """
+        finished = [future for future in in_flight if future.done() and not future.cancelled()]
+        if finished:
+            try:
+                store(finished)
+            except Exception as e:
+                logger.error(f"Could not store {len(finished)} finished analyses: {e}")
+        
+        if in_flight:
+            file_ids = [media_file.id for media_file in in_flight.values()]
+            try:
+                reset = self.file_repo.reset_in_progress(file_ids)
+                logger.info(f"Returned {reset} unfinished files to pending")
+            except Exception as e:
+                logger.error(f"Could not return files {file_ids} to pending: {e}")
+    
     def process_file_by_drive_id(self, drive_file_id: str) -> bool:
         """
         Process a file by its Google Drive ID.
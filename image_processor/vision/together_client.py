@@ -5,12 +5,16 @@ import json
 import base64
 import logging
 from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image
 
 from ..core.exceptions import VisionAnalysisError
+from ..utils import fastjson
+from ..utils.parsing import extract_json_object
+from ..utils.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +24,23 @@ class TogetherVisionClient:
 
     API_URL = "https://api.together.xyz/v1/chat/completions"
 
-    def __init__(self, max_tokens: int = 800, max_retries: int = 2):
+    def __init__(self, max_tokens: int = 800, max_retries: int = 2,
+                 rate_limiter: Optional[RateLimiter] = None):
         self.api_key = os.getenv("TOGETHER_API_KEY")
         if not self.api_key:
             raise VisionAnalysisError("TOGETHER_API_KEY environment variable not set")
         self.max_tokens = max_tokens
         self.max_retries = max_retries
+        # Taken before every HTTP request: each analysis makes two, plus retries
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        # Reuse TCP/TLS connections across both passes and every image
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self.session.close()
 
     def analyze_image(self, image_data: bytes, filename: str, file_path: str, model: str) -> Dict[str, Any]:
         """Analyze an image using two 1-shot prompts on the specified Together model."""
@@ -76,9 +91,10 @@ class TogetherVisionClient:
         last = None
         for attempt in range(self.max_retries):
             try:
-                resp = requests.post(self.API_URL, headers=headers, data=json.dumps(body), timeout=60)
+                self.rate_limiter.acquire()
+                resp = self.session.post(self.API_URL, headers=headers, data=json.dumps(body), timeout=60)
                 resp.raise_for_status()
-                return resp.json()
+                return fastjson.loads(resp.content)
             except Exception as e:
                 last = e
                 logger.warning(f"Together request failed (attempt {attempt+1}/{self.max_retries}): {e}")
@@ -91,11 +107,10 @@ class TogetherVisionClient:
             raise VisionAnalysisError(f"Invalid Together response structure: {e}")
 
     def _parse_json_block(self, text: str) -> Dict[str, Any]:
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        if start == -1 or end <= start:
+        try:
+            return extract_json_object(text)
+        except ValueError:
             raise VisionAnalysisError("No JSON object in model output")
-        return json.loads(text[start:end])
 
     def _pass1_visual(self, model: str, image_b64: str, media_type: str, filename: str, file_path: str) -> Dict[str, Any]:
         prompt = f"""Return EXACTLY one JSON object and nothing else. No prose, no markdown.
@@ -5,6 +5,8 @@ import sqlite3
 import tempfile
 from pathlib import Path
 import threading
+import time
+from unittest import mock
 
 from image_processor.core.config import DatabaseConfig
 from image_processor.database.connection import DatabaseConnection
@@ -61,12 +63,18 @@ class TestDatabaseConnection:
                 assert table in tables
     
     def test_connection_thread_safety(self, db_connection):
-        """Test that connections are thread-local."""
+        """Test that threads share one connection and never use it at the same time."""
         connections = []
+        active = []
+        overlaps = []
         
         def get_connection():
             with db_connection.get_connection() as conn:
+                active.append(1)
+                overlaps.append(len(active))
                 connections.append(id(conn))
+                time.sleep(0.01)
+                active.pop()
         
         # Get connections from different threads
         threads = []
@@ -78,8 +86,49 @@ class TestDatabaseConnection:
         for t in threads:
             t.join()
         
-        # All connection IDs should be different
-        assert len(set(connections)) == len(connections)
+        assert len(set(connections)) == 1
+        assert max(overlaps) == 1
+    
+    def test_close_reopens_on_next_use(self, db_connection):
+        """Test that close() closes the shared connection and later calls reopen it."""
+        with db_connection.get_connection() as conn:
+            pass
+        
+        db_connection.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        
+        assert db_connection.fetchone("SELECT 1")[0] == 1
+    
+    def test_close_optimizes(self, db_connection):
+        """Test that closing a writable connection runs PRAGMA optimize."""
+        with db_connection.get_connection() as conn:
+            statements = []
+            conn.set_trace_callback(statements.append)
+        
+        db_connection.close()
+        assert "PRAGMA optimize" in statements
+    
+    def test_checkpoint_every_interval(self, db_connection, temp_db_path):
+        """Test that transaction() truncates the WAL every checkpoint_interval commits."""
+        wal_path = Path(f"{temp_db_path}-wal")
+        db_connection.checkpoint_interval = 3
+        
+        for i in range(2):
+            with db_connection.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+                    (f'ckpt_{i}', 'c.jpg', '/c')
+                )
+        assert wal_path.stat().st_size > 0
+        
+        with db_connection.transaction() as conn:
+            conn.execute(
+                "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+                ('ckpt_2', 'c.jpg', '/c')
+            )
+        assert wal_path.stat().st_size == 0
+        assert db_connection.checkpoint()[0] == 0
     
     def test_transaction_commit(self, db_connection):
         """Test transaction commit."""
@@ -116,6 +165,74 @@ class TestDatabaseConnection:
         )
         assert result is None
     
+    def test_immediate_transaction_takes_write_lock(self, db_connection, temp_db_path):
+        """Test that an immediate transaction blocks other writers until commit."""
+        other = sqlite3.connect(str(temp_db_path), timeout=0, isolation_level=None)
+        try:
+            with db_connection.transaction(immediate=True):
+                with pytest.raises(sqlite3.OperationalError):
+                    other.execute("BEGIN IMMEDIATE")
+            other.execute("BEGIN IMMEDIATE")
+            other.execute("ROLLBACK")
+        finally:
+            other.close()
+    
+    def test_get_returns_shared_instance(self, db_config):
+        """Test that get() reuses one manager per database path."""
+        try:
+            first = DatabaseConnection.get(db_config)
+            assert DatabaseConnection.get(db_config) is first
+        finally:
+            DatabaseConnection._instances.clear()
+    
+    def test_read_only_connection(self, db_connection, db_config):
+        """Test that read-only managers read the database but cannot write to it."""
+        db_connection.execute(
+            "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+            ('ro_test', 'ro.jpg', '/ro/path')
+        )
+
+        try:
+            reader = DatabaseConnection.get(db_config, read_only=True)
+            assert reader.read_only
+            assert reader is not DatabaseConnection.get(db_config)
+            assert reader.fetchone("PRAGMA query_only")[0] == 1
+            assert reader.fetchone(
+                "SELECT filename FROM files WHERE drive_file_id = ?", ('ro_test',)
+            )['filename'] == 'ro.jpg'
+            with pytest.raises(DatabaseError):
+                reader.execute("DELETE FROM files")
+        finally:
+            DatabaseConnection._instances.clear()
+
+    def test_read_only_falls_back_without_database(self, tmp_path):
+        """Test that a missing database file is created by a writable manager."""
+        config = DatabaseConfig(path=str(tmp_path / "new.db"))
+        try:
+            manager = DatabaseConnection.get(config, read_only=True)
+            assert not manager.read_only
+            assert (tmp_path / "new.db").exists()
+        finally:
+            DatabaseConnection._instances.clear()
+
+    def test_get_without_initialize(self, db_connection, db_config, tmp_path):
+        """Test that initialize=False skips the schema check for existing databases."""
+        try:
+            with mock.patch.object(DatabaseConnection, '_initialize_database') as init:
+                manager = DatabaseConnection.get(db_config, initialize=False)
+            init.assert_not_called()
+            assert not manager.initialized
+
+            # A later caller that needs the schema check still gets it
+            assert DatabaseConnection.get(db_config) is manager
+            assert manager.initialized
+
+            # A missing database is always created
+            new_config = DatabaseConfig(path=str(tmp_path / "new.db"))
+            assert DatabaseConnection.get(new_config, initialize=False).initialized
+        finally:
+            DatabaseConnection._instances.clear()
+
     def test_execute_methods(self, db_connection):
         """Test execute helper methods."""
         # Test execute
@@ -150,6 +267,37 @@ class TestDatabaseConnection:
         assert 'test4.jpg' in filenames
         assert 'test5.jpg' in filenames
     
+    def test_executemany_is_atomic(self, db_connection):
+        """Test that executemany writes all rows in one transaction or none."""
+        with pytest.raises(DatabaseError):
+            db_connection.executemany(
+                "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+                [('many_1', 'a.jpg', '/a'), ('many_2', None, '/b')]  # filename is NOT NULL
+            )
+        
+        assert db_connection.fetchone(
+            "SELECT COUNT(*) FROM files WHERE drive_file_id LIKE 'many_%'"
+        )[0] == 0
+    
+    def test_fetch_named(self, db_connection):
+        """Test fetching rows as named tuples."""
+        db_connection.execute(
+            "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+            ('named_1', 'named.jpg', '/named')
+        )
+        
+        rows = db_connection.fetchall_named(
+            "SELECT id, filename FROM files WHERE drive_file_id = ?", ('named_1',)
+        )
+        assert rows[0].filename == 'named.jpg'
+        assert rows[0] == (rows[0].id, 'named.jpg')
+        
+        assert db_connection.fetchone_named(
+            "SELECT filename FROM files WHERE drive_file_id = ?", ('missing',)
+        ) is None
+        # Other queries on the connection still return sqlite3.Row
+        assert db_connection.fetchone("SELECT 1 AS one")['one'] == 1
+    
     def test_foreign_keys_enabled(self, db_connection):
         """Test that foreign keys are enabled."""
         result = db_connection.fetchone("PRAGMA foreign_keys")
@@ -160,6 +308,34 @@ class TestDatabaseConnection:
         result = db_connection.fetchone("PRAGMA journal_mode")
         assert result[0] == 'wal'
     
+    def test_performance_pragmas(self, db_connection):
+        """Test that the bulk-write PRAGMAs are applied."""
+        assert db_connection.fetchone("PRAGMA synchronous")[0] == 1  # NORMAL
+        assert db_connection.fetchone("PRAGMA temp_store")[0] == 2  # MEMORY
+        assert db_connection.fetchone("PRAGMA cache_size")[0] == -131072
+        assert db_connection.fetchone("PRAGMA wal_autocheckpoint")[0] == 1000
+    
+    def test_synchronous_is_configurable(self, temp_db_path):
+        """Test that DatabaseConfig.synchronous selects the fsync policy."""
+        db = DatabaseConnection(DatabaseConfig(path=str(temp_db_path), synchronous="full"))
+        assert db.fetchone("PRAGMA synchronous")[0] == 2  # FULL
+        
+        with pytest.raises(DatabaseError):
+            DatabaseConnection(DatabaseConfig(path=str(temp_db_path), synchronous="NORMAL; DROP"))
+    
+    def test_synchronous_from_yaml_boolean(self, temp_db_path):
+        """Test that a YAML-parsed boolean synchronous value maps to OFF."""
+        db = DatabaseConnection(DatabaseConfig(path=str(temp_db_path), synchronous=False))
+        assert db.fetchone("PRAGMA synchronous")[0] == 0  # OFF
+    
+    def test_cache_and_mmap_are_configurable(self, temp_db_path):
+        """Test that the page cache and mmap sizes come from DatabaseConfig."""
+        db = DatabaseConnection(DatabaseConfig(
+            path=str(temp_db_path), cache_size_mb=64, mmap_size_mb=0
+        ))
+        assert db.fetchone("PRAGMA cache_size")[0] == -65536
+        assert db.fetchone("PRAGMA mmap_size")[0] == 0
+    
     def test_backup(self, db_connection, temp_db_path):
         """Test database backup functionality."""
         # Insert test data
@@ -185,4 +361,26 @@ class TestDatabaseConnection:
         assert result[0] == 'backup.jpg'
         
         backup_conn.close()
-        backup_path.unlink()  # Cleanup
\ No newline at end of file
+        backup_path.unlink()  # Cleanup
+    
+    def test_backup_in_steps_reports_progress(self, db_connection, temp_db_path):
+        """Test that backup copies a few pages per step and reports each step."""
+        db_connection.executemany(
+            "INSERT INTO files (drive_file_id, filename, file_path) VALUES (?, ?, ?)",
+            [(f'step_{i}', 'x' * 500, '/p') for i in range(200)]
+        )
+        steps = []
+        
+        backup_path = temp_db_path.with_suffix('.steps.db')
+        try:
+            db_connection.backup(backup_path, pages=5,
+                                 progress=lambda status, remaining, total: steps.append(remaining))
+            
+            assert len(steps) > 1
+            assert steps[-1] == 0
+            with sqlite3.connect(str(backup_path)) as backup_conn:
+                assert backup_conn.execute(
+                    "SELECT COUNT(*) FROM files WHERE drive_file_id LIKE 'step_%'"
+                ).fetchone()[0] == 200
+        finally:
+            backup_path.unlink()
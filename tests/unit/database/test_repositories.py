@@ -1,9 +1,11 @@
 """Tests for repository classes."""
 
 import pytest
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 import tempfile
+from unittest import mock
 
 from image_processor.core.config import DatabaseConfig
 from image_processor.core.models import (
@@ -18,6 +20,21 @@ from image_processor.database.repositories import (
 from image_processor.core.exceptions import DatabaseError
 
 
+def make_media_file(drive_file_id, **overrides):
+    """Build a MediaFile named after drive_file_id; keyword arguments override fields."""
+    fields = dict(
+        drive_file_id=drive_file_id,
+        filename=f"{drive_file_id}.jpg",
+        file_path=f"/test/{drive_file_id}.jpg",
+        file_size=1024,
+        mime_type="image/jpeg",
+        created_date=datetime.now(),
+        modified_date=datetime.now()
+    )
+    fields.update(overrides)
+    return MediaFile(**fields)
+
+
 class TestFileRepository:
     """Test FileRepository class."""
     
@@ -65,6 +82,16 @@ class TestFileRepository:
         assert retrieved.drive_file_id == sample_media_file.drive_file_id
         assert retrieved.filename == sample_media_file.filename
     
+    @pytest.mark.parametrize("has_returning", [True, False])
+    def test_create_returns_id_or_none(self, file_repo, sample_media_file, has_returning):
+        """Test create() with and without INSERT ... RETURNING support."""
+        with mock.patch('image_processor.database.repositories._HAS_RETURNING', has_returning):
+            file_id = file_repo.create(sample_media_file)
+            assert file_repo.get_by_id(file_id).drive_file_id == sample_media_file.drive_file_id
+            
+            # Already stored Drive ID
+            assert file_repo.create(sample_media_file) is None
+    
     def test_get_by_drive_id(self, file_repo, sample_media_file):
         """Test getting file by Google Drive ID."""
         file_id = file_repo.create(sample_media_file)
@@ -110,6 +137,34 @@ class TestFileRepository:
         # Test with limit
         limited = file_repo.get_pending_files(limit=3)
         assert len(limited) == 3
+        
+        # Rows share one interned MIME type string
+        assert all(f.mime_type is pending[0].mime_type for f in pending)
+    
+    def test_iter_pending(self, file_repo):
+        """Test keyset-paginated iteration over pending files."""
+        ids = [file_repo.create(make_media_file(f"iter_{i}")) for i in range(5)]
+        file_repo.update_processing_status(ids[1], ProcessingStatus.COMPLETED)
+        
+        chunks = file_repo.iter_pending(chunk_size=2)
+        first = next(chunks)
+        assert [f.id for f in first] == [ids[0], ids[2]]
+        
+        # A file finished mid-iteration is not returned again or skipped past
+        file_repo.update_processing_status(ids[3], ProcessingStatus.COMPLETED)
+        assert [[f.id for f in chunk] for chunk in chunks] == [[ids[4]]]
+    
+    def test_reset_in_progress(self, file_repo):
+        """Test returning interrupted files to pending without touching finished ones."""
+        ids = [file_repo.create(make_media_file(f"reset_{i}")) for i in range(3)]
+        file_repo.update_processing_status(ids[0], ProcessingStatus.IN_PROGRESS)
+        file_repo.update_processing_status(ids[1], ProcessingStatus.IN_PROGRESS)
+        file_repo.update_processing_status(ids[2], ProcessingStatus.COMPLETED)
+        
+        assert file_repo.reset_in_progress(ids) == 2
+        assert [file_repo.get_by_id(i).processing_status for i in ids] == [
+            ProcessingStatus.PENDING, ProcessingStatus.PENDING, ProcessingStatus.COMPLETED
+        ]
     
     def test_update_status(self, file_repo, sample_media_file):
         """Test updating file status."""
@@ -139,6 +194,75 @@ class TestFileRepository:
         file_repo.create(sample_media_file)
         assert file_repo.exists(sample_media_file.drive_file_id)
     
+    def test_create_many_and_existing_ids(self, file_repo):
+        """Test bulk insert and batched existence lookup."""
+        files = [make_media_file(f"bulk_{i}") for i in range(5)]
+        
+        assert file_repo.existing_ids([f.drive_file_id for f in files]) == set()
+        assert file_repo.create_many(files) == 5
+        assert file_repo.create_many([]) == 0
+        
+        found = file_repo.existing_ids(["bulk_0", "bulk_4", "missing"])
+        assert found == {"bulk_0", "bulk_4"}
+        assert file_repo.get_by_drive_id("bulk_3").filename == "bulk_3.jpg"
+        assert file_repo.all_drive_ids() == {f"bulk_{i}" for i in range(5)}
+        assert file_repo.all_drive_ids(chunk_size=2) == {f"bulk_{i}" for i in range(5)}
+        
+        # Already-stored Drive IDs are skipped rather than raising
+        assert file_repo.create_many(files[:2]) == 0
+        assert file_repo.create(files[0]) is None
+    
+    def test_suspend_and_rebuild_indexes(self, file_repo, db_connection):
+        """Test dropping secondary file indexes for a bulk load and restoring them."""
+        index_sql = (
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'files' AND sql IS NOT NULL"
+        )
+        before = {row['name'] for row in db_connection.fetchall(index_sql)}
+        assert 'idx_files_status' in before
+        
+        file_repo.suspend_indexes()
+        assert {row['name'] for row in db_connection.fetchall(index_sql)} == set()
+        
+        # The unique drive_file_id index still deduplicates inserts
+        file_repo.create_many([make_media_file("bulk_dup")] * 2)
+        assert len(file_repo.all_drive_ids()) == 1
+        
+        file_repo.rebuild_indexes()
+        assert {row['name'] for row in db_connection.fetchall(index_sql)} == before
+    
+    def test_suspended_indexes_return_on_next_start(self, file_repo, db_connection):
+        """Test that indexes a crashed bulk load never rebuilt are recreated on start-up."""
+        index_sql = (
+            "SELECT name FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = 'files' AND sql IS NOT NULL"
+        )
+        before = {row['name'] for row in db_connection.fetchall(index_sql)}
+        file_repo.suspend_indexes()
+        db_connection.close()
+        
+        reopened = DatabaseConnection(db_connection.config)
+        try:
+            assert {row['name'] for row in reopened.fetchall(index_sql)} == before
+        finally:
+            reopened.close()
+    
+    def test_update_drive_metadata_many(self, file_repo, sample_media_file):
+        """Test batched Drive metadata updates keep stored values where none is given."""
+        sample_media_file.description = "Original description"
+        file_id = file_repo.create(sample_media_file)
+
+        assert file_repo.update_drive_metadata_many([]) == 0
+        assert file_repo.update_drive_metadata_many([
+            (file_id, "Jane Doe", None, 640, 480),
+            (file_id + 1000, "Nobody", None, None, None),
+        ]) == 1
+
+        updated = file_repo.get_by_id(file_id)
+        assert updated.creator == "Jane Doe"
+        assert updated.description == "Original description"
+        assert (updated.width, updated.height) == (640, 480)
+
     def test_get_processing_stats(self, file_repo):
         """Test getting processing statistics."""
         # Create files with different statuses
@@ -170,6 +294,31 @@ class TestFileRepository:
         assert stats['in_progress'] == 1
         assert stats['completed'] == 3
         assert stats['failed'] == 1
+    
+    def test_summary(self, file_repo):
+        """Test status and type counts from the grouped summary query."""
+        rows = [
+            ("image/jpeg", ProcessingStatus.COMPLETED),
+            ("image/png", ProcessingStatus.PENDING),
+            ("image/jpeg", ProcessingStatus.FAILED),
+            ("video/mp4", ProcessingStatus.PENDING),
+            ("application/pdf", ProcessingStatus.PENDING)
+        ]
+        
+        for i, (mime_type, status) in enumerate(rows):
+            file_repo.create(make_media_file(
+                f"sum_{i}", mime_type=mime_type, processing_status=status
+            ))
+        
+        summary = file_repo.summary()
+        assert summary['total'] == 5
+        assert summary['images'] == 3
+        assert summary['videos'] == 1
+        assert summary['images_completed'] == 1
+        assert summary['images_pending'] == 1
+        assert summary['images_failed'] == 1
+        assert summary['by_status'] == {'completed': 1, 'pending': 3, 'failed': 1}
+        assert file_repo.get_detailed_stats()['images'] == 3
 
 
 class TestMetadataRepository:
@@ -255,6 +404,74 @@ class TestMetadataRepository:
         assert retrieved.has_people == sample_metadata.has_people
         assert set(retrieved.activity_tags) == set(sample_metadata.activity_tags)
     
+    def test_search_cache_follows_database_changes(self, metadata_repo, file_repo,
+                                                    tag_repo, sample_metadata, db_connection):
+        """Test that repeated searches are cached until the database changes."""
+        file_id = file_repo.create(make_media_file("cache_test"))
+        sample_metadata.file_id = file_id
+        metadata_repo.create(sample_metadata)
+        file_repo.update_status(file_id, ProcessingStatus.COMPLETED)
+        
+        with mock.patch.object(metadata_repo, '_search', wraps=metadata_repo._search) as run:
+            first = metadata_repo.search({"min_visual_quality": 4})
+            first[0]['activity_tags'].append('modified')
+            assert metadata_repo.search({"min_visual_quality": 4})[0]['activity_tags'] == []
+            assert run.call_count == 1
+            
+            # A write through this connection
+            tag_repo.add_tags(file_id, ["gardening"])
+            assert metadata_repo.search({"min_visual_quality": 4})[0]['activity_tags'] == ["gardening"]
+            assert run.call_count == 2
+            
+            # A write from another connection (such as the web app)
+            other = sqlite3.connect(str(db_connection.db_path))
+            with other:
+                other.execute("UPDATE metadata SET visual_quality = 2 WHERE file_id = ?", (file_id,))
+            other.close()
+            assert metadata_repo.search({"min_visual_quality": 4}) == []
+            assert run.call_count == 3
+    
+    def test_get_file_details(self, metadata_repo, file_repo, tag_repo, sample_metadata):
+        """Test the joined file, metadata and tag lookup."""
+        file_id = file_repo.create(make_media_file("details_test", filename="details.jpg"))
+        
+        details = file_repo.get_file_details(file_id)
+        assert details['filename'] == "details.jpg"
+        assert details['drive_url'] == "https://drive.google.com/file/d/details_test/view"
+        assert details['metadata'] is None
+        
+        sample_metadata.file_id = file_id
+        metadata_repo.create(sample_metadata)
+        tag_repo.add_tags(file_id, sample_metadata.activity_tags)
+        
+        details = file_repo.get_file_details(file_id)
+        assert details['id'] == file_id
+        assert details['processing_status'] == "pending"
+        assert details['metadata'].primary_subject == sample_metadata.primary_subject
+        assert set(details['metadata'].activity_tags) == set(sample_metadata.activity_tags)
+        assert file_repo.get_file_details(file_id + 1000) is None
+
+    def test_get_by_file_ids(self, metadata_repo, file_repo, tag_repo, sample_metadata):
+        """Test batched metadata and tag lookup for many files."""
+        file_ids = [file_repo.create(make_media_file(f"batch_{i}")) for i in range(3)]
+        for file_id in file_ids[:2]:
+            sample_metadata.file_id = file_id
+            metadata_repo.create(sample_metadata)
+        tag_repo.add_tags(file_ids[0], ["gardening", "education"])
+        tag_repo.add_tags(file_ids[2], ["tools"])
+
+        found = metadata_repo.get_by_file_ids(file_ids)
+        assert set(found) == set(file_ids[:2])
+        assert set(found[file_ids[0]].activity_tags) == {"gardening", "education"}
+        assert found[file_ids[1]].activity_tags == []
+        assert found[file_ids[1]].primary_subject == sample_metadata.primary_subject
+        assert metadata_repo.get_by_file_ids([]) == {}
+
+        tags = tag_repo.get_tags_for_files(file_ids)
+        assert set(tags[file_ids[0]]) == {"gardening", "education"}
+        assert tags[file_ids[2]] == ["tools"]
+        assert file_ids[1] not in tags
+
     def test_validate_metadata(self, metadata_repo):
         """Test metadata validation."""
         invalid_metadata = ExtractedMetadata(
@@ -344,6 +561,9 @@ class TestMetadataRepository:
         results = metadata_repo.search({"activity_tags": "gardening"})
         assert len(results) == 1
         assert results[0]['filename'] == 'garden_group.jpg'
+        assert 'gardening' in results[0]['activity_tags']
+        assert results[0]['id'] == file_repo.get_by_drive_id(results[0]['drive_file_id']).id
+        assert results[0]['marketing_use'] == "Hero image"
         
         # Search by visual quality
         results = metadata_repo.search({"min_visual_quality": 4})
@@ -364,6 +584,13 @@ class TestMetadataRepository:
             "activity_tags": ["gardening", "cooking"]
         })
         assert len(results) == 2
+        
+        # Ordering and limit
+        results = metadata_repo.search({"order_by": "marketing_score", "limit": 1})
+        assert len(results) == 1
+        assert metadata_repo.search({"order_by": "m.visual_quality DESC"})
+        with pytest.raises(DatabaseError, match="Invalid order_by"):
+            metadata_repo.search({"order_by": "1; DROP TABLE files"})
 
 
 class TestActivityTagRepository:
@@ -416,6 +643,19 @@ class TestActivityTagRepository:
         retrieved_tags = tag_repo.get_tags(file_id)
         assert set(retrieved_tags) == set(tags)
     
+    def test_add_tags_many(self, tag_repo, file_repo):
+        """Test adding tags for several files at once, validating before writing."""
+        first, second = [file_repo.create(make_media_file(f"many_tags_{i}")) for i in range(2)]
+        
+        with pytest.raises(DatabaseError):
+            tag_repo.add_tags_many([(first, ["gardening"]), (second, ["invalid_tag"])])
+        assert tag_repo.get_tags(first) == []
+        
+        tag_repo.add_tags_many([(first, ["gardening", "cooking"]), (second, ["children"])])
+        tags = tag_repo.get_tags_for_files([first, second])
+        assert sorted(tags[first]) == ["cooking", "gardening"]
+        assert tags[second] == ["children"]
+    
     def test_invalid_tag(self, tag_repo):
         """Test adding invalid tag."""
         with pytest.raises(DatabaseError):
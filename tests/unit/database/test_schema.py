@@ -5,6 +5,8 @@ import sqlite3
 import tempfile
 from pathlib import Path
 
+from image_processor.core.config import DatabaseConfig
+from image_processor.database.connection import DatabaseConnection
 from image_processor.database.schema import create_schema, get_schema_version, SCHEMA_VERSION
 
 
@@ -194,13 +196,97 @@ class TestDatabaseSchema:
             'idx_files_path',
             'idx_metadata_file_id',
             'idx_metadata_quality',
+            'idx_metadata_season',
             'idx_metadata_social',
             'idx_metadata_marketing',
             'idx_metadata_people',
             'idx_tags_file_id',
             'idx_tags_name',
-            'idx_history_file_id'
+            'idx_history_file_id',
+            'idx_files_backfill',
+            'idx_files_status_processed'
         ]
         
         for idx in expected_indexes:
-            assert idx in indexes
\ No newline at end of file
+            assert idx in indexes
+    
+    def test_backfill_index_serves_missing_fields_scan(self, temp_db):
+        """Test that the backfill batch query reads the partial index."""
+        create_schema(temp_db)
+        
+        plan = temp_db.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM files WHERE id > 0 "
+            "AND (creator IS NULL OR description IS NULL OR width IS NULL OR height IS NULL) "
+            "ORDER BY id LIMIT 100"
+        ).fetchall()
+        assert any('idx_files_backfill' in row[-1] for row in plan)
+    
+    def test_recent_completed_needs_no_sort(self, temp_db):
+        """Test that newest-completed listings walk an index instead of sorting."""
+        create_schema(temp_db)
+        
+        plan = temp_db.execute(
+            "EXPLAIN QUERY PLAN SELECT id, filename, processed_at FROM files "
+            "WHERE processing_status='completed' ORDER BY processed_at DESC LIMIT 10"
+        ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        assert 'idx_files_status_processed' in details
+        assert 'TEMP B-TREE' not in details
+    
+    def test_status_index_serves_ordered_scan(self, temp_db):
+        """Test that status filtering ordered by id is an index range seek."""
+        create_schema(temp_db)
+        
+        plan = temp_db.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM files "
+            "WHERE processing_status = 'completed' ORDER BY id"
+        ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'idx_files_status' in details
+        assert 'TEMP B-TREE' not in details
+    
+    def test_tag_filter_reads_only_the_index(self, temp_db):
+        """Test that search()'s activity tag subquery is answered by a covering index."""
+        create_schema(temp_db)
+        
+        plan = temp_db.execute(
+            "EXPLAIN QUERY PLAN SELECT file_id FROM activity_tags "
+            "WHERE tag_name IN ('gardening', 'cooking')"
+        ).fetchall()
+        details = ' '.join(row[-1] for row in plan)
+        
+        assert 'COVERING INDEX idx_tags_name' in details
+    
+    def test_existing_database_gets_v8_indexes(self, temp_db):
+        """Test that opening a version 7 database rebuilds the widened search indexes."""
+        create_schema(temp_db)
+        temp_db.executescript("""
+            DELETE FROM schema_version;
+            INSERT INTO schema_version (version) VALUES (7);
+            DROP INDEX idx_metadata_quality;
+            CREATE INDEX idx_metadata_quality ON metadata(visual_quality);
+            DROP INDEX idx_tags_name;
+            CREATE INDEX idx_tags_name ON activity_tags(tag_name);
+            DROP INDEX idx_metadata_season;
+        """)
+        db_path = temp_db.execute("PRAGMA database_list").fetchone()[2]
+        
+        db = DatabaseConnection(DatabaseConfig(path=db_path))
+        try:
+            index_sql = {
+                row[0]: row[1] for row in db.fetchall(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            assert index_sql['idx_metadata_quality'].endswith(
+                "metadata(visual_quality, social_media_score)"
+            )
+            assert index_sql['idx_tags_name'].endswith("activity_tags(tag_name, file_id)")
+            assert 'idx_metadata_season' in index_sql
+            assert db.fetchone("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")[0] == 1
+            
+            versions = {row[0] for row in db.fetchall("SELECT version FROM schema_version")}
+            assert versions == {7, 8}
+        finally:
+            db.close()
@@ -8,7 +8,9 @@ from googleapiclient.errors import HttpError
 from image_processor.core.config import GoogleDriveConfig
 from image_processor.core.models import MediaFile, ProcessingStatus
 from image_processor.google_drive.auth import GoogleDriveAuth
-from image_processor.google_drive.service import GoogleDriveService, MEDIA_MIME_TYPES
+from image_processor.google_drive.service import (
+    GoogleDriveService, MEDIA_MIME_TYPES, MEDIA_FILE_FIELDS, DRIVE_METADATA_FIELDS
+)
 from image_processor.core.exceptions import GoogleDriveError
 
 
@@ -125,6 +127,37 @@ class TestGoogleDriveService:
         assert results[0]['id'] == 'file1'
         assert results[0]['name'] == 'image1.jpg'
     
+    def test_traverse_folder_nested_tree(self, service):
+        """Test concurrent traversal collects files from every subfolder."""
+        folder = 'application/vnd.google-apps.folder'
+        tree = {
+            'root_folder': [
+                {'id': 'a', 'name': 'A', 'mimeType': folder},
+                {'id': 'b', 'name': 'B', 'mimeType': folder},
+                {'id': 'top', 'name': 'top.jpg', 'mimeType': 'image/jpeg'}
+            ],
+            'a': [
+                {'id': 'a1', 'name': 'A1', 'mimeType': folder},
+                {'id': 'a_img', 'name': 'a.jpg', 'mimeType': 'image/jpeg'}
+            ],
+            'a1': [{'id': 'deep', 'name': 'deep.png', 'mimeType': 'image/png'}],
+            'b': [{'id': 'b_vid', 'name': 'b.mp4', 'mimeType': 'video/mp4'}]
+        }
+        
+        def mock_list(**params):
+            parent = params['q'].split("'")[1]
+            request = Mock()
+            request.execute.return_value = {'files': [dict(f) for f in tree[parent]]}
+            return request
+        
+        service.service.files().list = Mock(side_effect=mock_list)
+        
+        results = list(service._traverse_folder('root_folder', path='Root'))
+        
+        assert {f['path'] for f in results} == {
+            'Root/top.jpg', 'Root/A/a.jpg', 'Root/A/A1/deep.png', 'Root/B/b.mp4'
+        }
+    
     def test_traverse_folder_with_pagination(self, service):
         """Test folder traversal with pagination."""
         mock_files_list = Mock()
@@ -234,6 +267,56 @@ class TestGoogleDriveService:
         assert counts['videos'] == 1
         assert counts['other'] == 2
     
+    def test_count_by_mime_shared_drive_root(self, service):
+        """Test shared drive roots are counted with server-side filters."""
+        pages = {
+            'total': [{'files': [{'id': str(i)} for i in range(3)], 'nextPageToken': 't'},
+                      {'files': [{'id': str(i)} for i in range(3, 6)]}],
+            'images': [{'files': [{'id': '1'}, {'id': '2'}]}],
+            'videos': [{'files': [{'id': '3'}]}]
+        }
+        
+        def mock_list(**params):
+            if params['q'].startswith("(mimeType != "):
+                key = 'total'
+            elif 'image/' in params['q']:
+                key = 'images'
+            else:
+                key = 'videos'
+            page = 1 if params['pageToken'] else 0
+            request = Mock()
+            request.execute.return_value = pages[key][page]
+            return request
+        
+        service.service.files().list = Mock(side_effect=mock_list)
+        
+        with patch.object(service, '_get_shared_drive_id', return_value='drive1'), \
+                patch.object(service, 'get_file_count') as walk:
+            counts = service.count_by_mime('drive1')
+        
+        walk.assert_not_called()
+        assert counts == {'total': 6, 'images': 2, 'videos': 1, 'other': 3}
+    
+    def test_count_by_mime_falls_back_to_walk(self, service):
+        """Test folders inside a drive are still counted recursively."""
+        with patch.object(service, '_get_shared_drive_id', return_value='drive1'), \
+                patch.object(service, 'get_file_count', return_value={'total': 1}) as walk:
+            assert service.count_by_mime('subfolder') == {'total': 1}
+        
+        walk.assert_called_once_with('subfolder')
+    
+    def test_get_file_info_fields(self, service):
+        """Test file lookups request only the given partial-response fields."""
+        get = Mock()
+        get.return_value.execute.return_value = {'description': 'A photo'}
+        service.service.files().get = get
+        
+        assert service._get_file_info('file1', fields=DRIVE_METADATA_FIELDS) == {'description': 'A photo'}
+        assert get.call_args.kwargs['fields'] == DRIVE_METADATA_FIELDS
+        
+        service._get_file_info('file1')
+        assert get.call_args.kwargs['fields'] == MEDIA_FILE_FIELDS
+    
     @patch('time.sleep')  # Mock sleep to speed up tests
     def test_rate_limiting(self, mock_sleep, service):
         """Test rate limiting behavior."""
@@ -1,5 +1,6 @@
 """Unit tests for configuration management."""
 
+import dataclasses
 import os
 import tempfile
 import pytest
@@ -115,6 +116,30 @@ logging:
         finally:
             os.unlink(temp_path)
 
+    def test_config_from_file_is_cached_until_changed(self, tmp_path):
+        """Test that an unchanged file is parsed once and an edited one again."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("google_drive:\n  credentials_path: a.json\n")
+
+        first = Config.from_file(str(config_file))
+        assert Config.from_file(str(config_file)) is first
+
+        config_file.write_text("google_drive:\n  credentials_path: bb.json\n")
+        reloaded = Config.from_file(str(config_file))
+        assert reloaded is not first
+        assert reloaded.google_drive.credentials_path == "bb.json"
+
+    def test_config_from_file_unquoted_synchronous_off(self, tmp_path):
+        """Test that synchronous: off, which YAML reads as false, means OFF."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "google_drive:\n  credentials_path: a.json\ndatabase:\n  synchronous: off\n"
+        )
+
+        config = Config.from_file(str(config_file))
+        assert config.database.synchronous is False
+        config.validate(check_credentials=False)
+
 
 class TestConfigFromEnv:
     """Test loading configuration from environment variables."""
@@ -173,14 +198,36 @@ class TestConfigFromEnv:
             if os.path.exists("credentials.json"):
                 os.unlink("credentials.json")
 
+    def test_config_from_injected_env(self):
+        """Test loading configuration from a mapping instead of os.environ."""
+        config = Config.from_env({
+            'GOOGLE_BATCH_SIZE': '200',
+            'VISION_REQUESTS_PER_SECOND': '0.5',
+            'DATABASE_BACKUP_ENABLED': 'False',
+        })
+
+        assert config.google_drive.batch_size == 200
+        assert config.vision_model.requests_per_second == 0.5
+        assert config.database.backup_enabled is False
+        assert config.database.path == "image_metadata.db"
+
 
 class TestConfigValidation:
     """Test configuration validation."""
     
+    def test_config_is_immutable(self):
+        """Test that shared config objects cannot be modified in place."""
+        config = Config.from_env({})
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.vision_model.temperature = 0.9
+    
     def test_validate_missing_credentials(self):
         """Test validation with missing credentials file."""
         config = Config.from_env()
-        config.google_drive.credentials_path = "nonexistent.json"
+        config = dataclasses.replace(config, google_drive=dataclasses.replace(
+            config.google_drive, credentials_path="nonexistent.json"
+        ))
         
         with pytest.raises(ConfigurationError, match="credentials file not found"):
             config.validate()
@@ -193,7 +240,9 @@ class TestConfigValidation:
         
         try:
             config = Config.from_env()
-            config.vision_model.temperature = 1.5
+            config = dataclasses.replace(
+                config, vision_model=dataclasses.replace(config.vision_model, temperature=1.5)
+            )
             
             with pytest.raises(ConfigurationError, match="temperature must be between 0 and 1"):
                 config.validate()
@@ -210,7 +259,9 @@ class TestConfigValidation:
         
         try:
             config = Config.from_env()
-            config.vision_model.max_tokens = -1
+            config = dataclasses.replace(
+                config, vision_model=dataclasses.replace(config.vision_model, max_tokens=-1)
+            )
             
             with pytest.raises(ConfigurationError, match="max_tokens must be positive"):
                 config.validate()
@@ -227,11 +278,20 @@ class TestConfigValidation:
         
         try:
             config = Config.from_env()
-            config.processing.thumbnail_size = [200]  # Should be [width, height]
+            config = dataclasses.replace(config, processing=dataclasses.replace(
+                config.processing, thumbnail_size=[200]  # Should be [width, height]
+            ))
             
             with pytest.raises(ConfigurationError, match="thumbnail_size must be"):
                 config.validate()
                 
         finally:
             if os.path.exists("credentials.json"):
-                os.unlink("credentials.json")
\ No newline at end of file
+                os.unlink("credentials.json")
+    
+    def test_validate_invalid_synchronous(self):
+        """Test validation with an unknown SQLite synchronous mode."""
+        config = Config.from_env({'DATABASE_SYNCHRONOUS': 'sometimes'})
+        
+        with pytest.raises(ConfigurationError, match="synchronous must be one of"):
+            config.validate(check_credentials=False)
@@ -4,7 +4,8 @@ import pytest
 from datetime import datetime
 from image_processor.core.models import (
     MediaFile, ExtractedMetadata, ProcessingStatus,
-    ACTIVITY_TAGS, PEOPLE_COUNT_OPTIONS, SEASON_OPTIONS, TIME_OF_DAY_OPTIONS
+    ACTIVITY_TAGS, PEOPLE_COUNT_OPTIONS, SEASON_OPTIONS, TIME_OF_DAY_OPTIONS,
+    PEOPLE_COUNT_IDX, choice_value
 )
 
 
@@ -17,6 +18,17 @@ class TestProcessingStatus:
         assert ProcessingStatus.IN_PROGRESS.value == "in_progress"
         assert ProcessingStatus.COMPLETED.value == "completed"
         assert ProcessingStatus.FAILED.value == "failed"
+    
+    def test_status_is_its_stored_string(self):
+        """Test that members compare equal to and bind as their column values."""
+        import sqlite3
+        
+        assert ProcessingStatus.COMPLETED == "completed"
+        assert ProcessingStatus("failed") is ProcessingStatus.FAILED
+        
+        conn = sqlite3.connect(":memory:")
+        assert conn.execute("SELECT ?", (ProcessingStatus.PENDING,)).fetchone()[0] == "pending"
+        conn.close()
 
 
 class TestMediaFile:
@@ -157,4 +169,12 @@ class TestConstants:
     def test_time_of_day_options(self):
         """Test time of day options."""
         expected_times = ['morning', 'midday', 'evening', 'unclear']
-        assert TIME_OF_DAY_OPTIONS == expected_times
\ No newline at end of file
+        assert TIME_OF_DAY_OPTIONS == expected_times
+    
+    def test_choice_value(self):
+        """Test that option values resolve to the shared option strings."""
+        value = ''.join(['6-', '10'])  # a distinct str object, as read from SQLite
+        
+        assert choice_value(PEOPLE_COUNT_OPTIONS, PEOPLE_COUNT_IDX, value) is PEOPLE_COUNT_OPTIONS[3]
+        assert choice_value(PEOPLE_COUNT_OPTIONS, PEOPLE_COUNT_IDX, 'lots') == 'lots'
+        assert choice_value(PEOPLE_COUNT_OPTIONS, PEOPLE_COUNT_IDX, None) is None
@@ -0,0 +1,38 @@
+"""Tests for the optional orjson JSON helpers."""
+
+import json
+
+import pytest
+
+from image_processor.utils import fastjson
+
+
+class TestFastJson:
+    """Test the fastjson helpers."""
+
+    def test_loads_bytes_and_str(self):
+        """Test decoding from both bytes and str."""
+        document = {"files": [{"id": "a", "name": "ü.jpg"}], "nextPageToken": None}
+        encoded = json.dumps(document)
+
+        assert fastjson.loads(encoded) == document
+        assert fastjson.loads(encoded.encode('utf-8')) == document
+
+    def test_invalid_json_raises_stdlib_error(self):
+        """Test that decode errors are catchable as json.JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            fastjson.loads(b'{"unterminated": ')
+        with pytest.raises(fastjson.JSONDecodeError):
+            fastjson.loads('not json')
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_indented_matches_stdlib_layout(self, use_orjson, monkeypatch):
+        """Test that both encoders produce json.dumps(indent=2) output as UTF-8."""
+        if not use_orjson:
+            monkeypatch.setattr(fastjson, "orjson", None)
+        elif fastjson.orjson is None:
+            pytest.skip("orjson is not installed")
+        document = {"file": {"id": 1, "filename": "ü.jpg", "tags": []}, "metadata": None}
+
+        expected = json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')
+        assert fastjson.dumps_indented(document) == expected
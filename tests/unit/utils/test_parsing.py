@@ -0,0 +1,33 @@
+"""Tests for model output parsing helpers."""
+
+import pytest
+
+from image_processor.utils.parsing import extract_json_object
+
+
+class TestExtractJsonObject:
+    """Test extract_json_object."""
+    
+    def test_plain_json(self):
+        """Test a bare JSON object."""
+        assert extract_json_object('{"a": 1}') == {"a": 1}
+    
+    def test_markdown_fence(self):
+        """Test JSON wrapped in a markdown code fence."""
+        text = 'Here you go:\n```json\n{"a": 1, "b": [1, 2]}\n```\nThanks!'
+        assert extract_json_object(text) == {"a": 1, "b": [1, 2]}
+    
+    def test_trailing_braces(self):
+        """Test trailing text containing braces after the object."""
+        text = '<result>{"a": {"b": 2}}</result> note: {not json}'
+        assert extract_json_object(text) == {"a": {"b": 2}}
+    
+    def test_skips_invalid_leading_brace(self):
+        """Test a non-JSON brace before the real object."""
+        text = 'Format {like this}: {"subject": "garden"}'
+        assert extract_json_object(text) == {"subject": "garden"}
+    
+    def test_no_json(self):
+        """Test output without any JSON object."""
+        with pytest.raises(ValueError, match="No JSON object"):
+            extract_json_object("I cannot analyse this image.")
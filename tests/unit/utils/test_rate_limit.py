@@ -0,0 +1,54 @@
+"""Tests for the shared request rate limiter."""
+
+from image_processor.utils.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only advances when sleep() is called."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter:
+    """Test RateLimiter."""
+
+    def test_blocks_once_window_is_full(self):
+        """Test calls beyond the rate wait for the oldest call to expire."""
+        clock = FakeClock()
+        limiter = RateLimiter(2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(5):
+            with limiter:
+                pass
+
+        assert clock.sleeps == [1.0, 1.0]
+        assert clock.now == 2.0
+
+    def test_fractional_rate(self):
+        """Test rates below one per period space calls by 1/rate seconds."""
+        clock = FakeClock()
+        limiter = RateLimiter(0.5, clock=clock, sleep=clock.sleep)
+
+        limiter.acquire()
+        limiter.acquire()
+
+        assert clock.sleeps == [2.0]
+
+    def test_non_positive_rate_disables_limiting(self):
+        """Test a zero rate never sleeps."""
+        clock = FakeClock()
+        limiter = RateLimiter(0, clock=clock, sleep=clock.sleep)
+
+        for _ in range(10):
+            limiter.acquire()
+
+        assert clock.sleeps == []
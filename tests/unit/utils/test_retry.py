@@ -0,0 +1,64 @@
+"""Tests for retry helpers."""
+
+import pytest
+from unittest.mock import Mock
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from image_processor.utils.retry import (
+    backoff_delay, get_retry_after, is_retryable, retry_call
+)
+
+
+def make_http_error(status, headers=None):
+    """Build a googleapiclient HttpError with the given status and headers."""
+    resp = httplib2.Response({'status': status, **(headers or {})})
+    return HttpError(resp, b'{}')
+
+
+class TestRetryHelpers:
+    """Test backoff and retry helpers."""
+    
+    def test_retry_after_header(self):
+        """Test Retry-After is read from HttpError responses."""
+        error = make_http_error(429, {'retry-after': '7'})
+        assert get_retry_after(error) == 7.0
+        assert backoff_delay(0, error) == 7.0
+    
+    def test_exponential_backoff_without_header(self):
+        """Test exponential delays capped at max_delay."""
+        error = make_http_error(503)
+        assert get_retry_after(error) is None
+        assert [backoff_delay(i, error) for i in range(4)] == [1, 2, 4, 8]
+        assert backoff_delay(10, error) == 60.0
+    
+    def test_is_retryable(self):
+        """Test only rate limits and 5xx are retryable."""
+        assert is_retryable(make_http_error(429))
+        assert is_retryable(make_http_error(503))
+        assert not is_retryable(make_http_error(404))
+        assert not is_retryable(ValueError("boom"))
+    
+    def test_retry_call_recovers(self):
+        """Test transient errors are retried until success."""
+        func = Mock(side_effect=[make_http_error(429, {'retry-after': '3'}), 'ok'])
+        sleep = Mock()
+        
+        assert retry_call(func, 'a', retry_on=(HttpError,), sleep=sleep) == 'ok'
+        assert func.call_count == 2
+        sleep.assert_called_once_with(3.0)
+    
+    def test_retry_call_gives_up(self):
+        """Test non-retryable errors and exhausted attempts propagate."""
+        sleep = Mock()
+        
+        func = Mock(side_effect=make_http_error(404))
+        with pytest.raises(HttpError):
+            retry_call(func, retry_on=(HttpError,), sleep=sleep)
+        assert func.call_count == 1
+        
+        func = Mock(side_effect=make_http_error(500))
+        with pytest.raises(HttpError):
+            retry_call(func, attempts=3, retry_on=(HttpError,), sleep=sleep)
+        assert func.call_count == 3
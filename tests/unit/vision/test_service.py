@@ -0,0 +1,77 @@
+"""Tests for the vision analysis service."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+# The vision package imports the API clients' HTTP libraries
+pytest.importorskip("anthropic")
+pytest.importorskip("httpx")
+
+from image_processor.core.config import Config
+from image_processor.core.exceptions import ProcessingError
+from image_processor.core.models import ExtractedMetadata, MediaFile, ProcessingStatus
+from image_processor.database.connection import DatabaseConnection
+from image_processor.vision.service import VisionAnalysisService
+
+
+class TestProcessPendingFiles:
+    """Test VisionAnalysisService.process_pending_files."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Create a service on a temporary database with the network clients mocked."""
+        config = Config.from_env({'DATABASE_PATH': str(tmp_path / "vision.db")})
+        with patch('image_processor.vision.service.VisionClient'), \
+                patch('image_processor.vision.service.GoogleDriveAuth'), \
+                patch('image_processor.vision.service.GoogleDriveService'):
+            service = VisionAnalysisService(config)
+
+        for i in range(6):
+            service.file_repo.create(MediaFile(
+                drive_file_id=f"vision_{i}",
+                filename=f"vision_{i}.jpg",
+                file_path=f"/test/vision_{i}.jpg",
+                file_size=1024,
+                mime_type="image/jpeg",
+                created_date=datetime.now(),
+                modified_date=datetime.now()
+            ))
+        yield service
+
+        DatabaseConnection._instances.clear()
+
+    @staticmethod
+    def analyze(media_file):
+        """Stand-in for _analyze_file that skips the download and vision call."""
+        return ExtractedMetadata(
+            primary_subject="Garden beds",
+            visual_quality=4,
+            has_people=False,
+            people_count="none",
+            is_indoor=False,
+            social_media_score=3,
+            social_media_reason="Clear shot",
+            marketing_score=3,
+            marketing_use="Website",
+            activity_tags=["gardening"],
+            file_id=media_file.id
+        )
+
+    def test_processes_all_pending(self, service):
+        """Test that every pending image ends up completed."""
+        with patch.object(service, '_analyze_file', side_effect=self.analyze):
+            stats = service.process_pending_files(max_workers=2)
+
+        assert stats == {'processed': 6, 'failed': 0, 'skipped': 0}
+        assert service.file_repo.get_processing_stats() == {'completed': 6}
+
+    def test_failed_store_leaves_nothing_in_progress(self, service):
+        """Test that files in flight when storing fails are returned to pending."""
+        with patch.object(service, '_analyze_file', side_effect=self.analyze), \
+                patch.object(service, '_record_result', side_effect=RuntimeError("database is locked")):
+            with pytest.raises(ProcessingError):
+                service.process_pending_files(max_workers=2)
+
+        assert service.file_repo.get_by_status(ProcessingStatus.IN_PROGRESS) == []
+        assert service.file_repo.get_processing_stats() == {'pending': 6}
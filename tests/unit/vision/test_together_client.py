@@ -0,0 +1,57 @@
+"""Tests for the Together AI vision client."""
+
+import pytest
+from unittest.mock import Mock
+
+# The vision package imports the API clients' HTTP libraries
+pytest.importorskip("anthropic")
+pytest.importorskip("httpx")
+
+from image_processor.core.exceptions import VisionAnalysisError
+from image_processor.vision.together_client import TogetherVisionClient
+
+
+class CountingLimiter:
+    """Rate limiter stand-in that records how often it was taken."""
+
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+class TestTogetherVisionClient:
+    """Test TogetherVisionClient."""
+
+    @pytest.fixture
+    def limiter(self):
+        return CountingLimiter()
+
+    @pytest.fixture
+    def client(self, monkeypatch, limiter):
+        """Create a client whose HTTP session is mocked."""
+        monkeypatch.setenv("TOGETHER_API_KEY", "test-key")
+        client = TogetherVisionClient(max_retries=3, rate_limiter=limiter)
+        client.session = Mock()
+        return client
+
+    def test_limiter_taken_per_request(self, client, limiter):
+        """Test that every HTTP request, not every analysis, draws on the limiter."""
+        client.session.post.return_value.content = b'{"choices": []}'
+
+        client._post("model", "aW1n", "image/jpeg", "prompt")
+        client._post("model", "aW1n", "image/jpeg", "prompt")
+
+        assert client.session.post.call_count == 2
+        assert limiter.acquired == 2
+
+    def test_limiter_taken_per_retry(self, client, limiter):
+        """Test that retried requests are rate limited too."""
+        client.session.post.side_effect = ConnectionError("reset")
+
+        with pytest.raises(VisionAnalysisError):
+            client._post("model", "aW1n", "image/jpeg", "prompt")
+
+        assert client.session.post.call_count == 3
+        assert limiter.acquired == 3